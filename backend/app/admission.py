@@ -0,0 +1,131 @@
+"""Token-bucket admission control for device check-ins.
+
+A global bucket caps total check-in throughput, and per-device buckets stop a single
+device's retries from eating that budget. Per-device state lives in two fixed arrays
+indexed by a hash of the device id, so memory stays constant (12 bytes per slot) however
+many devices exist. Devices that collide on a slot share a bucket, which only makes
+limiting slightly stricter for them.
+"""
+
+from __future__ import annotations
+
+import math
+from array import array
+from dataclasses import dataclass
+
+from .clock import SYSTEM_CLOCK, Clock
+
+DEVICE_RATE_PER_SECOND = 1.0
+DEVICE_BURST = 10.0
+GLOBAL_RATE_PER_SECOND = 5000.0
+GLOBAL_BURST = 10000.0
+DEVICE_SLOTS = 1 << 20
+RETRY_SPREAD_SECONDS = 5.0
+
+
+@dataclass(frozen=True)
+class Admission:
+    """Outcome of an admission check; ``scope`` names the bucket that rejected it."""
+
+    admitted: bool
+    scope: str | None = None
+    retry_after: float = 0.0
+
+    @property
+    def retry_after_header(self) -> str:
+        return str(max(1, math.ceil(self.retry_after)))
+
+
+ADMITTED = Admission(admitted=True)
+
+
+class TokenBucket:
+    """Classic token bucket refilled lazily on each call."""
+
+    def __init__(self, rate: float, burst: float) -> None:
+        self.rate = rate
+        self.burst = burst
+        self.tokens = burst
+        self.updated: float | None = None
+
+    def take(self, now: float) -> float:
+        """Consume one token; return 0 when admitted, else seconds until one is available."""
+
+        if self.updated is not None:
+            self.tokens = min(self.burst, self.tokens + (now - self.updated) * self.rate)
+        self.updated = now
+        if self.tokens >= 1.0:
+            self.tokens -= 1.0
+            return 0.0
+        return (1.0 - self.tokens) / self.rate
+
+    def refund(self) -> None:
+        self.tokens = min(self.burst, self.tokens + 1.0)
+
+
+class DeviceBuckets:
+    """Hash-indexed token buckets for an unbounded set of device ids."""
+
+    def __init__(self, rate: float, burst: float, slots: int = DEVICE_SLOTS) -> None:
+        self.rate = rate
+        self.burst = burst
+        self._mask = slots - 1
+        if slots & self._mask:
+            raise ValueError("slots must be a power of two")
+        self._tokens = array("f", [burst]) * slots
+        self._updated = array("d", [-math.inf]) * slots
+
+    def slot(self, device_id: str) -> int:
+        return hash(device_id) & self._mask
+
+    def take(self, slot: int, now: float) -> float:
+        elapsed = now - self._updated[slot]
+        tokens = min(self.burst, self._tokens[slot] + elapsed * self.rate)
+        self._updated[slot] = now
+        if tokens >= 1.0:
+            self._tokens[slot] = tokens - 1.0
+            return 0.0
+        self._tokens[slot] = tokens
+        return (1.0 - tokens) / self.rate
+
+    def refund(self, slot: int) -> None:
+        self._tokens[slot] = min(self.burst, self._tokens[slot] + 1.0)
+
+
+class AdmissionController:
+    """Admits a check-in only if both its device bucket and the global bucket allow it."""
+
+    def __init__(
+        self,
+        device_rate: float = DEVICE_RATE_PER_SECOND,
+        device_burst: float = DEVICE_BURST,
+        global_rate: float = GLOBAL_RATE_PER_SECOND,
+        global_burst: float = GLOBAL_BURST,
+        slots: int = DEVICE_SLOTS,
+        retry_spread: float = RETRY_SPREAD_SECONDS,
+        clock: Clock = SYSTEM_CLOCK,
+    ) -> None:
+        self.clock = clock
+        self.devices = DeviceBuckets(device_rate, device_burst, slots)
+        self.global_bucket = TokenBucket(global_rate, global_burst)
+        self.retry_spread = retry_spread
+        self.rejected = {"device": 0, "global": 0}
+
+    def admit(self, device_id: str, now: float | None = None) -> Admission:
+        if now is None:
+            now = self.clock.monotonic()
+        slot = self.devices.slot(device_id)
+        wait = self.devices.take(slot, now)
+        if wait:
+            self.rejected["device"] += 1
+            return Admission(admitted=False, scope="device", retry_after=wait)
+
+        wait = self.global_bucket.take(now)
+        if wait:
+            # The device did nothing wrong; don't charge it for the global shortfall.
+            self.devices.refund(slot)
+            self.rejected["global"] += 1
+            # Spread retries deterministically per device so the herd does not re-sync.
+            spread = (slot & 0x3FF) / 0x3FF * self.retry_spread
+            return Admission(admitted=False, scope="global", retry_after=wait + spread)
+        return ADMITTED
@@ -0,0 +1,381 @@
+"""Offline policy backtesting over recorded check-in health samples.
+
+Replays historical samples through the same semantics as ``compute_window_metrics`` and
+``PolicyEngine`` (5-minute windows capped at ``MAX_WINDOW_LEN``, pause on SLO breach,
+auto-rollback on critical breach, promotion gated by cooldown) for a whole grid of
+thresholds at once. Window metrics are computed once per ring and evaluation step; the
+rollout state machine then advances every configuration in lock-step as NumPy vectors,
+so hundreds of configurations cost little more than one.
+
+Usage::
+
+    python -m app.backtest --wal ./data --crash-free-gate 0.98 0.99 \\
+        --auto-rollback-crash 0.93 0.95 --cooldown 60 120 300
+"""
+
+from __future__ import annotations
+
+import argparse
+import csv
+import itertools
+import json
+import sys
+from collections.abc import Iterable, Sequence
+from dataclasses import dataclass
+from pathlib import Path
+
+try:
+    import numpy as np
+except ImportError as exc:  # pragma: no cover - optional dependency
+    raise ImportError(
+        "app.backtest requires numpy: pip install 'saferoll-backend[backtest]'"
+    ) from exc
+
+from . import metrics, policy, rings, wal
+from .store import MAX_WINDOW_LEN, parse_ts
+
+ACTIVE, PAUSED, COMPLETED = 0, 1, 2
+
+
+@dataclass
+class Samples:
+    """Column-oriented check-in samples sorted by timestamp."""
+
+    ts: np.ndarray  # float64 epoch seconds
+    ring: np.ndarray  # int8 ring index
+    boot_ok: np.ndarray  # bool
+    crash_free: np.ndarray  # float64
+    checkin_ms: np.ndarray  # float64
+
+    @classmethod
+    def from_columns(
+        cls,
+        ts: Iterable[float],
+        ring: Iterable[int],
+        boot_ok: Iterable[bool],
+        crash_free: Iterable[float],
+        checkin_ms: Iterable[float],
+    ) -> Samples:
+        ts_arr = np.asarray(ts, dtype=np.float64)
+        order = np.argsort(ts_arr, kind="stable")
+        return cls(
+            ts=ts_arr[order],
+            ring=np.asarray(ring, dtype=np.int8)[order],
+            boot_ok=np.asarray(boot_ok, dtype=bool)[order],
+            crash_free=np.asarray(crash_free, dtype=np.float64)[order],
+            checkin_ms=np.asarray(checkin_ms, dtype=np.float64)[order],
+        )
+
+    def __len__(self) -> int:
+        return len(self.ts)
+
+
+def load_wal(data_dir: str | Path) -> Samples:
+    """Load every check-in still present in a Store data directory (snapshot + WAL)."""
+
+    snapshot, records = wal.Journal(data_dir).load()
+    columns: list[list[float]] = [[], [], [], [], []]
+    if snapshot is not None:
+        for ring_index, window in enumerate(snapshot.windows):
+            for ts, boot_ok, crash_free, checkin_ms in window:
+                for column, value in zip(
+                    columns, (ts, ring_index, boot_ok, crash_free, checkin_ms), strict=True
+                ):
+                    column.append(value)
+    for op, payload in records:
+        if op != wal.OP_CHECKIN:
+            continue
+        (ring_index, ts, boot_ok, crash_free, checkin_ms), _ = wal.decode_checkin(payload)
+        for column, value in zip(
+            columns, (ts, ring_index, boot_ok, crash_free, checkin_ms), strict=True
+        ):
+            column.append(value)
+    return Samples.from_columns(*columns)
+
+
+def load_ndjson(path: str | Path) -> Samples:
+    """Load ``CheckinReq``-shaped JSON lines (one check-in per line, or an NDJSON export)."""
+
+    columns: list[list[float]] = [[], [], [], [], []]
+    with open(path, encoding="utf-8") as fp:
+        for line in fp:
+            if not line.strip():
+                continue
+            item = json.loads(line)
+            if item.get("type", "sample") != "sample":
+                continue  # non-sample records of an ``app.export`` NDJSON file
+            health = item["health"]
+            values = (
+                parse_ts(item["ts"]).timestamp(),
+                rings.index_for(item["ring"]),
+                health["boot_ok"],
+                health["crash_free"],
+                health["checkin_ms"],
+            )
+            for column, value in zip(columns, values, strict=True):
+                column.append(value)
+    return Samples.from_columns(*columns)
+
+
+@dataclass
+class RingSeries:
+    """Window metrics per ring (rows) and evaluation step (columns)."""
+
+    times: np.ndarray
+    total: np.ndarray
+    fresh: np.ndarray  # a check-in for the ring arrived during the step
+    boot_success: np.ndarray
+    crash_free_median: np.ndarray
+    checkin_ms_median: np.ndarray
+
+
+def window_series(
+    samples: Samples,
+    step_seconds: float = 10.0,
+    window_seconds: float = metrics.WINDOW_SECONDS,
+    max_window_len: int = MAX_WINDOW_LEN,
+) -> RingSeries:
+    """Evaluate ``compute_window_metrics`` for every ring at every step of the timeline."""
+
+    if not len(samples):
+        raise ValueError("No samples to backtest")
+    times = np.arange(samples.ts[0], samples.ts[-1] + step_seconds, step_seconds)
+    shape = (len(rings.RINGS), len(times))
+    total = np.zeros(shape, dtype=np.int64)
+    fresh = np.zeros(shape, dtype=bool)
+    boot = np.ones(shape)
+    crash = np.ones(shape)
+    ms = np.zeros(shape)
+
+    for ring_index in range(len(rings.RINGS)):
+        mask = samples.ring == ring_index
+        ts = samples.ts[mask]
+        if not len(ts):
+            continue
+        crash_free = samples.crash_free[mask]
+        checkin_ms = samples.checkin_ms[mask]
+        boot_cum = np.concatenate(([0], np.cumsum(samples.boot_ok[mask])))
+
+        hi = np.searchsorted(ts, times, side="right")
+        lo = np.maximum(
+            np.searchsorted(ts, times - window_seconds, side="left"), hi - max_window_len
+        )
+        counts = hi - lo
+        total[ring_index] = counts
+        fresh[ring_index] = np.diff(np.concatenate(([0], hi))) > 0
+        nonempty = counts > 0
+        boot[ring_index, nonempty] = (boot_cum[hi] - boot_cum[lo])[nonempty] / counts[nonempty]
+
+        # Medians are not prefix-decomposable; compute each distinct window once.
+        previous: tuple[int, int] | None = None
+        for col in np.flatnonzero(nonempty):
+            bounds = (lo[col], hi[col])
+            if bounds != previous:
+                cf = np.median(crash_free[bounds[0] : bounds[1]])
+                cm = np.median(checkin_ms[bounds[0] : bounds[1]])
+                previous = bounds
+            crash[ring_index, col] = cf
+            ms[ring_index, col] = cm
+
+    return RingSeries(
+        times=times,
+        total=total,
+        fresh=fresh,
+        boot_success=boot,
+        crash_free_median=crash,
+        checkin_ms_median=ms,
+    )
+
+
+@dataclass
+class Grid:
+    """Threshold configurations, one entry per configuration in each array."""
+
+    boot_success_gate: np.ndarray
+    crash_free_gate: np.ndarray
+    checkin_ms_gate: np.ndarray
+    auto_rollback_crash: np.ndarray
+    auto_rollback_boot: np.ndarray
+    cooldown_seconds: np.ndarray
+
+    FIELDS = (
+        "boot_success_gate",
+        "crash_free_gate",
+        "checkin_ms_gate",
+        "auto_rollback_crash",
+        "auto_rollback_boot",
+        "cooldown_seconds",
+    )
+
+    @classmethod
+    def product(
+        cls,
+        boot_success_gate: Sequence[float] = (metrics.BOOT_SUCCESS_GATE,),
+        crash_free_gate: Sequence[float] = (metrics.CRASH_FREE_GATE,),
+        checkin_ms_gate: Sequence[float] = (metrics.CHECKIN_MS_GATE,),
+        auto_rollback_crash: Sequence[float] = (metrics.AUTO_ROLLBACK_CRASH,),
+        auto_rollback_boot: Sequence[float] = (metrics.AUTO_ROLLBACK_BOOT,),
+        cooldown_seconds: Sequence[float] = (policy.PROMOTE_COOLDOWN_SECONDS,),
+    ) -> Grid:
+        combos = np.array(
+            list(
+                itertools.product(
+                    boot_success_gate,
+                    crash_free_gate,
+                    checkin_ms_gate,
+                    auto_rollback_crash,
+                    auto_rollback_boot,
+                    cooldown_seconds,
+                )
+            ),
+            dtype=np.float64,
+        )
+        return cls(*(combos[:, idx] for idx in range(combos.shape[1])))
+
+    def __len__(self) -> int:
+        return len(self.crash_free_gate)
+
+    def row(self, idx: int) -> dict[str, float]:
+        return {name: float(getattr(self, name)[idx]) for name in self.FIELDS}
+
+
+@dataclass
+class BacktestResult:
+    grid: Grid
+    first_pause: np.ndarray  # epoch seconds, NaN if never
+    first_rollback: np.ndarray
+    completed_at: np.ndarray
+    pauses: np.ndarray
+    rollbacks: np.ndarray
+    promotions: np.ndarray
+    final_ring: np.ndarray
+    final_state: np.ndarray
+
+    def rows(self) -> list[dict[str, object]]:
+        states = ("active", "paused", "completed")
+        return [
+            {
+                **self.grid.row(idx),
+                "first_pause": _nan_to_none(self.first_pause[idx]),
+                "first_rollback": _nan_to_none(self.first_rollback[idx]),
+                "completed_at": _nan_to_none(self.completed_at[idx]),
+                "pauses": int(self.pauses[idx]),
+                "rollbacks": int(self.rollbacks[idx]),
+                "promotions": int(self.promotions[idx]),
+                "final_ring": rings.ring_for(int(self.final_ring[idx])),
+                "final_state": states[int(self.final_state[idx])],
+            }
+            for idx in range(len(self.grid))
+        ]
+
+
+def _nan_to_none(value: float) -> float | None:
+    return None if np.isnan(value) else float(value)
+
+
+def run_backtest(series: RingSeries, grid: Grid) -> BacktestResult:
+    """Advance one rollout per configuration through the recorded timeline.
+
+    Mirrors the live service: a check-in in the rollout's current ring triggers
+    auto-rollback (critical breach) or auto-pause (SLO breach); an operator is assumed to
+    promote as soon as ``can_promote`` holds (active, no breaches, cooldown elapsed).
+    """
+
+    n = len(grid)
+    last_ring = len(rings.RINGS) - 1
+    ring_idx = np.zeros(n, dtype=np.int64)
+    state = np.full(n, ACTIVE, dtype=np.int8)
+    last_promote = np.full(n, -np.inf)
+    first_pause = np.full(n, np.nan)
+    first_rollback = np.full(n, np.nan)
+    completed_at = np.full(n, np.nan)
+    pauses = np.zeros(n, dtype=np.int64)
+    rollbacks = np.zeros(n, dtype=np.int64)
+    promotions = np.zeros(n, dtype=np.int64)
+
+    for step, now in enumerate(series.times):
+        boot = series.boot_success[ring_idx, step]
+        crash = series.crash_free_median[ring_idx, step]
+        ms = series.checkin_ms_median[ring_idx, step]
+        fresh = series.fresh[ring_idx, step]
+
+        breach = (
+            (boot < grid.boot_success_gate)
+            | (crash < grid.crash_free_gate)
+            | (ms > grid.checkin_ms_gate)
+        )
+        critical = (crash < grid.auto_rollback_crash) | (boot < grid.auto_rollback_boot)
+
+        rollback = fresh & critical
+        if rollback.any():
+            ring_idx = np.where(rollback, np.maximum(ring_idx - 1, 0), ring_idx)
+            state = np.where(rollback, ACTIVE, state).astype(np.int8)
+            rollbacks += rollback
+            first_rollback = np.where(rollback & np.isnan(first_rollback), now, first_rollback)
+
+        pause = fresh & ~critical & breach
+        if pause.any():
+            state = np.where(pause, PAUSED, state).astype(np.int8)
+            pauses += pause
+            first_pause = np.where(pause & np.isnan(first_pause), now, first_pause)
+
+        promote = (
+            (state == ACTIVE) & ~breach & ~rollback & (now - last_promote >= grid.cooldown_seconds)
+        )
+        if promote.any():
+            finishing = promote & (ring_idx >= last_ring)
+            state = np.where(finishing, COMPLETED, state).astype(np.int8)
+            completed_at = np.where(finishing & np.isnan(completed_at), now, completed_at)
+            ring_idx = np.where(promote & ~finishing, ring_idx + 1, ring_idx)
+            last_promote = np.where(promote, now, last_promote)
+            promotions += promote
+
+    return BacktestResult(
+        grid=grid,
+        first_pause=first_pause,
+        first_rollback=first_rollback,
+        completed_at=completed_at,
+        pauses=pauses,
+        rollbacks=rollbacks,
+        promotions=promotions,
+        final_ring=ring_idx,
+        final_state=state,
+    )
+
+
+def main(argv: Sequence[str] | None = None) -> None:
+    parser = argparse.ArgumentParser(
+        description="Backtest SafeRoll gate thresholds against recorded check-ins."
+    )
+    source = parser.add_mutually_exclusive_group(required=True)
+    source.add_argument("--wal", help="Store data directory (SAFEROLL_DATA_DIR)")
+    source.add_argument("--ndjson", help="File with one CheckinReq JSON object per line")
+    parser.add_argument("--step", type=float, default=10.0, help="Evaluation step in seconds")
+    parser.add_argument("--boot-success-gate", type=float, nargs="+")
+    parser.add_argument("--crash-free-gate", type=float, nargs="+")
+    parser.add_argument("--checkin-ms-gate", type=float, nargs="+")
+    parser.add_argument("--auto-rollback-crash", type=float, nargs="+")
+    parser.add_argument("--auto-rollback-boot", type=float, nargs="+")
+    parser.add_argument("--cooldown", type=float, nargs="+", dest="cooldown_seconds")
+    parser.add_argument("--csv", help="Write every configuration's outcome to this file")
+    args = parser.parse_args(argv)
+
+    samples = load_wal(args.wal) if args.wal else load_ndjson(args.ndjson)
+    grid = Grid.product(
+        **{name: getattr(args, name) for name in Grid.FIELDS if getattr(args, name)}
+    )
+    result = run_backtest(window_series(samples, step_seconds=args.step), grid)
+    rows = result.rows()
+
+    out = open(args.csv, "w", newline="", encoding="utf-8") if args.csv else sys.stdout
+    try:
+        writer = csv.DictWriter(out, fieldnames=list(rows[0]))
+        writer.writeheader()
+        writer.writerows(rows)
+    finally:
+        if out is not sys.stdout:
+            out.close()
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,161 @@
+"""Fire-and-forget UDP health beacons.
+
+Devices that only report health can send the binary check-in records from
+:mod:`app.wire` as UDP datagrams instead of HTTP requests; nothing is sent back. A
+datagram may carry several concatenated records (e.g. from a gateway).
+
+Datagrams are queued as they arrive and handed to a worker thread as one batch, so
+recording never blocks the event loop: every record goes into its ring window via
+:meth:`Store.record_health`, and the gates run once per touched ring rather than once
+per record. One batch is in flight at a time; whatever arrives meanwhile forms the next.
+Datagrams arriving while more than ``max_pending`` records are already queued are
+dropped and counted.
+
+Enabled in the app by setting ``SAFEROLL_UDP_PORT`` (and optionally ``SAFEROLL_UDP_HOST``).
+"""
+
+from __future__ import annotations
+
+import asyncio
+import logging
+from dataclasses import asdict, dataclass
+
+from . import wire
+from .dedup import checkin_key
+from .policy import PolicyEngine
+from .rings import CohortAssigner
+from .schemas import Ring
+from .store import Store
+
+MAX_PENDING_RECORDS = 50_000
+
+logger = logging.getLogger(__name__)
+
+
+@dataclass
+class BeaconStats:
+    datagrams: int = 0
+    accepted: int = 0
+    dropped: int = 0
+    malformed: int = 0
+    duplicates: int = 0
+    batches: int = 0
+
+    def as_dict(self) -> dict[str, int]:
+        return asdict(self)
+
+
+class BeaconProtocol(asyncio.DatagramProtocol):
+    def __init__(
+        self,
+        store: Store,
+        policy: PolicyEngine,
+        cohorts: CohortAssigner,
+        max_pending: int = MAX_PENDING_RECORDS,
+    ) -> None:
+        self.store = store
+        self.policy = policy
+        self.cohorts = cohorts
+        self.max_pending = max_pending
+        self.stats = BeaconStats()
+        self._pending: list[bytes] = []
+        self._pending_records = 0
+        # True from scheduling a drain until its batch has been processed.
+        self._scheduled = False
+
+    def datagram_received(self, data: bytes, addr: tuple[str | object, int]) -> None:
+        self.stats.datagrams += 1
+        records, remainder = divmod(len(data), wire.REQUEST.size)
+        if not records or remainder:
+            self.stats.malformed += 1
+            return
+        if self._pending_records + records > self.max_pending:
+            self.stats.dropped += records
+            return
+        self._pending.append(data)
+        self._pending_records += records
+        if not self._scheduled:
+            self._scheduled = True
+            asyncio.get_running_loop().call_soon(self.drain)
+
+    def error_received(self, exc: Exception) -> None:
+        logger.warning("UDP beacon socket error: %s", exc)
+
+    def drain(self) -> None:
+        """Hand everything queued since the last drain to a worker thread as one batch."""
+
+        pending, self._pending = self._pending, []
+        self._pending_records = 0
+        if not pending:
+            self._scheduled = False
+            return
+        future = asyncio.get_running_loop().run_in_executor(None, self._process, pending)
+        future.add_done_callback(self._processed)
+
+    def _processed(self, future: asyncio.Future[BeaconStats]) -> None:
+        # Back on the event loop: only this thread touches ``stats``.
+        if future.cancelled():
+            return
+        exc = future.exception()
+        if exc is not None:
+            logger.error("UDP beacon batch failed", exc_info=exc)
+        else:
+            batch = future.result()
+            self.stats.batches += 1
+            self.stats.accepted += batch.accepted
+            self.stats.malformed += batch.malformed
+            self.stats.duplicates += batch.duplicates
+        self._scheduled = bool(self._pending)
+        if self._scheduled:
+            asyncio.get_running_loop().call_soon(self.drain)
+
+    def _process(self, pending: list[bytes]) -> BeaconStats:
+        """Record one batch (in a worker thread); returns its counts."""
+
+        batch = BeaconStats()
+        size = wire.REQUEST.size
+        touched: set[Ring] = set()
+        for data in pending:
+            view = memoryview(data)
+            for offset in range(0, len(data), size):
+                try:
+                    checkin = wire.decode_checkin(view[offset : offset + size])
+                except ValueError:
+                    batch.malformed += 1
+                    continue
+                ring = self.cohorts.resolve(checkin.device_id, checkin.ring)
+                recorded = self.store.record_health(
+                    checkin.device_id,
+                    ring,
+                    checkin.ts,
+                    checkin.health,
+                    checkin.sw_version,
+                    dedup_key=checkin_key(checkin.device_id, repr(checkin.ts.timestamp())),
+                )
+                if not recorded:
+                    batch.duplicates += 1
+                    continue
+                touched.add(ring)
+                batch.accepted += 1
+        for ring in touched:
+            self.policy.enforce_gates(ring)
+        return batch
+
+
+async def start_listener(
+    host: str,
+    port: int,
+    store: Store,
+    policy: PolicyEngine,
+    cohorts: CohortAssigner,
+    max_pending: int = MAX_PENDING_RECORDS,
+) -> tuple[asyncio.DatagramTransport, BeaconProtocol]:
+    """Bind the beacon socket; close the returned transport to stop listening."""
+
+    loop = asyncio.get_running_loop()
+    transport, protocol = await loop.create_datagram_endpoint(
+        lambda: BeaconProtocol(store, policy, cohorts, max_pending),
+        local_addr=(host, port),
+    )
+    logger.info("Listening for UDP health beacons on %s:%d", host, port)
+    return transport, protocol
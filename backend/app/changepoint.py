@@ -0,0 +1,187 @@
+"""Streaming change-point detection on ring health, for early auto-rollback.
+
+The window gates only fire once a regression dominates the five-minute median, so a
+sharp regression keeps reaching devices until the window turns over. A
+:class:`RingShiftDetector` instead sees each check-in as it arrives and runs, per metric,
+a one-sided CUSUM log-likelihood-ratio test in O(1) time and memory:
+
+* H0: the metric is at its baseline, an EWMA learned from the ring's own samples;
+* H1: it has shifted past the auto-rollback threshold (the "floor"). The alternative is
+  placed so the test's decision boundary sits exactly at the floor. Degradations that
+  stay above the floor drift the statistic down and are left to the pause gates; shifts
+  below it drift it up.
+
+The statistic ``S = max(0, S + llr(x))`` alarms while it exceeds ``threshold``. By Wald's
+approximation a healthy ring alarms about once per ``exp(threshold)`` samples.
+
+* ``crash_free`` uses a Gaussian test. Sigma is at least half the baseline-to-floor gap,
+  and samples are clipped one gap below the floor. This caps what any one outlier device
+  can add, so the statistic only climbs on a run of bad samples.
+* ``boot_ok`` uses a Bernoulli test on the failure rate.
+
+The baseline starts from the first ``warmup`` samples. After that it keeps tracking
+slowly, but only while ``S`` is zero, so a regression cannot drag the baseline along.
+Until warmup completes, and after a restart (detector state is not persisted), the
+window gates are the only protection.
+"""
+
+from __future__ import annotations
+
+import math
+
+from .schemas import Health
+
+CUSUM_THRESHOLD = 20.0
+WARMUP_SAMPLES = 200
+BASELINE_ALPHA = 0.001
+MIN_FAILURE_RATE = 1e-3
+
+
+class GaussianCusum:
+    """Lower CUSUM for a drop in the mean of a continuous metric below ``floor``."""
+
+    __slots__ = ("floor", "threshold", "warmup", "alpha", "count", "mean", "var", "statistic")
+
+    def __init__(
+        self,
+        floor: float,
+        threshold: float = CUSUM_THRESHOLD,
+        warmup: int = WARMUP_SAMPLES,
+        alpha: float = BASELINE_ALPHA,
+    ) -> None:
+        self.floor = floor
+        self.threshold = threshold
+        self.warmup = warmup
+        self.alpha = alpha
+        self.count = 0
+        self.mean = 0.0
+        self.var = 0.0
+        self.statistic = 0.0
+
+    @property
+    def alarmed(self) -> bool:
+        return self.statistic > self.threshold
+
+    def update(self, value: float) -> None:
+        self.count += 1
+        if self.count <= self.warmup:
+            # Welford's running mean/variance for the initial baseline.
+            delta = value - self.mean
+            self.mean += delta / self.count
+            self.var += (delta * (value - self.mean) - self.var) / self.count
+            return
+        gap = self.mean - self.floor
+        if gap > 0:
+            # H1 mean is ``floor - gap``, so the log-likelihood ratio changes sign at the floor.
+            sigma2 = max(self.var, gap * gap / 4)
+            llr = 2 * gap / sigma2 * (self.floor - max(value, self.floor - gap))
+            self.statistic = min(max(0.0, self.statistic + llr), 2 * self.threshold)
+        # Otherwise the baseline is already at or below the floor: the window gates handle it.
+        if self.statistic == 0.0:
+            delta = value - self.mean
+            self.mean += self.alpha * delta
+            self.var = (1 - self.alpha) * (self.var + self.alpha * delta * delta)
+
+
+class BernoulliCusum:
+    """CUSUM for a rise in a failure rate above ``1 - floor``."""
+
+    __slots__ = (
+        "floor",
+        "threshold",
+        "warmup",
+        "alpha",
+        "count",
+        "rate",
+        "statistic",
+        "_fail_llr",
+        "_ok_llr",
+        "_llr_rate",
+    )
+
+    def __init__(
+        self,
+        floor: float,
+        threshold: float = CUSUM_THRESHOLD,
+        warmup: int = WARMUP_SAMPLES,
+        alpha: float = BASELINE_ALPHA,
+    ) -> None:
+        self.floor = floor
+        self.threshold = threshold
+        self.warmup = warmup
+        self.alpha = alpha
+        self.count = 0
+        self.rate = 0.0
+        self.statistic = 0.0
+        self._fail_llr = self._ok_llr = 0.0
+        self._llr_rate = -1.0
+
+    @property
+    def alarmed(self) -> bool:
+        return self.statistic > self.threshold
+
+    def update(self, ok: bool) -> None:
+        failed = 0.0 if ok else 1.0
+        self.count += 1
+        if self.count <= self.warmup:
+            self.rate += (failed - self.rate) / self.count
+            return
+        p0 = max(self.rate, MIN_FAILURE_RATE)
+        if abs(p0 - self._llr_rate) > 0.05 * p0:
+            self._set_alternative(p0)
+        if self._fail_llr:
+            llr = self._fail_llr if failed else self._ok_llr
+            self.statistic = min(max(0.0, self.statistic + llr), 2 * self.threshold)
+        if self.statistic == 0.0:
+            self.rate += self.alpha * (failed - self.rate)
+
+    def _set_alternative(self, p0: float) -> None:
+        """Pick H1's rate so the test's boundary rate is ``1 - floor`` (by bisection).
+
+        Only redone when the baseline rate has moved by more than 5%.
+        """
+
+        self._llr_rate = p0
+        boundary = 1 - self.floor
+        if p0 >= boundary:
+            self._fail_llr = self._ok_llr = 0.0
+            return
+        low, high = boundary, 1 - 1e-9
+        for _ in range(50):
+            p1 = (low + high) / 2
+            ok_llr = math.log((1 - p1) / (1 - p0))
+            if -ok_llr / (math.log(p1 / p0) - ok_llr) < boundary:
+                low = p1
+            else:
+                high = p1
+        self._fail_llr = math.log(p1 / p0)
+        self._ok_llr = math.log((1 - p1) / (1 - p0))
+
+
+class RingShiftDetector:
+    """Per-ring detectors for the metrics auto-rollback gates on."""
+
+    __slots__ = ("crash_free", "boot_ok")
+
+    def __init__(
+        self,
+        crash_floor: float,
+        boot_floor: float,
+        threshold: float = CUSUM_THRESHOLD,
+        warmup: int = WARMUP_SAMPLES,
+    ) -> None:
+        self.crash_free = GaussianCusum(crash_floor, threshold, warmup)
+        self.boot_ok = BernoulliCusum(boot_floor, threshold, warmup)
+
+    def update(self, health: Health) -> None:
+        self.crash_free.update(health.crash_free)
+        self.boot_ok.update(health.boot_ok)
+
+    def shifted(self) -> dict[str, float]:
+        """Floors of the metrics currently alarmed, by metric name."""
+
+        return {
+            name: detector.floor
+            for name, detector in (("crash_free", self.crash_free), ("boot_ok", self.boot_ok))
+            if detector.alarmed
+        }
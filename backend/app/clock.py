@@ -0,0 +1,52 @@
+"""Injectable time sources.
+
+Everything that reads the current time for policy purposes (window pruning, cooldowns,
+decision timestamps, admission buckets) goes through a :class:`Clock`, so simulations can
+run on a :class:`VirtualClock` that only moves when told to.
+"""
+
+from __future__ import annotations
+
+import time
+from datetime import UTC, datetime, timedelta
+from typing import Protocol
+
+
+class Clock(Protocol):
+    def now(self) -> datetime:
+        """Current wall-clock time (timezone-aware UTC)."""
+
+    def monotonic(self) -> float:
+        """Seconds from an arbitrary origin that never goes backwards."""
+
+
+class SystemClock:
+    """The real time."""
+
+    def now(self) -> datetime:
+        return datetime.now(UTC)
+
+    def monotonic(self) -> float:
+        return time.monotonic()
+
+
+class VirtualClock:
+    """Manually advanced clock for deterministic, faster-than-real-time runs."""
+
+    def __init__(self, start: datetime | None = None) -> None:
+        self._start = start if start is not None else datetime.now(UTC)
+        self._elapsed = 0.0
+
+    def now(self) -> datetime:
+        return self._start + timedelta(seconds=self._elapsed)
+
+    def monotonic(self) -> float:
+        return self._elapsed
+
+    def advance(self, seconds: float) -> None:
+        if seconds < 0:
+            raise ValueError("VirtualClock cannot move backwards")
+        self._elapsed += seconds
+
+
+SYSTEM_CLOCK = SystemClock()
@@ -0,0 +1,128 @@
+"""Content-addressed device configs and cached JSON merge-patch deltas.
+
+A config is identified by the hash of its canonical JSON, which is also what devices
+report back as ``last_config`` once they have applied it. The delta from a device's
+config to a rollout's target config is an RFC 7386 JSON merge patch. It depends only on
+the two config ids, so each distinct ``(from, to)`` pair is diffed and serialized once
+and then served from a byte-bounded LRU to every device that starts from that config.
+"""
+
+from __future__ import annotations
+
+import hashlib
+import json
+from collections import OrderedDict
+from typing import Any
+
+CONFIG_ID_HEX = 16
+DELTA_CACHE_BYTES = 16 * 1024 * 1024
+
+
+def canonical_json(config: dict[str, Any]) -> str:
+    return json.dumps(config, sort_keys=True, separators=(",", ":"))
+
+
+def config_id(config: dict[str, Any]) -> str:
+    return hashlib.sha256(canonical_json(config).encode()).hexdigest()[:CONFIG_ID_HEX]
+
+
+def merge_patch(source: dict[str, Any], target: dict[str, Any]) -> dict[str, Any]:
+    """Smallest merge patch turning ``source`` into ``target`` (removed keys map to null)."""
+
+    patch: dict[str, Any] = {key: None for key in source if key not in target}
+    for key, value in target.items():
+        if key not in source:
+            patch[key] = value
+            continue
+        old = source[key]
+        if isinstance(old, dict) and isinstance(value, dict):
+            nested = merge_patch(old, value)
+            if nested:
+                patch[key] = nested
+        elif old != value or type(old) is not type(value):
+            patch[key] = value
+    return patch
+
+
+def apply_merge_patch(document: Any, patch: Any) -> Any:
+    """RFC 7386 merge: what a device does with a ``config_delta``."""
+
+    if not isinstance(patch, dict):
+        return patch
+    result = dict(document) if isinstance(document, dict) else {}
+    for key, value in patch.items():
+        if value is None:
+            result.pop(key, None)
+        else:
+            result[key] = apply_merge_patch(result.get(key), value)
+    return result
+
+
+class DeltaCache:
+    """LRU of serialized deltas bounded by their total encoded size."""
+
+    def __init__(self, max_bytes: int = DELTA_CACHE_BYTES) -> None:
+        self.max_bytes = max_bytes
+        self.bytes = 0
+        self.hits = 0
+        self.misses = 0
+        self.evictions = 0
+        self._entries: OrderedDict[tuple[str | None, str], str] = OrderedDict()
+
+    def __len__(self) -> int:
+        return len(self._entries)
+
+    def get(self, key: tuple[str | None, str]) -> str | None:
+        delta = self._entries.get(key)
+        if delta is None:
+            self.misses += 1
+            return None
+        self._entries.move_to_end(key)
+        self.hits += 1
+        return delta
+
+    def put(self, key: tuple[str | None, str], delta: str) -> None:
+        size = len(delta)
+        if size > self.max_bytes:
+            return  # never cacheable; the caller still has it
+        previous = self._entries.pop(key, None)
+        if previous is not None:
+            self.bytes -= len(previous)
+        self._entries[key] = delta
+        self.bytes += size
+        while self.bytes > self.max_bytes:
+            _, evicted = self._entries.popitem(last=False)
+            self.bytes -= len(evicted)
+            self.evictions += 1
+
+
+class ConfigRegistry:
+    """Known configs by id, plus the delta cache between them."""
+
+    def __init__(self, max_delta_bytes: int = DELTA_CACHE_BYTES) -> None:
+        self.configs: dict[str, dict[str, Any]] = {}
+        self.deltas = DeltaCache(max_delta_bytes)
+
+    def register(self, config: dict[str, Any]) -> str:
+        cid = config_id(config)
+        self.configs.setdefault(cid, config)
+        return cid
+
+    def delta(self, from_id: str | None, to_id: str) -> str | None:
+        """Serialized merge patch from ``from_id`` to ``to_id``; None if already there.
+
+        A ``from_id`` the registry does not know (or None) is diffed from an empty config,
+        i.e. the device gets the whole target config.
+        """
+
+        if from_id == to_id:
+            return None
+        if from_id not in self.configs:
+            from_id = None
+        key = (from_id, to_id)
+        delta = self.deltas.get(key)
+        if delta is None:
+            source = self.configs[from_id] if from_id is not None else {}
+            delta = canonical_json(merge_patch(source, self.configs[to_id]))
+            self.deltas.put(key, delta)
+        return delta
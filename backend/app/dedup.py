@@ -0,0 +1,93 @@
+"""Drop retried check-ins with a time-rotated Bloom filter.
+
+A device that retries a check-in resends the same payload, so the retry carries the same
+``idempotency_key`` or, without one, the same ``(device_id, ts)``. Keys go into the
+*current* generation of a two-generation Bloom filter; a key found in either generation
+is a duplicate. Every ``rotate_seconds`` (or once the current generation holds
+``capacity`` keys, to keep the false-positive rate bounded) the current generation
+becomes the previous one and a fresh one starts. Keys are therefore remembered for
+between one and two rotation periods, in a fixed ``2 * bits / 8`` bytes of memory.
+
+A false positive drops a genuine check-in with probability about ``error_rate``; a
+false negative cannot happen within the remembered period.
+"""
+
+from __future__ import annotations
+
+import math
+from hashlib import blake2b
+
+from .clock import SYSTEM_CLOCK, Clock
+from .metrics import WINDOW_SECONDS
+
+DEFAULT_CAPACITY = 1_000_000
+DEFAULT_ERROR_RATE = 1e-4
+
+
+def checkin_key(device_id: str, ts: str, idempotency_key: str | None = None) -> str:
+    """Dedup key for a check-in: ``device_id|`` plus the client's key if given, else ``ts``.
+
+    Client keys are scoped to the device, so two devices that pick the same key do not
+    drop each other's check-ins.
+    """
+
+    return f"{device_id}|{idempotency_key if idempotency_key is not None else ts}"
+
+
+class RotatingBloomFilter:
+    def __init__(
+        self,
+        capacity: int = DEFAULT_CAPACITY,
+        error_rate: float = DEFAULT_ERROR_RATE,
+        rotate_seconds: float = WINDOW_SECONDS,
+        clock: Clock = SYSTEM_CLOCK,
+    ) -> None:
+        if capacity <= 0 or not 0 < error_rate < 1:
+            raise ValueError("capacity must be positive and error_rate in (0, 1)")
+        self.capacity = capacity
+        self.rotate_seconds = rotate_seconds
+        self.clock = clock
+        self.bits = max(64, math.ceil(-capacity * math.log(error_rate) / math.log(2) ** 2))
+        self.hashes = max(1, round(self.bits / capacity * math.log(2)))
+        self._current = bytearray((self.bits + 7) // 8)
+        self._previous = bytearray(len(self._current))
+        self._count = 0
+        self._rotated_at = clock.monotonic()
+        self.duplicates = 0
+
+    @property
+    def memory_bytes(self) -> int:
+        return len(self._current) + len(self._previous)
+
+    def add(self, key: str) -> bool:
+        """Remember ``key``; returns False if it was (probably) already seen."""
+
+        now = self.clock.monotonic()
+        if now - self._rotated_at >= self.rotate_seconds or self._count >= self.capacity:
+            self._rotate(now)
+        digest = blake2b(key.encode(), digest_size=16).digest()
+        # Kirsch-Mitzenmacher double hashing: k positions from two 64-bit hashes.
+        h1 = int.from_bytes(digest[:8], "little")
+        h2 = int.from_bytes(digest[8:], "little") | 1
+        bits = self.bits
+        positions = [(h1 + idx * h2) % bits for idx in range(self.hashes)]
+        current, previous = self._current, self._previous
+        if all(current[pos >> 3] & (1 << (pos & 7)) for pos in positions) or all(
+            previous[pos >> 3] & (1 << (pos & 7)) for pos in positions
+        ):
+            self.duplicates += 1
+            return False
+        for pos in positions:
+            current[pos >> 3] |= 1 << (pos & 7)
+        self._count += 1
+        return True
+
+    def _rotate(self, now: float) -> None:
+        if now - self._rotated_at >= 2 * self.rotate_seconds:
+            # Idle for a whole generation: nothing in the current one is recent either.
+            self._previous = bytearray(len(self._current))
+        else:
+            self._previous = self._current
+        self._current = bytearray(len(self._previous))
+        self._count = 0
+        self._rotated_at = now
@@ -1,14 +1,38 @@
 """Simple dependency container for routers."""
 
+import os
 from functools import lru_cache
 
+from .admission import AdmissionController
+from .dedup import RotatingBloomFilter
 from .policy import PolicyEngine
+from .push import PushHub
+from .rings import CohortAssigner
 from .store import Store
 
 @lru_cache
 def get_store() -> Store:
-    return Store()
+    # Retried check-ins are dropped unless SAFEROLL_DEDUP=0.
+    dedup = None if os.getenv("SAFEROLL_DEDUP") == "0" else RotatingBloomFilter()
+    # Seconds a published read view may be served before readers republish (0 = always).
+    publish_interval = float(os.getenv("SAFEROLL_PUBLISH_INTERVAL", "1"))
+    data_dir = os.getenv("SAFEROLL_DATA_DIR")
+    if data_dir:
+        return Store.open(data_dir, dedup=dedup, publish_interval=publish_interval)
+    return Store(dedup=dedup, publish_interval=publish_interval)
 
 @lru_cache
 def get_policy() -> PolicyEngine:
     return PolicyEngine(store=get_store())
+
+@lru_cache
+def get_admission() -> AdmissionController:
+    return AdmissionController()
+
+@lru_cache
+def get_cohorts() -> CohortAssigner:
+    return CohortAssigner(authoritative=os.getenv("SAFEROLL_RING_ASSIGNMENT") == "server")
+
+@lru_cache
+def get_push_hub() -> PushHub:
+    return PushHub(store=get_store())
@@ -0,0 +1,262 @@
+"""Streaming bulk export of rollout state and raw health windows.
+
+An export starts by capturing a point-in-time :class:`ExportView`. Capturing copies only
+references: rollout schemas are immutable, and the decision and event logs and the ring
+windows are copied into tuples. The event log is trimmed and coalescing replaces a log's
+last entry in place, so a shared list would not stay point-in-time. Capture is cheap and
+holds the store's write lock only while copying. The view is then serialized and
+compressed incrementally in fixed-size chunks, keeping memory flat however much state
+there is.
+
+Formats:
+
+* ``ndjson``: one JSON object per line with a ``type`` of ``meta``, ``rollout``,
+  ``decision``, ``event`` or ``sample``. Sample lines are check-in shaped, so the file can
+  be fed straight to ``python -m app.backtest --ndjson``.
+* ``columnar``: ``MAGIC`` followed by ``<BI`` (kind, length) framed blocks. ``BLOCK_JSON``
+  blocks hold one JSON record as above; ``BLOCK_SAMPLES`` blocks hold ``<BI`` (ring index,
+  count) and then the ``ts``/``boot_ok``/``crash_free``/``checkin_ms`` columns.
+
+Run ``python -m app.export --url http://localhost:8000 -o state.ndjson.gz`` to pull an
+export from a live node.
+"""
+
+from __future__ import annotations
+
+import argparse
+import json
+import struct
+import zlib
+from array import array
+from collections.abc import Iterator, Sequence
+from dataclasses import dataclass
+from datetime import UTC, datetime
+from typing import BinaryIO, Protocol
+
+from . import metrics, rings
+from .schemas import Decision, Health, Rollout
+from .store import Store
+
+FORMATS = ("ndjson", "columnar")
+COMPRESSIONS = ("gzip", "zstd", "none")
+CHUNK_BYTES = 1 << 16
+SAMPLES_PER_BLOCK = 4096
+
+MAGIC = b"SREXP1\n"
+BLOCK_JSON = 1
+BLOCK_SAMPLES = 2
+_BLOCK = struct.Struct("<BI")
+_SAMPLES_HEADER = struct.Struct("<BI")
+
+MEDIA_TYPES = {"ndjson": "application/x-ndjson", "columnar": "application/octet-stream"}
+EXTENSIONS = {"gzip": ".gz", "zstd": ".zst", "none": ""}
+
+
+@dataclass(frozen=True)
+class ExportView:
+    """Consistent snapshot of the store, captured without copying any records.
+
+    Only the containers are copied, under the store's write lock; streaming happens after.
+    """
+
+    captured_at: datetime
+    active_rollout_id: str | None
+    rollouts: list[tuple[Rollout, tuple[Decision, ...]]]
+    events: tuple[Decision, ...]
+    windows: list[tuple[tuple[datetime, Health], ...]]
+
+    @classmethod
+    def capture(cls, store: Store) -> ExportView:
+        # Under the write lock: check-ins append to the windows and logs being copied,
+        # and ring_window() prunes.
+        with store._write_lock:
+            return cls(
+                captured_at=store.clock.now(),
+                active_rollout_id=store.active_rollout_id,
+                rollouts=[
+                    (rollout.to_schema(), tuple(rollout.decisions))
+                    for rollout in store.rollouts.values()
+                ],
+                events=tuple(store.events),
+                windows=[store.ring_window(ring) for ring in rings.RINGS],
+            )
+
+    def records(self) -> Iterator[dict[str, object]]:
+        """Everything except samples, as JSON-ready records."""
+
+        yield {
+            "type": "meta",
+            "captured_at": self.captured_at.isoformat(),
+            "active_rollout_id": self.active_rollout_id,
+            "window_seconds": metrics.WINDOW_SECONDS,
+            "rings": list(rings.RINGS),
+        }
+        for rollout, decisions in self.rollouts:
+            yield {"type": "rollout", **rollout.model_dump()}
+            for decision in decisions:
+                yield {
+                    "type": "decision",
+                    "rollout_id": rollout.rollout_id,
+                    **decision.model_dump(),
+                }
+        for event in self.events:
+            yield {"type": "event", **event.model_dump()}
+
+
+class _Compressor(Protocol):
+    def compress(self, data: bytes) -> bytes: ...
+
+    def flush(self) -> bytes: ...
+
+
+class _Identity:
+    def compress(self, data: bytes) -> bytes:
+        return data
+
+    def flush(self) -> bytes:
+        return b""
+
+
+def compressor(compression: str) -> _Compressor:
+    """Return a streaming compressor; zstd needs the optional ``zstandard`` package."""
+
+    if compression == "gzip":
+        return zlib.compressobj(6, zlib.DEFLATED, 31)
+    if compression == "zstd":
+        try:
+            import zstandard
+        except ImportError as exc:
+            raise ValueError("zstd compression requires the 'zstandard' package") from exc
+        return zstandard.ZstdCompressor().compressobj()
+    if compression == "none":
+        return _Identity()
+    raise ValueError(f"Unknown compression {compression!r}")
+
+
+def _ndjson(view: ExportView) -> Iterator[bytes]:
+    for record in view.records():
+        yield json.dumps(record, separators=(",", ":")).encode() + b"\n"
+    for ring, window in zip(rings.RINGS, view.windows, strict=True):
+        for ts, health in window:
+            sample = {
+                "type": "sample",
+                "ring": ring,
+                "ts": ts.isoformat(),
+                "health": {
+                    "boot_ok": health.boot_ok,
+                    "crash_free": health.crash_free,
+                    "checkin_ms": health.checkin_ms,
+                },
+            }
+            yield json.dumps(sample, separators=(",", ":")).encode() + b"\n"
+
+
+def _columnar(view: ExportView) -> Iterator[bytes]:
+    yield MAGIC
+    for record in view.records():
+        payload = json.dumps(record, separators=(",", ":")).encode()
+        yield _BLOCK.pack(BLOCK_JSON, len(payload)) + payload
+    for ring_index, window in enumerate(view.windows):
+        for start in range(0, len(window), SAMPLES_PER_BLOCK):
+            block = window[start : start + SAMPLES_PER_BLOCK]
+            columns = (
+                array("d", [ts.timestamp() for ts, _ in block]),
+                array("B", [health.boot_ok for _, health in block]),
+                array("d", [health.crash_free for _, health in block]),
+                array("I", [health.checkin_ms for _, health in block]),
+            )
+            payload = _SAMPLES_HEADER.pack(ring_index, len(block)) + b"".join(
+                column.tobytes() for column in columns
+            )
+            yield _BLOCK.pack(BLOCK_SAMPLES, len(payload)) + payload
+
+
+def iter_export(
+    view: ExportView,
+    fmt: str = "ndjson",
+    compression: str = "gzip",
+    chunk_bytes: int = CHUNK_BYTES,
+) -> Iterator[bytes]:
+    """Serialize and compress ``view``, yielding chunks of roughly ``chunk_bytes``."""
+
+    if fmt not in FORMATS:
+        raise ValueError(f"Unknown export format {fmt!r}")
+    encoder = compressor(compression)
+    pieces = _ndjson(view) if fmt == "ndjson" else _columnar(view)
+    buffered: list[bytes] = []
+    size = 0
+    for piece in pieces:
+        buffered.append(piece)
+        size += len(piece)
+        if size >= chunk_bytes:
+            out = encoder.compress(b"".join(buffered))
+            buffered.clear()
+            size = 0
+            if out:
+                yield out
+    tail = encoder.compress(b"".join(buffered)) + encoder.flush()
+    if tail:
+        yield tail
+
+
+def filename(fmt: str, compression: str) -> str:
+    suffix = ".ndjson" if fmt == "ndjson" else ".bin"
+    return f"saferoll-export{suffix}{EXTENSIONS[compression]}"
+
+
+def read_columnar(fp: BinaryIO) -> Iterator[dict[str, object]]:
+    """Decode an uncompressed columnar export back into NDJSON-style records."""
+
+    if fp.read(len(MAGIC)) != MAGIC:
+        raise ValueError("Not a SafeRoll columnar export")
+    while header := fp.read(_BLOCK.size):
+        kind, length = _BLOCK.unpack(header)
+        payload = fp.read(length)
+        if kind == BLOCK_JSON:
+            yield json.loads(payload)
+            continue
+        ring_index, count = _SAMPLES_HEADER.unpack_from(payload)
+        offset = _SAMPLES_HEADER.size
+        columns = []
+        for typecode in ("d", "B", "d", "I"):
+            column = array(typecode)
+            size = column.itemsize * count
+            column.frombytes(payload[offset : offset + size])
+            offset += size
+            columns.append(column)
+        ring = rings.ring_for(ring_index)
+        for ts, boot_ok, crash_free, checkin_ms in zip(*columns, strict=True):
+            yield {
+                "type": "sample",
+                "ring": ring,
+                "ts": datetime.fromtimestamp(ts, UTC).isoformat(),
+                "health": {
+                    "boot_ok": bool(boot_ok),
+                    "crash_free": crash_free,
+                    "checkin_ms": checkin_ms,
+                },
+            }
+
+
+def main(argv: Sequence[str] | None = None) -> None:
+    import httpx
+
+    parser = argparse.ArgumentParser(description="Stream a state export from a SafeRoll node.")
+    parser.add_argument("--url", default="http://localhost:8000", help="Base URL of the node")
+    parser.add_argument("--format", choices=FORMATS, default="ndjson")
+    parser.add_argument("--compression", choices=COMPRESSIONS, default="gzip")
+    parser.add_argument("-o", "--output", help="Output file (default: server-suggested name)")
+    args = parser.parse_args(argv)
+
+    output = args.output or filename(args.format, args.compression)
+    params = {"format": args.format, "compression": args.compression}
+    with httpx.stream("GET", f"{args.url.rstrip('/')}/v1/export", params=params) as resp:
+        resp.raise_for_status()
+        with open(output, "wb") as fp:
+            for chunk in resp.iter_bytes():
+                fp.write(chunk)
+    print(output)
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,202 @@
+"""Compact device registry with an incrementally maintained version distribution.
+
+Devices live in an open-addressing hash table made of flat arrays: a 64-bit key hash plus
+the ring index, interned software version and interned config of each device (17 bytes
+per slot, so a million devices fit in ~35 MB at the maximum load factor). Per
+``(ring, version)`` counts are adjusted on every check-in, which makes the distribution
+query O(#versions) instead of a fleet scan.
+
+A lock serializes writers with readers: check-ins are handled on worker threads, and a
+reader probing the arrays while ``_grow`` swaps them would index past the end.
+"""
+
+from __future__ import annotations
+
+import hashlib
+import threading
+from array import array
+from collections.abc import Iterable
+
+from . import rings
+from .schemas import Ring
+
+INITIAL_CAPACITY = 1 << 16
+MAX_LOAD = 0.75
+
+_EMPTY_KEY = 0
+_NO_RING = 0xFF
+_NO_CONFIG = 0xFFFFFFFF
+
+
+class Interner:
+    """Bidirectional string <-> small int mapping."""
+
+    def __init__(self, values: Iterable[str] = ()) -> None:
+        self.values: list[str] = []
+        self._ids: dict[str, int] = {}
+        for value in values:
+            self.intern(value)
+
+    def intern(self, value: str) -> int:
+        idx = self._ids.get(value)
+        if idx is None:
+            idx = len(self.values)
+            self._ids[value] = idx
+            self.values.append(value)
+        return idx
+
+    def lookup(self, value: str) -> int | None:
+        return self._ids.get(value)
+
+    def __len__(self) -> int:
+        return len(self.values)
+
+
+def _device_key(device_id: str) -> int:
+    # Stable across processes (unlike hash()) so snapshots stay valid after a restart.
+    digest = hashlib.blake2b(device_id.encode(), digest_size=8).digest()
+    return int.from_bytes(digest, "little") or 1
+
+
+class DeviceRegistry:
+    """Last reported ring/version/config per device, plus per-ring version counts."""
+
+    def __init__(self, capacity: int = INITIAL_CAPACITY) -> None:
+        self.versions = Interner()
+        self.configs = Interner()
+        self.size = 0
+        self._lock = threading.Lock()
+        self._allocate(capacity)
+        # counts[ring_index][version_id] -> devices currently on that version in that ring
+        self._counts: list[array] = [array("Q") for _ in rings.RINGS]
+
+    def _allocate(self, capacity: int) -> None:
+        self._mask = capacity - 1
+        self._keys = array("Q", [_EMPTY_KEY]) * capacity
+        self._ring = array("B", [_NO_RING]) * capacity
+        self._version = array("I", [0]) * capacity
+        self._config = array("I", [_NO_CONFIG]) * capacity
+
+    @property
+    def capacity(self) -> int:
+        return self._mask + 1
+
+    @property
+    def nbytes(self) -> int:
+        columns = (self._keys, self._ring, self._version, self._config)
+        return sum(column.itemsize for column in columns) * self.capacity
+
+    def _slot(self, key: int) -> int:
+        keys = self._keys
+        mask = self._mask
+        slot = key & mask
+        while True:
+            current = keys[slot]
+            if current == key or current == _EMPTY_KEY:
+                return slot
+            slot = (slot + 1) & mask
+
+    def observe(
+        self, device_id: str, ring_index: int, sw_version: str, last_config: str | None
+    ) -> None:
+        """Record a check-in, moving the device between (ring, version) counts if needed."""
+
+        key = _device_key(device_id)
+        with self._lock:
+            self._observe(key, ring_index, sw_version, last_config)
+
+    def _observe(self, key: int, ring_index: int, sw_version: str, last_config: str | None) -> None:
+        slot = self._slot(key)
+        version_id = self.versions.intern(sw_version)
+        config_id = _NO_CONFIG if last_config is None else self.configs.intern(last_config)
+
+        if self._keys[slot] == _EMPTY_KEY:
+            if (self.size + 1) > self.capacity * MAX_LOAD:
+                self._grow()
+                slot = self._slot(key)
+            self._keys[slot] = key
+            self.size += 1
+        else:
+            old_ring, old_version = self._ring[slot], self._version[slot]
+            if old_ring == ring_index and old_version == version_id:
+                self._config[slot] = config_id
+                return
+            self._counts[old_ring][old_version] -= 1
+
+        self._ring[slot] = ring_index
+        self._version[slot] = version_id
+        self._config[slot] = config_id
+        counts = self._counts[ring_index]
+        if version_id >= len(counts):
+            counts.extend([0] * (version_id + 1 - len(counts)))
+        counts[version_id] += 1
+
+    def device(self, device_id: str) -> tuple[Ring, str, str | None] | None:
+        """Return ``(ring, sw_version, last_config)`` last reported by a device."""
+
+        key = _device_key(device_id)
+        with self._lock:
+            slot = self._slot(key)
+            if self._keys[slot] == _EMPTY_KEY:
+                return None
+            config_id = self._config[slot]
+            return (
+                rings.ring_for(self._ring[slot]),
+                self.versions.values[self._version[slot]],
+                None if config_id == _NO_CONFIG else self.configs.values[config_id],
+            )
+
+    def version_counts(self, ring: Ring) -> dict[str, int]:
+        with self._lock:
+            counts = self._counts[rings.index_for(ring)]
+            return {
+                self.versions.values[version_id]: count
+                for version_id, count in enumerate(counts)
+                if count
+            }
+
+    def _grow(self) -> None:
+        keys, ring, version, config = self._keys, self._ring, self._version, self._config
+        self._allocate(self.capacity * 2)
+        for old_slot, key in enumerate(keys):
+            if key == _EMPTY_KEY:
+                continue
+            slot = self._slot(key)
+            self._keys[slot] = key
+            self._ring[slot] = ring[old_slot]
+            self._version[slot] = version[old_slot]
+            self._config[slot] = config[old_slot]
+
+    # ------------------------------------------------------------------
+    # Snapshot support
+    # ------------------------------------------------------------------
+    def dump_meta(self) -> dict[str, object]:
+        with self._lock:
+            return {
+                "capacity": self.capacity,
+                "size": self.size,
+                "versions": list(self.versions.values),
+                "configs": list(self.configs.values),
+                "counts": [counts.tolist() for counts in self._counts],
+            }
+
+    def dump(self) -> bytes:
+        with self._lock:
+            columns = (self._keys, self._ring, self._version, self._config)
+            return b"".join(column.tobytes() for column in columns)
+
+    def load(self, meta: dict[str, object], data: bytes) -> None:
+        with self._lock:
+            self._load(meta, data)
+
+    def _load(self, meta: dict[str, object], data: bytes) -> None:
+        self._allocate(int(meta["capacity"]))  # type: ignore[arg-type]
+        offset = 0
+        for column in (self._keys, self._ring, self._version, self._config):
+            size = self.capacity * column.itemsize
+            column[:] = array(column.typecode, data[offset : offset + size])
+            offset += size
+        self.size = int(meta["size"])  # type: ignore[arg-type]
+        self.versions = Interner(meta["versions"])  # type: ignore[arg-type]
+        self.configs = Interner(meta["configs"])  # type: ignore[arg-type]
+        self._counts = [array("Q", counts) for counts in meta["counts"]]  # type: ignore[union-attr]
@@ -1,16 +1,44 @@
 """FastAPI entrypoint for SafeRoll backend."""
 
 import os
+from collections.abc import AsyncIterator
+from contextlib import asynccontextmanager
 from typing import List
 
 from fastapi import FastAPI
 from fastapi.middleware.cors import CORSMiddleware
 
+from . import beacon
+from .dependencies import get_cohorts, get_policy, get_store
+from .routes import configs as config_routes
+from .routes import export as export_routes
+from .routes import fleet as fleet_routes
 from .routes import health as health_routes
+from .routes import ingest as ingest_routes
 from .routes import metrics as metrics_routes
 from .routes import rollout as rollout_routes
 
-app = FastAPI(title="SafeRoll", version="0.1.0")
+
+@asynccontextmanager
+async def lifespan(app: FastAPI) -> AsyncIterator[None]:
+    transport = None
+    udp_port = os.getenv("SAFEROLL_UDP_PORT")
+    if udp_port:
+        transport, app.state.beacon = await beacon.start_listener(
+            os.getenv("SAFEROLL_UDP_HOST", "0.0.0.0"),
+            int(udp_port),
+            get_store(),
+            get_policy(),
+            get_cohorts(),
+        )
+    yield
+    if transport is not None:
+        transport.close()
+    # Flush any batched WAL writes before the process exits.
+    get_store().close()
+
+
+app = FastAPI(title="SafeRoll", version="0.1.0", lifespan=lifespan)
 
 
 def _allowed_origins() -> List[str]:
@@ -31,8 +59,15 @@ app.add_middleware(
 app.include_router(health_routes.router)
 app.include_router(rollout_routes.router)
 app.include_router(metrics_routes.router)
+app.include_router(fleet_routes.router)
+app.include_router(export_routes.router)
+app.include_router(ingest_routes.router)
+app.include_router(config_routes.router)
 
 
 @app.get("/health")
-def health() -> dict[str, str]:
-    return {"status": "ok"}
+def health() -> dict[str, object]:
+    listener = getattr(app.state, "beacon", None)
+    if listener is None:
+        return {"status": "ok"}
+    return {"status": "ok", "beacon": listener.stats.as_dict()}
@@ -2,68 +2,278 @@
 
 from __future__ import annotations
 
-from collections.abc import Iterable
-from dataclasses import dataclass
-from statistics import median
+import math
+import operator
+from collections.abc import Callable, Iterable, Sequence
+from dataclasses import dataclass, field
 
-from .schemas import Health
+from .schemas import GateSpec, Health
 
 WINDOW_SECONDS = 300
 BOOT_SUCCESS_GATE = 0.995
 CRASH_FREE_GATE = 0.990
 CHECKIN_MS_GATE = 500
+AUTO_ROLLBACK_CRASH = 0.950
+AUTO_ROLLBACK_BOOT = 0.970
+
+_COMPARATORS = {"lt": operator.lt, "le": operator.le, "gt": operator.gt, "ge": operator.ge}
+_PERCENTILES = {"p90": 0.90, "p95": 0.95, "p99": 0.99}
+# Aggregates that populate the fixed WindowMetrics fields instead of ``extra``.
+_CLASSIC_FIELDS = {
+	"boot_ok_mean": "boot_success",
+	"crash_free_median": "crash_free_median",
+	"checkin_ms_median": "checkin_ms_median",
+}
+_CLASSIC_AGGREGATES = {("boot_ok", "mean"), ("crash_free", "median"), ("checkin_ms", "median")}
 
 
 @dataclass
 class WindowMetrics:
-	"""Computed statistics for a 5-minute window."""
+	"""Computed statistics for a 5-minute window.
+
+	The classic fields come from the gates when they reference those aggregates; otherwise
+	``fill_classic`` computes them on first access, so evaluations that never read them
+	(e.g. per check-in gate enforcement) skip the work. ``target`` holds the target-cohort
+	results a rollout evaluation adds to the snapshot.
+	"""
 
 	total: int
-	boot_success: float
-	crash_free_median: float
-	checkin_ms_median: float
 	breaches: list[str]
+	rollback_breaches: list[str] = field(default_factory=list)
+	extra: dict[str, float] = field(default_factory=dict)
+	classic: dict[str, float] = field(default_factory=dict, repr=False)
+	fill_classic: Callable[[], dict[str, float]] | None = field(
+		default=None, repr=False, compare=False
+	)
+	target: WindowMetrics | None = None
+
+	@property
+	def boot_success(self) -> float:
+		return self._classic("boot_success")
+
+	@property
+	def crash_free_median(self) -> float:
+		return self._classic("crash_free_median")
+
+	@property
+	def checkin_ms_median(self) -> float:
+		return self._classic("checkin_ms_median")
+
+	def _classic(self, name: str) -> float:
+		value = self.classic.get(name)
+		if value is None:
+			# Memoized results are shared across threads: publish a new dict rather than
+			# updating this one, then drop the closure (and the samples it holds).
+			fill = self.fill_classic
+			if fill is not None:
+				self.classic = {**fill(), **self.classic}
+				self.fill_classic = None
+			value = self.classic[name]
+		return value
 
 	def snapshot(self) -> dict[str, float]:
 		"""Return the portion of the metrics captured inside a decision snapshot."""
 
-		return {
+		snapshot = {
 			"boot_success": self.boot_success,
 			"crash_free_median": self.crash_free_median,
 			"checkin_ms_median": self.checkin_ms_median,
+			**self.extra,
 		}
+		if self.target is not None:
+			snapshot["target_total"] = float(self.target.total)
+			snapshot.update(
+				(f"target_{key}", value) for key, value in self.target.snapshot().items()
+			)
+		return snapshot
+
+
+def _empty_metrics() -> WindowMetrics:
+	return WindowMetrics(
+		total=0,
+		breaches=[],
+		classic={"boot_success": 1.0, "crash_free_median": 1.0, "checkin_ms_median": 0.0},
+	)
+
+
+_Plan = tuple[tuple[Callable[[Health], float], ...], tuple[tuple[int, str, str], ...]]
+
+
+def _compile(aggregates: set[tuple[str, str]]) -> _Plan:
+	columns = sorted({metric for metric, _ in aggregates})
+	getters = tuple(operator.attrgetter(column) for column in columns)
+	return getters, tuple(
+		(columns.index(metric), aggregation, f"{metric}_{aggregation}")
+		for metric, aggregation in sorted(aggregates)
+	)
+
+
+def _aggregate(plan: _Plan, events: list[Health]) -> dict[str, float]:
+	getters, aggregates = plan
+	total = len(events)
+	# One list per referenced column; unlike per-row tuples this allocates no
+	# GC-tracked objects, which matters when the heap holds millions of samples.
+	columns = [list(map(getter, events)) for getter in getters]
+	ordered: dict[int, list[float]] = {}
+	values: dict[str, float] = {}
+	for idx, aggregation, key in aggregates:
+		column = columns[idx]
+		if aggregation == "mean":
+			values[key] = sum(column) / total
+		elif aggregation == "min":
+			values[key] = min(column)
+		elif aggregation == "max":
+			values[key] = max(column)
+		else:
+			ordered_column = ordered.get(idx)
+			if ordered_column is None:
+				ordered_column = ordered[idx] = sorted(column)
+			values[key] = _order_statistic(ordered_column, aggregation)
+	return values
+
 
+class GateEvaluator:
+	"""A set of gates compiled into a single-pass window evaluator.
 
-def compute_window_metrics(events: Iterable[Health]) -> WindowMetrics:
-	"""Compute SafeRoll SLO metrics over the provided events iterable."""
+	Compilation works out which health columns and aggregates the gates reference, so an
+	evaluation extracts only those columns and computes nothing else. Order statistics on
+	the same metric (median, percentiles) share one sort. Classic aggregates no gate
+	references are computed separately, only if the result's fields are read.
+	"""
+
+	def __init__(self, gates: Sequence[GateSpec]) -> None:
+		self.gates = tuple(gates)
+		aggregates = {(gate.metric, gate.aggregation) for gate in self.gates}
+		self._plan = _compile(aggregates)
+		missing = _CLASSIC_AGGREGATES - aggregates
+		self._classic_plan = _compile(missing) if missing else None
+		self._checks = tuple(
+			(
+				gate.name or gate.key,
+				gate.key,
+				_COMPARATORS[gate.comparator],
+				gate.threshold,
+				gate.severity == "rollback",
+			)
+			for gate in self.gates
+		)
+
+	def evaluate(self, events: Iterable[Health]) -> WindowMetrics:
+		events_list = events if isinstance(events, list) else list(events)
+		total = len(events_list)
+		if total == 0:
+			return _empty_metrics()
+
+		values = _aggregate(self._plan, events_list)
+		breaches: list[str] = []
+		rollback_breaches: list[str] = []
+		for name, key, compare, threshold, rollback in self._checks:
+			if compare(values[key], threshold):
+				(rollback_breaches if rollback else breaches).append(name)
+
+		classic: dict[str, float] = {}
+		extra: dict[str, float] = {}
+		for key, value in values.items():
+			if key in _CLASSIC_FIELDS:
+				classic[_CLASSIC_FIELDS[key]] = value
+			else:
+				extra[key] = value
+		fill_classic = None
+		if self._classic_plan is not None:
+			plan = self._classic_plan
+
+			def fill_classic() -> dict[str, float]:
+				return {
+					_CLASSIC_FIELDS[key]: value
+					for key, value in _aggregate(plan, events_list).items()
+				}
 
-	events_list = list(events)
-	total = len(events_list)
-	if total == 0:
 		return WindowMetrics(
-			total=0,
-			boot_success=1.0,
-			crash_free_median=1.0,
-			checkin_ms_median=0.0,
-			breaches=[],
+			total=total,
+			breaches=breaches,
+			rollback_breaches=rollback_breaches,
+			extra=extra,
+			classic=classic,
+			fill_classic=fill_classic,
 		)
 
-	boot_success = sum(1 for event in events_list if event.boot_ok) / total
-	crash_free_median = median(event.crash_free for event in events_list)
-	checkin_ms_median = median(event.checkin_ms for event in events_list)
 
-	breaches: list[str] = []
-	if boot_success < BOOT_SUCCESS_GATE:
-		breaches.append("boot_success_rate")
-	if crash_free_median < CRASH_FREE_GATE:
-		breaches.append("crash_free_median")
-	if checkin_ms_median > CHECKIN_MS_GATE:
-		breaches.append("checkin_ms_median")
+def _order_statistic(ordered: list[float], aggregation: str) -> float:
+	count = len(ordered)
+	if aggregation == "median":
+		mid = count // 2
+		if count % 2:
+			return ordered[mid]
+		return (ordered[mid - 1] + ordered[mid]) / 2
+	# Nearest-rank percentile.
+	rank = math.ceil(_PERCENTILES[aggregation] * count)
+	return ordered[max(rank - 1, 0)]
 
-	return WindowMetrics(
-		total=total,
-		boot_success=boot_success,
-		crash_free_median=crash_free_median,
-		checkin_ms_median=checkin_ms_median,
-		breaches=breaches,
-	)
+
+SLO_GATES = (
+	GateSpec(
+		name="boot_success_rate",
+		metric="boot_ok",
+		aggregation="mean",
+		comparator="lt",
+		threshold=BOOT_SUCCESS_GATE,
+	),
+	GateSpec(
+		name="crash_free_median",
+		metric="crash_free",
+		aggregation="median",
+		comparator="lt",
+		threshold=CRASH_FREE_GATE,
+	),
+	GateSpec(
+		name="checkin_ms_median",
+		metric="checkin_ms",
+		aggregation="median",
+		comparator="gt",
+		threshold=CHECKIN_MS_GATE,
+	),
+)
+SLO_EVALUATOR = GateEvaluator(SLO_GATES)
+
+ROLLBACK_GATES = (
+	GateSpec(
+		name="crash_free_critical",
+		metric="crash_free",
+		aggregation="median",
+		comparator="lt",
+		threshold=AUTO_ROLLBACK_CRASH,
+		severity="rollback",
+	),
+	GateSpec(
+		name="boot_success_critical",
+		metric="boot_ok",
+		aggregation="mean",
+		comparator="lt",
+		threshold=AUTO_ROLLBACK_BOOT,
+		severity="rollback",
+	),
+)
+
+
+def with_rollback_gates(gates: Sequence[GateSpec]) -> tuple[GateSpec, ...]:
+	"""Per-rollout ``gates`` plus the default auto-rollback gates.
+
+	Custom gates replace the SLO gates, but the auto-rollback gates stay unless the
+	rollout explicitly declares rollback gates of its own.
+	"""
+
+	gates = tuple(gates)
+	if any(gate.severity == "rollback" for gate in gates):
+		return gates
+	return (*gates, *ROLLBACK_GATES)
+
+
+def compute_window_metrics(
+	events: Iterable[Health], evaluator: GateEvaluator | None = None
+) -> WindowMetrics:
+	"""Compute SafeRoll SLO metrics over the provided events iterable.
+
+	``evaluator`` defaults to the fleet-wide SLO gates.
+	"""
+
+	return (evaluator or SLO_EVALUATOR).evaluate(events)
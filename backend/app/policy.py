@@ -2,17 +2,27 @@
 
 from __future__ import annotations
 
-from dataclasses import dataclass
+from collections.abc import Sequence
+from dataclasses import dataclass, replace
 from datetime import datetime
 
 from . import rings
-from .metrics import WindowMetrics
-from .schemas import Decision, Ring
-from .store import Store, utcnow
+from .metrics import (
+	ROLLBACK_GATES,
+	SLO_GATES,
+	GateEvaluator,
+	WindowMetrics,
+	with_rollback_gates,
+)
+from .schemas import Decision, GateSpec, Ring
+from .store import Store
 
 PROMOTE_COOLDOWN_SECONDS = 120
-AUTO_ROLLBACK_CRASH = 0.950
-AUTO_ROLLBACK_BOOT = 0.970
+
+DEFAULT_GATES = (*SLO_GATES, *ROLLBACK_GATES)
+DEFAULT_EVALUATOR = GateEvaluator(DEFAULT_GATES)
+# Breach name suffix for rollback gates tripped early by the change-point detector.
+SHIFT_SUFFIX = "_shift"
 
 
 @dataclass
@@ -29,22 +39,40 @@ class PolicyEngine:
 	def __init__(self, store: Store) -> None:
 		self.store = store
 
-	def evaluate_ring(self, ring: Ring) -> WindowMetrics:
-		return self.store.metrics_for_ring(ring)
+	def evaluate_ring(self, ring: Ring, evaluator: GateEvaluator | None = None) -> WindowMetrics:
+		return self.store.metrics_for_ring(ring, evaluator)
 
 	def evaluate_rollout(self, rollout_id: str, now: datetime | None = None) -> PolicyOutcome:
 		rollout = self.store.get_rollout(rollout_id)
 		ring = rings.ring_for(rollout.ring_index)
-		metrics = self.evaluate_ring(ring)
+		metrics = self.evaluate_ring(ring, rollout.evaluator or DEFAULT_EVALUATOR)
+		target_evaluator = rollout.target_evaluator
+		if target_evaluator is not None:
+			metrics = _with_target_cohort(
+				metrics,
+				self.store.metrics_for_version(ring, rollout.target_version, target_evaluator),
+			)
+		shifts = _shift_breaches(
+			with_rollback_gates(rollout.gates) if rollout.gates is not None else DEFAULT_GATES,
+			self.store.shift_detectors[ring].shifted(),
+		)
+		if shifts:
+			metrics = replace(
+				metrics,
+				breaches=[*metrics.breaches, *shifts],
+				rollback_breaches=[*metrics.rollback_breaches, *shifts],
+			)
 		if now is None:
-			now = utcnow()
+			now = self.store.clock.now()
 
 		cooldown_ready = self.store.promote_cooldown_ready(
 			rollout_id, PROMOTE_COOLDOWN_SECONDS, now
 		)
 		breaches = list(metrics.breaches)
-		auto_rollback = self._needs_auto_rollback(metrics)
-		can_promote = cooldown_ready and not breaches and rollout.state == "active"
+		auto_rollback = bool(metrics.rollback_breaches)
+		can_promote = (
+			cooldown_ready and not breaches and not auto_rollback and rollout.state == "active"
+		)
 		return PolicyOutcome(
 			metrics=metrics,
 			can_promote=can_promote,
@@ -52,20 +80,72 @@ class PolicyEngine:
 			auto_rollback=auto_rollback,
 		)
 
+	def enforce_gates(self, ring: Ring) -> None:
+		"""Auto-pause or auto-rollback the active rollout after new samples for ``ring``."""
+
+		rollout = self.store.active_rollout()
+		if rollout is None or rings.ring_for(rollout.ring_index) != ring:
+			return
+		outcome = self.evaluate_rollout(rollout.rollout_id)
+		if outcome.auto_rollback:
+			reason = "Auto-rollback: critical SLO breach"
+			if all(name.endswith(SHIFT_SUFFIX) for name in outcome.metrics.rollback_breaches):
+				reason = "Auto-rollback: health shift detected"
+			self.store.update_target_version(rollout.rollout_id, rollout.last_known_good)
+			self.store.update_ring_index(rollout.rollout_id, max(0, rollout.ring_index - 1))
+			self.store.update_state(rollout.rollout_id, "active")
+			self.store.append_event(
+				rollout.rollout_id,
+				self.build_decision("ROLLBACK", reason, ring, outcome.metrics),
+			)
+		elif outcome.breaches:
+			self.store.update_state(rollout.rollout_id, "paused")
+			self.store.append_event(
+				rollout.rollout_id,
+				self.build_decision("PAUSE", "Auto-pause: SLO breach", ring, outcome.metrics),
+			)
+
 	def build_decision(
 		self, kind: str, reason: str, ring: Ring, metrics: WindowMetrics
 	) -> Decision:
 		return Decision(
-			ts=utcnow().isoformat(),
+			ts=self.store.clock.now().isoformat(),
 			kind=kind,  # type: ignore[arg-type]
 			reason=reason,
 			ring=ring,
 			snapshot=metrics.snapshot(),
 		)
 
-	@staticmethod
-	def _needs_auto_rollback(metrics: WindowMetrics) -> bool:
-		return (
-			metrics.crash_free_median < AUTO_ROLLBACK_CRASH
-			or metrics.boot_success < AUTO_ROLLBACK_BOOT
-		)
+
+def _with_target_cohort(ring_metrics: WindowMetrics, target: WindowMetrics) -> WindowMetrics:
+	"""Combine ring-wide and target-cohort results (both memoized, so neither is mutated).
+
+	Target-cohort aggregates appear in the snapshot with a ``target_`` prefix; they are
+	only computed when the snapshot is taken.
+	"""
+
+	return replace(
+		ring_metrics,
+		breaches=[*ring_metrics.breaches, *target.breaches],
+		rollback_breaches=[*ring_metrics.rollback_breaches, *target.rollback_breaches],
+		target=target,
+	)
+
+
+def _shift_breaches(gates: Sequence[GateSpec], shifted: dict[str, float]) -> list[str]:
+	"""Rollback gates whose metric the ring's change-point detector has flagged.
+
+	The detector tests against the default rollback floors, so it only stands in for a
+	ring-cohort rollback gate at least that strict; looser per-rollout gates are left to
+	the window.
+	"""
+
+	return [
+		f"{gate.name}{SHIFT_SUFFIX}"
+		for gate in gates
+		if gate.severity == "rollback"
+		and gate.cohort == "ring"
+		and gate.comparator in ("lt", "le")
+		and gate.metric in shifted
+		and gate.threshold >= shifted[gate.metric]
+	]
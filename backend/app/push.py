@@ -0,0 +1,109 @@
+"""Push rollout target changes to devices holding a WebSocket check-in connection.
+
+Every connection subscribes a :class:`PushChannel` under its ring. The hub listens for
+rollout mutations on the :class:`~app.store.Store`; a burst of mutations (a rollback is
+three of them) schedules one :meth:`PushHub.broadcast` on the event loop, which
+serializes a single message per ring and hands the same string to every channel in that
+ring, and only when the ring's message actually changed.
+
+A channel holds just the latest unsent message, so a slow socket cannot delay delivery
+to the others and never accumulates a backlog of stale targets.
+"""
+
+from __future__ import annotations
+
+import asyncio
+import json
+
+from . import rings
+from .schemas import Ring
+from .store import RolloutState, Store
+
+
+class PushChannel:
+    """One connection's outbox; ``offer`` replaces whatever is still unsent."""
+
+    __slots__ = ("ring", "_pending", "_ready")
+
+    def __init__(self, ring: Ring) -> None:
+        self.ring = ring
+        self._pending: str | None = None
+        self._ready = asyncio.Event()
+
+    def offer(self, message: str) -> None:
+        self._pending = message
+        self._ready.set()
+
+    async def next(self) -> str:
+        await self._ready.wait()
+        self._ready.clear()
+        message, self._pending = self._pending, None
+        return message  # type: ignore[return-value]
+
+
+class PushHub:
+    def __init__(self, store: Store) -> None:
+        self.store = store
+        self._channels: dict[Ring, set[PushChannel]] = {ring: set() for ring in rings.RINGS}
+        self._sent: dict[Ring, str] = {}
+        self._loop: asyncio.AbstractEventLoop | None = None
+        self._scheduled = False
+        self.broadcasts = 0
+        store.add_rollout_listener(self._on_rollout_change)
+
+    @property
+    def connections(self) -> int:
+        return sum(len(channels) for channels in self._channels.values())
+
+    def render(self, ring: Ring) -> str:
+        rollout = self.store.active_rollout()
+        return json.dumps(
+            {
+                "type": "target",
+                "rollout_id": rollout.rollout_id if rollout else "",
+                "ring": ring,
+                "target_version": rollout.target_version if rollout else None,
+            }
+        )
+
+    def subscribe(self, ring: Ring) -> PushChannel:
+        """Register a connection (on the event loop); it is sent the current target first."""
+
+        self._loop = asyncio.get_running_loop()
+        channel = PushChannel(ring)
+        message = self.render(ring)
+        self._sent.setdefault(ring, message)
+        channel.offer(message)
+        self._channels[ring].add(channel)
+        return channel
+
+    def move(self, channel: PushChannel, ring: Ring) -> None:
+        self._channels[channel.ring].discard(channel)
+        channel.ring = ring
+        channel.offer(self.render(ring))
+        self._channels[ring].add(channel)
+
+    def unsubscribe(self, channel: PushChannel) -> None:
+        self._channels[channel.ring].discard(channel)
+
+    def broadcast(self) -> None:
+        self._scheduled = False
+        for ring, channels in self._channels.items():
+            if not channels:
+                self._sent.pop(ring, None)
+                continue
+            message = self.render(ring)
+            if self._sent.get(ring) == message:
+                continue
+            self._sent[ring] = message
+            self.broadcasts += 1
+            for channel in channels:
+                channel.offer(message)
+
+    def _on_rollout_change(self, rollout: RolloutState) -> None:
+        # Called on whichever thread mutated the store (sync routes run in a threadpool).
+        loop = self._loop
+        if loop is None or self._scheduled or loop.is_closed():
+            return
+        self._scheduled = True
+        loop.call_soon_threadsafe(self.broadcast)
@@ -0,0 +1,160 @@
+"""Edge relay: answers device check-ins locally and forwards per-ring summaries.
+
+Devices at a site post ``/v1/checkin`` to the relay exactly as they would to the central
+node. The relay folds each check-in into a per-ring :class:`~app.sketch.RingAggregate`
+and answers from the rollout target it cached on its last flush. Every
+``flush_interval`` seconds it posts one :class:`~app.schemas.SummaryBatch` to the central
+``/v1/ingest/summaries`` endpoint, whose response refreshes the cached target. If a flush
+fails the summaries are merged back and retried on the next one.
+
+Run several on one machine with different ports::
+
+    python -m app.relay --central http://localhost:8000 --relay-id site-a --port 8101
+    python -m app.relay --central http://localhost:8000 --relay-id site-b --port 8102
+"""
+
+from __future__ import annotations
+
+import argparse
+import asyncio
+import logging
+from collections.abc import AsyncIterator, Sequence
+from contextlib import asynccontextmanager, suppress
+
+import httpx
+from fastapi import FastAPI
+
+from .rings import CohortAssigner
+from .schemas import CheckinReq, CheckinRes, IngestRes, Ring, SummaryBatch
+from .sketch import RingAggregate
+
+FLUSH_INTERVAL_SECONDS = 5.0
+
+logger = logging.getLogger(__name__)
+
+
+class Relay:
+    """Pre-aggregates check-ins and exchanges summaries for rollout targets."""
+
+    def __init__(
+        self,
+        central: httpx.AsyncClient,
+        relay_id: str,
+        flush_interval: float = FLUSH_INTERVAL_SECONDS,
+        cohorts: CohortAssigner | None = None,
+    ) -> None:
+        self.central = central
+        self.relay_id = relay_id
+        self.flush_interval = flush_interval
+        self.cohorts = cohorts or CohortAssigner()
+        self.target = IngestRes(accepted=0, rollout_id="", target_version=None, active_ring=None)
+        self.forwarded = 0
+        self.flush_failures = 0
+        self._pending: dict[Ring, RingAggregate] = {}
+
+    def record(self, payload: CheckinReq) -> CheckinRes:
+        ring = self.cohorts.resolve(payload.device_id, payload.ring)
+        aggregate = self._pending.get(ring)
+        if aggregate is None:
+            aggregate = self._pending[ring] = RingAggregate()
+        health = payload.health
+        aggregate.add(health.boot_ok, health.crash_free, health.checkin_ms, payload.ts)
+
+        target_version = self.target.target_version
+        return CheckinRes(
+            rollout_id=self.target.rollout_id,
+            ring=ring,
+            apply={
+                "target_version": (
+                    target_version
+                    if target_version and payload.sw_version != target_version
+                    else None
+                ),
+                "config_delta": None,
+            },
+        )
+
+    async def flush(self) -> IngestRes | None:
+        """Forward pending summaries; returns the refreshed target, or None on failure."""
+
+        pending, self._pending = self._pending, {}
+        batch = SummaryBatch(
+            relay_id=self.relay_id,
+            summaries=[aggregate.to_summary(ring) for ring, aggregate in pending.items()],
+        )
+        try:
+            resp = await self.central.post("/v1/ingest/summaries", json=batch.model_dump())
+            resp.raise_for_status()
+        except httpx.HTTPError as exc:
+            logger.warning("Relay %s flush failed: %s", self.relay_id, exc)
+            self.flush_failures += 1
+            # Summaries are mergeable, so nothing is lost by folding them back in.
+            for ring, aggregate in pending.items():
+                current = self._pending.get(ring)
+                if current is None:
+                    self._pending[ring] = aggregate
+                else:
+                    current.merge(aggregate)
+            return None
+        self.target = IngestRes.model_validate(resp.json())
+        self.forwarded += sum(aggregate.count for aggregate in pending.values())
+        return self.target
+
+    async def run(self) -> None:
+        while True:
+            await asyncio.sleep(self.flush_interval)
+            await self.flush()
+
+
+def create_app(relay: Relay) -> FastAPI:
+    @asynccontextmanager
+    async def lifespan(_: FastAPI) -> AsyncIterator[None]:
+        await relay.flush()  # pick up the current rollout target before serving
+        task = asyncio.create_task(relay.run())
+        yield
+        task.cancel()
+        with suppress(asyncio.CancelledError):
+            await task
+        await relay.flush()
+        await relay.central.aclose()
+
+    app = FastAPI(title="SafeRoll relay", version="0.1.0", lifespan=lifespan)
+
+    @app.post("/v1/checkin", response_model=CheckinRes)
+    async def post_checkin(payload: CheckinReq) -> CheckinRes:
+        # Pure in-memory work: run on the event loop, serialized with flush().
+        return relay.record(payload)
+
+    @app.get("/health")
+    async def health() -> dict[str, object]:
+        return {
+            "status": "ok",
+            "relay_id": relay.relay_id,
+            "forwarded": relay.forwarded,
+            "flush_failures": relay.flush_failures,
+        }
+
+    return app
+
+
+def main(argv: Sequence[str] | None = None) -> None:
+    import uvicorn
+
+    parser = argparse.ArgumentParser(description="Run a SafeRoll edge relay.")
+    parser.add_argument("--central", required=True, help="Base URL of the central backend")
+    parser.add_argument("--relay-id", required=True)
+    parser.add_argument("--host", default="0.0.0.0")
+    parser.add_argument("--port", type=int, default=8100)
+    parser.add_argument("--flush-interval", type=float, default=FLUSH_INTERVAL_SECONDS)
+    args = parser.parse_args(argv)
+
+    relay = Relay(
+        httpx.AsyncClient(base_url=args.central, timeout=10),
+        args.relay_id,
+        flush_interval=args.flush_interval,
+    )
+    uvicorn.run(create_app(relay), host=args.host, port=args.port)
+
+
+if __name__ == "__main__":
+    main()
@@ -2,11 +2,25 @@
 
 from __future__ import annotations
 
+import zlib
+from bisect import bisect_right
+from collections.abc import Mapping
+
 from .schemas import Ring
 
 RINGS: tuple[Ring, ...] = ("pilot", "five", "twentyfive", "all")
 RING_TO_INDEX = {ring: idx for idx, ring in enumerate(RINGS)}
 
+# Cumulative share of the fleet, in basis points, that has been reached once a rollout
+# is at each ring (pilot 1%, five 5%, twentyfive 25%, all 100%).
+COHORT_BUCKETS = 10_000
+RING_EXPOSURE_BPS: dict[Ring, int] = {
+    "pilot": 100,
+    "five": 500,
+    "twentyfive": 2500,
+    "all": COHORT_BUCKETS,
+}
+
 
 def index_for(ring: Ring) -> int:
     """Return the numeric index for the provided ring."""
@@ -34,3 +48,52 @@ def is_final_ring(index: int) -> bool:
     """Return True if the index points to the final rollout ring."""
 
     return index >= len(RINGS) - 1
+
+
+def device_bucket(device_id: str) -> int:
+    """Stable bucket in ``[0, COHORT_BUCKETS)`` for a device id (same on every node/restart)."""
+
+    return zlib.crc32(device_id.encode()) % COHORT_BUCKETS
+
+
+class CohortAssigner:
+    """Assigns devices to rings by hashing ``device_id`` against cumulative exposure.
+
+    No per-device state is kept: a device's ring is a pure function of its id and the
+    current thresholds. Thresholds may only grow, so a rebalance can pull devices into
+    earlier rings but never moves a device out of the ring it was already in.
+    """
+
+    def __init__(
+        self,
+        exposure_bps: Mapping[Ring, int] = RING_EXPOSURE_BPS,
+        *,
+        authoritative: bool = False,
+    ) -> None:
+        self.authoritative = authoritative
+        self._bounds: tuple[int, ...] = ()
+        self.rebalance(exposure_bps)
+
+    @property
+    def exposure_bps(self) -> dict[Ring, int]:
+        return dict(zip(RINGS, self._bounds, strict=True))
+
+    def rebalance(self, exposure_bps: Mapping[Ring, int]) -> None:
+        bounds = tuple(exposure_bps[ring] for ring in RINGS)
+        if any(b > a for a, b in zip(bounds[1:], bounds, strict=False)):
+            raise ValueError("Ring exposure must be non-decreasing from pilot to all")
+        if bounds[-1] != COHORT_BUCKETS:
+            raise ValueError(f"Final ring must cover all {COHORT_BUCKETS} buckets")
+        if self._bounds and any(new < old for new, old in zip(bounds, self._bounds, strict=True)):
+            raise ValueError("Shrinking a ring would move devices out of earlier rings")
+        self._bounds = bounds
+
+    def assign(self, device_id: str) -> Ring:
+        return RINGS[bisect_right(self._bounds, device_bucket(device_id))]
+
+    def resolve(self, device_id: str, reported: Ring | None) -> Ring:
+        """Ring to file a check-in under: the server's choice unless the device may self-report."""
+
+        if reported is None or self.authoritative:
+            return self.assign(device_id)
+        return reported
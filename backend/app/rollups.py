@@ -0,0 +1,173 @@
+"""Downsampled per-ring metrics history kept in fixed-size ring buffers.
+
+Each ring keeps one series per resolution. A series is a set of preallocated columns
+indexed by ``bucket % capacity``, so memory is bounded no matter how long the node runs,
+and a history query only touches the buckets it returns. Medians cannot be folded
+incrementally, so buckets carry means and extremes instead.
+"""
+
+from __future__ import annotations
+
+from array import array
+from dataclasses import dataclass
+from datetime import UTC, datetime
+
+from . import rings
+from .schemas import Health, Ring
+
+# resolution label -> (bucket seconds, bucket count)
+RESOLUTIONS: dict[str, tuple[int, int]] = {
+    "10s": (10, 360),  # 1 hour
+    "1m": (60, 1440),  # 1 day
+    "1h": (3600, 720),  # 30 days
+}
+
+_EMPTY = -1
+
+
+@dataclass
+class RollupPoint:
+    """Aggregates for one bucket of a series."""
+
+    start: datetime
+    total: int
+    boot_ok: int
+    crash_free_mean: float
+    crash_free_min: float
+    checkin_ms_mean: float
+    checkin_ms_max: float
+
+    @property
+    def boot_success(self) -> float:
+        return self.boot_ok / self.total if self.total else 1.0
+
+
+class RollupSeries:
+    """Fixed-capacity columnar buffer of bucket aggregates for one resolution."""
+
+    def __init__(self, step_seconds: int, capacity: int) -> None:
+        self.step_seconds = step_seconds
+        self.capacity = capacity
+        self.latest = _EMPTY
+        self._bucket = array("q", [_EMPTY]) * capacity
+        self._total = array("Q", [0]) * capacity
+        self._boot_ok = array("Q", [0]) * capacity
+        self._crash_sum = array("d", [0.0]) * capacity
+        self._crash_min = array("d", [0.0]) * capacity
+        self._ms_sum = array("d", [0.0]) * capacity
+        self._ms_max = array("d", [0.0]) * capacity
+
+    def add(self, ts: float, boot_ok: bool, crash_free: float, checkin_ms: int) -> None:
+        bucket = int(ts // self.step_seconds)
+        if bucket <= self.latest - self.capacity:
+            return  # older than the retained horizon
+        slot = bucket % self.capacity
+        if self._bucket[slot] != bucket:
+            self._bucket[slot] = bucket
+            self._total[slot] = 0
+            self._boot_ok[slot] = 0
+            self._crash_sum[slot] = 0.0
+            self._crash_min[slot] = crash_free
+            self._ms_sum[slot] = 0.0
+            self._ms_max[slot] = checkin_ms
+        self._total[slot] += 1
+        self._boot_ok[slot] += boot_ok
+        self._crash_sum[slot] += crash_free
+        self._ms_sum[slot] += checkin_ms
+        if crash_free < self._crash_min[slot]:
+            self._crash_min[slot] = crash_free
+        if checkin_ms > self._ms_max[slot]:
+            self._ms_max[slot] = checkin_ms
+        if bucket > self.latest:
+            self.latest = bucket
+
+    def points(self, limit: int | None = None) -> list[RollupPoint]:
+        """Return up to ``limit`` most recent non-empty buckets, oldest first."""
+
+        if self.latest == _EMPTY:
+            return []
+        span = self.capacity if limit is None else max(0, min(limit, self.capacity))
+        result: list[RollupPoint] = []
+        for bucket in range(self.latest - span + 1, self.latest + 1):
+            slot = bucket % self.capacity
+            if self._bucket[slot] != bucket:
+                continue
+            total = self._total[slot]
+            result.append(
+                RollupPoint(
+                    start=datetime.fromtimestamp(bucket * self.step_seconds, UTC),
+                    total=total,
+                    boot_ok=self._boot_ok[slot],
+                    crash_free_mean=self._crash_sum[slot] / total,
+                    crash_free_min=self._crash_min[slot],
+                    checkin_ms_mean=self._ms_sum[slot] / total,
+                    checkin_ms_max=self._ms_max[slot],
+                )
+            )
+        return result
+
+    def _columns(self) -> tuple[array, ...]:
+        return (
+            self._bucket,
+            self._total,
+            self._boot_ok,
+            self._crash_sum,
+            self._crash_min,
+            self._ms_sum,
+            self._ms_max,
+        )
+
+    @property
+    def nbytes(self) -> int:
+        return sum(column.itemsize for column in self._columns()) * self.capacity
+
+    def dump(self) -> bytes:
+        return b"".join(column.tobytes() for column in self._columns())
+
+    def load(self, data: bytes) -> None:
+        offset = 0
+        for column in self._columns():
+            size = self.capacity * column.itemsize
+            column[:] = array(column.typecode, data[offset : offset + size])
+            offset += size
+        self.latest = max(self._bucket)
+
+
+class MetricsRollups:
+    """All rollup series for every ring, fed from the Store's check-in path."""
+
+    def __init__(self, resolutions: dict[str, tuple[int, int]] | None = None) -> None:
+        self.resolutions = dict(resolutions or RESOLUTIONS)
+        self._series: dict[Ring, tuple[RollupSeries, ...]] = {
+            ring: tuple(
+                RollupSeries(step, capacity) for step, capacity in self.resolutions.values()
+            )
+            for ring in rings.RINGS
+        }
+        self._labels = {label: idx for idx, label in enumerate(self.resolutions)}
+
+    def add(self, ring: Ring, ts: datetime, health: Health) -> None:
+        epoch = ts.timestamp()
+        for series in self._series[ring]:
+            series.add(epoch, health.boot_ok, health.crash_free, health.checkin_ms)
+
+    def series(self, ring: Ring, resolution: str) -> RollupSeries:
+        try:
+            return self._series[ring][self._labels[resolution]]
+        except KeyError as exc:
+            raise KeyError(f"Unknown resolution {resolution}") from exc
+
+    def dump(self) -> bytes:
+        return b"".join(series.dump() for ring in rings.RINGS for series in self._series[ring])
+
+    def load(self, data: bytes) -> None:
+        """Restore from :meth:`dump`; silently ignored if the layout changed."""
+
+        all_series = [series for ring in rings.RINGS for series in self._series[ring]]
+        sizes = [series.nbytes for series in all_series]
+        if sum(sizes) != len(data):
+            return
+        offset = 0
+        for series, size in zip(all_series, sizes, strict=True):
+            series.load(data[offset : offset + size])
+            offset += size
@@ -0,0 +1,26 @@
+"""Content-addressed config documents referenced by rollouts."""
+
+from __future__ import annotations
+
+from fastapi import APIRouter, Depends, HTTPException
+
+from ..dependencies import get_store
+from ..schemas import ConfigReq, ConfigRes
+from ..store import Store
+
+router = APIRouter(prefix="/v1/configs", tags=["configs"])
+
+
+@router.post("", response_model=ConfigRes)
+def register_config(payload: ConfigReq, store: Store = Depends(get_store)) -> ConfigRes:
+    """Store a config and return its id; registering the same document again is a no-op."""
+
+    return ConfigRes(config_id=store.register_config(payload.config))
+
+
+@router.get("/{config_id}", response_model=ConfigRes)
+def get_config(config_id: str, store: Store = Depends(get_store)) -> ConfigRes:
+    config = store.configs.configs.get(config_id)
+    if config is None:
+        raise HTTPException(status_code=404, detail="Config not found")
+    return ConfigRes(config_id=config_id, config=config)
@@ -0,0 +1,40 @@
+"""Bulk export route streaming a compressed point-in-time view of the store."""
+
+from __future__ import annotations
+
+from typing import Literal
+
+from fastapi import APIRouter, Depends, HTTPException
+from fastapi.responses import StreamingResponse
+
+from .. import export
+from ..dependencies import get_store
+from ..store import Store
+
+router = APIRouter(prefix="/v1", tags=["export"])
+
+
+@router.get("/export")
+def get_export(
+    format: Literal["ndjson", "columnar"] = "ndjson",
+    compression: Literal["gzip", "zstd", "none"] = "gzip",
+    store: Store = Depends(get_store),
+) -> StreamingResponse:
+    """Stream rollouts, decisions and raw ring samples as of the time of the request.
+
+    The body is produced by a sync generator, which Starlette drives from its threadpool,
+    so serialization never blocks the event loop or concurrent check-ins.
+    """
+
+    try:
+        export.compressor(compression)
+    except ValueError as exc:
+        raise HTTPException(status_code=400, detail=str(exc)) from exc
+    view = export.ExportView.capture(store)
+    return StreamingResponse(
+        export.iter_export(view, format, compression),
+        media_type=export.MEDIA_TYPES[format],
+        headers={
+            "Content-Disposition": f'attachment; filename="{export.filename(format, compression)}"'
+        },
+    )
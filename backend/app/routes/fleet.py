@@ -0,0 +1,33 @@
+"""Fleet inventory routes backed by the incremental device registry."""
+
+from __future__ import annotations
+
+from fastapi import APIRouter, Depends
+
+from .. import rings
+from ..dependencies import get_store
+from ..schemas import FleetVersionsRes, RingVersions
+from ..store import Store
+
+router = APIRouter(prefix="/v1/fleet", tags=["fleet"])
+
+
+@router.get("/versions", response_model=FleetVersionsRes)
+def get_fleet_versions(store: Store = Depends(get_store)) -> FleetVersionsRes:
+    """How many devices in each ring run each version, and how many are on target."""
+
+    rollout = store.active_rollout()
+    target_version = rollout.target_version if rollout else None
+    per_ring: dict[str, RingVersions] = {}
+    for ring in rings.RINGS:
+        versions = store.fleet.version_counts(ring)
+        per_ring[ring] = RingVersions(
+            total=sum(versions.values()),
+            on_target=versions.get(target_version, 0) if target_version else 0,
+            versions=versions,
+        )
+    return FleetVersionsRes(
+        total_devices=store.fleet.size,
+        target_version=target_version,
+        rings=per_ring,
+    )
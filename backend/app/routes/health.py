@@ -2,65 +2,273 @@
 
 from __future__ import annotations
 
-from fastapi import APIRouter, Depends
+import asyncio
+import json
+from contextlib import suppress
+from datetime import datetime
+from typing import NamedTuple
 
-from .. import rings
-from ..dependencies import get_policy, get_store
+from fastapi import (
+    APIRouter,
+    Depends,
+    HTTPException,
+    Request,
+    Response,
+    WebSocket,
+    WebSocketDisconnect,
+)
+from fastapi.concurrency import run_in_threadpool
+from fastapi.exceptions import RequestValidationError
+from pydantic import ValidationError
+
+from .. import wire
+from ..admission import AdmissionController
+from ..dedup import checkin_key
+from ..dependencies import get_admission, get_cohorts, get_policy, get_push_hub, get_store
 from ..policy import PolicyEngine
-from ..schemas import CheckinReq, CheckinRes
-from ..store import Store
+from ..push import PushChannel, PushHub
+from ..rings import CohortAssigner
+from ..schemas import CheckinReq, CheckinRes, Health, Ring
+from ..store import Store, parse_ts
 
 router = APIRouter(prefix="/v1", tags=["checkin"])
 
+NEXT_CHECK_SECONDS = 30
+
+
+class _Recorded(NamedTuple):
+    ring: Ring
+    rollout_id: str
+    # Version to apply, or None when the device already runs it.
+    target_version: str | None
+    # ``config_delta`` and, when there is one, ``config_id`` (see :func:`_record`).
+    config: dict[str, str | None]
+
+
+def _inline_schema(schema: object, defs: dict[str, object]) -> object:
+    """Resolve ``$defs`` references so the schema can be embedded in the OpenAPI doc."""
+
+    if isinstance(schema, dict):
+        ref = schema.get("$ref")
+        if isinstance(ref, str):
+            return _inline_schema(defs[ref.rsplit("/", 1)[-1]], defs)
+        return {key: _inline_schema(value, defs) for key, value in schema.items()}
+    if isinstance(schema, list):
+        return [_inline_schema(value, defs) for value in schema]
+    return schema
+
+
+_CHECKIN_SCHEMA = CheckinReq.model_json_schema()
+# The handler reads the raw body to dispatch on content type, so FastAPI cannot infer
+# the request schema; document both encodings explicitly.
+_BODY_DOC = {
+    "requestBody": {
+        "required": True,
+        "content": {
+            "application/json": {
+                "schema": _inline_schema(_CHECKIN_SCHEMA, _CHECKIN_SCHEMA.pop("$defs", {}))
+            },
+            wire.CONTENT_TYPE: {"schema": {"type": "string", "format": "binary"}},
+        },
+    }
+}
+
 
-@router.post("/checkin", response_model=CheckinRes)
-def post_checkin(
-    payload: CheckinReq,
+@router.post("/checkin", response_model=CheckinRes, openapi_extra=_BODY_DOC)
+async def post_checkin(
+    request: Request,
     store: Store = Depends(get_store),
     policy: PolicyEngine = Depends(get_policy),
-) -> CheckinRes:
-    """Record the check-in and return advisory for the simulator."""
+    admission: AdmissionController = Depends(get_admission),
+    cohorts: CohortAssigner = Depends(get_cohorts),
+) -> CheckinRes | Response:
+    """Record the check-in and return advisory for the simulator.
 
-    store.record_checkin(payload)
+    Accepts either a JSON :class:`CheckinReq` or the compact binary encoding from
+    :mod:`app.wire`; binary requests get a binary response.
+    """
 
-    rollout = store.active_rollout()
-    rollout_id = rollout.rollout_id if rollout else ""
-    if rollout and rings.ring_for(rollout.ring_index) == payload.ring:
-        outcome = policy.evaluate_rollout(rollout.rollout_id)
-        ring_label = rings.ring_for(rollout.ring_index)
-        if outcome.auto_rollback:
-            store.update_target_version(rollout.rollout_id, rollout.last_known_good)
-            store.update_ring_index(rollout.rollout_id, max(0, rollout.ring_index - 1))
-            store.update_state(rollout.rollout_id, "active")
-            store.append_event(
-                rollout.rollout_id,
-                policy.build_decision(
-                    "ROLLBACK",
-                    "Auto-rollback: critical SLO breach",
-                    ring_label,
-                    outcome.metrics,
-                ),
-            )
-        elif outcome.breaches:
-            store.update_state(rollout.rollout_id, "paused")
-            store.append_event(
-                rollout.rollout_id,
-                policy.build_decision(
-                    "PAUSE",
-                    "Auto-pause: SLO breach",
-                    ring_label,
-                    outcome.metrics,
-                ),
-            )
-        rollout = store.get_rollout(rollout.rollout_id)
-
-    target_version = rollout.target_version if rollout else payload.sw_version
+    body = await request.body()
+    if request.headers.get("content-type", "").startswith(wire.CONTENT_TYPE):
+        try:
+            checkin = wire.decode_checkin(body)
+        except ValueError as exc:
+            raise HTTPException(status_code=400, detail=str(exc)) from exc
+        _admit(admission, checkin.device_id)
+        # The binary encoding has no room for configs; those devices only get versions.
+        recorded = await run_in_threadpool(
+            _record,
+            store,
+            policy,
+            cohorts,
+            checkin.device_id,
+            checkin.ring,
+            checkin.ts,
+            checkin.health,
+            checkin.sw_version,
+            None,
+            checkin_key(checkin.device_id, repr(checkin.ts.timestamp())),
+        )
+        return Response(
+            wire.encode_response(
+                recorded.rollout_id,
+                recorded.ring,
+                recorded.target_version,
+                NEXT_CHECK_SECONDS,
+            ),
+            media_type=wire.CONTENT_TYPE,
+        )
+
+    try:
+        payload = CheckinReq.model_validate_json(body)
+    except ValidationError as exc:
+        raise RequestValidationError(
+            [{**error, "loc": ("body", *error["loc"])} for error in exc.errors()]
+        ) from exc
+    _admit(admission, payload.device_id)
+    recorded = await run_in_threadpool(
+        _record,
+        store,
+        policy,
+        cohorts,
+        payload.device_id,
+        payload.ring,
+        parse_ts(payload.ts),
+        payload.health,
+        payload.sw_version,
+        payload.last_config,
+        checkin_key(payload.device_id, payload.ts, payload.idempotency_key),
+    )
     return CheckinRes(
-        rollout_id=rollout_id,
-        apply={
-            "target_version": target_version if payload.sw_version != target_version else None,
-            "config_delta": None,
-        },
-        next_check_seconds=30,
+        rollout_id=recorded.rollout_id,
+        ring=recorded.ring,
+        apply={"target_version": recorded.target_version, **recorded.config},
+        next_check_seconds=NEXT_CHECK_SECONDS,
         policy={"backoff": "exp-jitter", "max_retries": "5"},
     )
+
+
+@router.websocket("/checkin/ws")
+async def checkin_socket(
+    websocket: WebSocket,
+    store: Store = Depends(get_store),
+    policy: PolicyEngine = Depends(get_policy),
+    admission: AdmissionController = Depends(get_admission),
+    cohorts: CohortAssigner = Depends(get_cohorts),
+    hub: PushHub = Depends(get_push_hub),
+) -> None:
+    """Long-lived check-in channel.
+
+    The device sends ``CheckinReq`` JSON text frames; each is recorded like an HTTP
+    check-in. After the first one the server pushes ``{"type": "target", ...}`` with the
+    current rollout target for the device's ring, and again whenever it changes.
+    """
+
+    await websocket.accept()
+    channel: PushChannel | None = None
+    sender: asyncio.Task[None] | None = None
+    try:
+        while True:
+            try:
+                payload = CheckinReq.model_validate_json(await websocket.receive_text())
+            except ValidationError as exc:
+                await websocket.send_json(
+                    {"type": "error", "detail": json.loads(exc.json(include_url=False))}
+                )
+                continue
+            try:
+                _admit(admission, payload.device_id)
+                recorded = await run_in_threadpool(
+                    _record,
+                    store,
+                    policy,
+                    cohorts,
+                    payload.device_id,
+                    payload.ring,
+                    parse_ts(payload.ts),
+                    payload.health,
+                    payload.sw_version,
+                    payload.last_config,
+                    checkin_key(payload.device_id, payload.ts, payload.idempotency_key),
+                )
+            except HTTPException as exc:
+                retry_after = (exc.headers or {}).get("Retry-After")
+                await websocket.send_json({"type": "throttled", "retry_after": retry_after})
+                continue
+            if channel is None:
+                channel = hub.subscribe(recorded.ring)
+                sender = asyncio.create_task(_push(websocket, channel))
+            elif channel.ring != recorded.ring:
+                hub.move(channel, recorded.ring)
+    except WebSocketDisconnect:
+        pass
+    finally:
+        if channel is not None:
+            hub.unsubscribe(channel)
+        if sender is not None:
+            sender.cancel()
+            with suppress(asyncio.CancelledError, WebSocketDisconnect, RuntimeError):
+                await sender
+
+
+async def _push(websocket: WebSocket, channel: PushChannel) -> None:
+    while True:
+        await websocket.send_text(await channel.next())
+
+
+def _admit(admission: AdmissionController, device_id: str) -> None:
+    """Reject a check-in with a 429 unless admission control lets it through.
+
+    Runs on the event loop before anything else is done for the check-in, so shedding
+    load costs one bucket update per request. Both a device over its own rate limit and
+    a server shedding load drop the sample; ``Retry-After`` spreads the retries.
+    """
+
+    admitted = admission.admit(device_id)
+    if not admitted.admitted:
+        raise HTTPException(
+            status_code=429,
+            detail=f"Check-in rate limit exceeded ({admitted.scope})",
+            headers={"Retry-After": admitted.retry_after_header},
+        )
+
+
+def _record(
+    store: Store,
+    policy: PolicyEngine,
+    cohorts: CohortAssigner,
+    device_id: str,
+    reported_ring: Ring | None,
+    ts: datetime,
+    health: Health,
+    sw_version: str,
+    last_config: str | None,
+    dedup_key: str,
+) -> _Recorded:
+    """Shared check-in work.
+
+    The config advice holds ``config_delta`` (a serialized JSON merge patch from the
+    device's ``last_config`` to the rollout's target config, or None if it is already
+    there) and, when there is a delta, the ``config_id`` the device reports once it has
+    applied it. A retried check-in (same ``dedup_key``) gets the same answer but adds no
+    sample. Callers run :func:`_admit` first.
+    """
+
+    ring = cohorts.resolve(device_id, reported_ring)
+    if store.record_health(device_id, ring, ts, health, sw_version, last_config, dedup_key):
+        policy.enforce_gates(ring)
+
+    rollout = store.active_rollout()
+    rollout_id = rollout.rollout_id if rollout else ""
+    target_version = rollout.target_version if rollout else sw_version
+    config: dict[str, str | None] = {"config_delta": None}
+    if rollout is not None and rollout.target_config is not None:
+        delta = store.config_delta(last_config, rollout.target_config)
+        if delta is not None:
+            config = {"config_delta": delta, "config_id": rollout.target_config}
+    return _Recorded(
+        ring,
+        rollout_id,
+        target_version if sw_version != target_version else None,
+        config,
+    )
@@ -0,0 +1,35 @@
+"""Central ingest route for pre-aggregated summaries forwarded by edge relays."""
+
+from __future__ import annotations
+
+from fastapi import APIRouter, Depends
+
+from .. import rings
+from ..dependencies import get_policy, get_store
+from ..policy import PolicyEngine
+from ..schemas import IngestRes, SummaryBatch
+from ..store import Store
+
+router = APIRouter(prefix="/v1/ingest", tags=["ingest"])
+
+
+@router.post("/summaries", response_model=IngestRes)
+def post_summaries(
+    batch: SummaryBatch,
+    store: Store = Depends(get_store),
+    policy: PolicyEngine = Depends(get_policy),
+) -> IngestRes:
+    """Merge relay summaries into the ring windows and return the current rollout target."""
+
+    store.record_summaries(batch.summaries)
+    accepted = sum(summary.count for summary in batch.summaries)
+    for ring in {summary.ring for summary in batch.summaries}:
+        policy.enforce_gates(ring)
+
+    rollout = store.active_rollout()
+    return IngestRes(
+        accepted=accepted,
+        rollout_id=rollout.rollout_id if rollout else "",
+        target_version=rollout.target_version if rollout else None,
+        active_ring=rings.ring_for(rollout.ring_index) if rollout else None,
+    )
@@ -1,13 +1,23 @@
-"""Metrics route returning current active ring health."""
+"""Metrics routes returning ring health, the dashboard view and downsampled history."""
 
 from __future__ import annotations
 
-from fastapi import APIRouter, Depends, HTTPException
+from typing import Literal
+
+from fastapi import APIRouter, Depends, HTTPException, Query
 
 from .. import metrics as metrics_helpers
 from .. import rings
 from ..dependencies import get_store
-from ..schemas import MetricsRes
+from ..schemas import (
+	DashboardRes,
+	MetricsHistoryRes,
+	MetricsPoint,
+	MetricsRes,
+	Ring,
+	RingMetrics,
+	VersionMetricsRes,
+)
 from ..store import Store
 
 router = APIRouter(prefix="/v1", tags=["metrics"])
@@ -15,12 +25,13 @@ router = APIRouter(prefix="/v1", tags=["metrics"])
 
 @router.get("/metrics", response_model=MetricsRes)
 def get_metrics(store: Store = Depends(get_store)) -> MetricsRes:
-	rollout = store.active_rollout()
+	view = store.view()
+	rollout = view.active_rollout()
 	if rollout is None:
 		raise HTTPException(status_code=404, detail="No active rollout")
 
 	ring_label = rings.ring_for(rollout.ring_index)
-	window = store.metrics_for_ring(ring_label)
+	window = view.metrics[ring_label]
 	return MetricsRes(
 		active_rollout_id=rollout.rollout_id,
 		active_ring=ring_label,
@@ -30,3 +41,86 @@ def get_metrics(store: Store = Depends(get_store)) -> MetricsRes:
 		checkin_ms_median=window.checkin_ms_median,
 		breaches=window.breaches,
 	)
+
+
+@router.get("/dashboard", response_model=DashboardRes)
+def get_dashboard(store: Store = Depends(get_store)) -> DashboardRes:
+	"""Active rollout, its recent decisions and window metrics for every ring at once."""
+
+	view = store.view()
+	rollout = view.active_rollout()
+	ring_metrics = {}
+	for ring in rings.RINGS:
+		# Real ring aggregates; only the breach list comes from the active rollout's gates.
+		window = view.metrics[ring]
+		gated = view.gate_metrics[ring]
+		ring_metrics[ring] = RingMetrics(
+			total=window.total,
+			boot_success=window.boot_success,
+			crash_free_median=window.crash_free_median,
+			checkin_ms_median=window.checkin_ms_median,
+			breaches=[*gated.breaches, *gated.rollback_breaches],
+		)
+	return DashboardRes(
+		window_seconds=metrics_helpers.WINDOW_SECONDS,
+		active_rollout=rollout,
+		active_ring=rings.ring_for(rollout.ring_index) if rollout is not None else None,
+		decisions=list(view.decisions[rollout.rollout_id]) if rollout is not None else [],
+		rings=ring_metrics,
+	)
+
+
+@router.get("/metrics/versions", response_model=VersionMetricsRes)
+def get_version_metrics(
+	ring: Ring | None = None, store: Store = Depends(get_store)
+) -> VersionMetricsRes:
+	"""Window metrics of ``ring`` (default: the active ring) per reported software version."""
+
+	rollout = store.active_rollout()
+	if ring is None:
+		if rollout is None:
+			raise HTTPException(status_code=404, detail="No active rollout")
+		ring = rings.ring_for(rollout.ring_index)
+	evaluator = rollout.evaluator if rollout is not None else None
+	versions = {}
+	for sw_version, window in store.metrics_by_version(ring, evaluator).items():
+		versions[sw_version] = RingMetrics(
+			total=window.total,
+			boot_success=window.boot_success,
+			crash_free_median=window.crash_free_median,
+			checkin_ms_median=window.checkin_ms_median,
+			breaches=window.breaches,
+		)
+	return VersionMetricsRes(
+		ring=ring,
+		window_seconds=metrics_helpers.WINDOW_SECONDS,
+		target_version=rollout.target_version if rollout is not None else None,
+		versions=versions,
+	)
+
+
+@router.get("/metrics/history", response_model=MetricsHistoryRes)
+def get_metrics_history(
+	ring: Ring,
+	resolution: Literal["10s", "1m", "1h"] = "1m",
+	limit: int | None = Query(default=None, ge=1),
+	store: Store = Depends(get_store),
+) -> MetricsHistoryRes:
+	series = store.rollups.series(ring, resolution)
+	return MetricsHistoryRes(
+		ring=ring,
+		resolution=resolution,
+		step_seconds=series.step_seconds,
+		points=[
+			MetricsPoint(
+				ts=point.start.isoformat(),
+				total=point.total,
+				boot_success=point.boot_success,
+				crash_free_mean=point.crash_free_mean,
+				crash_free_min=point.crash_free_min,
+				checkin_ms_mean=point.checkin_ms_mean,
+				checkin_ms_max=point.checkin_ms_max,
+			)
+			for point in series.points(limit)
+		],
+	)
@@ -2,14 +2,19 @@
 
 from __future__ import annotations
 
-from fastapi import APIRouter, Depends, HTTPException
-from pydantic import BaseModel
+from datetime import UTC, datetime
+from typing import Any, Literal
+
+from fastapi import APIRouter, Depends, HTTPException, Query, Response
+from pydantic import BaseModel, Field
 
 from .. import rings
 from ..dependencies import get_policy, get_store
 from ..policy import PolicyEngine
-from ..schemas import Rollout, RolloutDetail, ShouldPromoteRes
-from ..store import Store
+from ..schemas import DecisionPage, GateSpec, Rollout, RolloutDetail, ShouldPromoteRes
+from ..store import Store, decode_cursor, encode_cursor, parse_ts
+
+MAX_PAGE_SIZE = 1000
 
 router = APIRouter(prefix="/v1/rollouts", tags=["rollouts"])
 
@@ -17,6 +22,10 @@ router = APIRouter(prefix="/v1/rollouts", tags=["rollouts"])
 class RolloutCreate(BaseModel):
 	target_version: str
 	last_known_good: str
+	# Replaces the default SLO and auto-rollback gates for this rollout only.
+	gates: list[GateSpec] | None = Field(default=None, min_length=1)
+	# Config document devices should converge to; delivered as merge-patch deltas.
+	target_config: dict[str, Any] | None = None
 
 
 class ReasonPayload(BaseModel):
@@ -28,20 +37,77 @@ def create_rollout(
     payload: RolloutCreate,
     store: Store = Depends(get_store),
 ) -> Rollout:
-    return store.create_rollout(payload.target_version, payload.last_known_good)
+    config_id = (
+        store.register_config(payload.target_config) if payload.target_config is not None else None
+    )
+    return store.create_rollout(
+        payload.target_version, payload.last_known_good, payload.gates, config_id
+    )
+
+
+def _as_utc(value: datetime | None) -> datetime | None:
+	if value is not None and value.tzinfo is None:
+		return value.replace(tzinfo=UTC)
+	return value
 
 
 @router.get("", response_model=list[Rollout])
-def list_rollouts(store: Store = Depends(get_store)) -> list[Rollout]:
-	return store.list_rollouts()
+def list_rollouts(
+	response: Response,
+	state: Literal["active", "paused", "completed"] | None = None,
+	created_after: datetime | None = None,
+	created_before: datetime | None = None,
+	cursor: str | None = None,
+	limit: int = Query(default=100, ge=1, le=MAX_PAGE_SIZE),
+	store: Store = Depends(get_store),
+) -> list[Rollout]:
+	"""List rollouts oldest first; the next page cursor is sent in ``X-Next-Cursor``."""
+
+	try:
+		after = decode_cursor(cursor) if cursor else None
+	except ValueError as exc:
+		raise HTTPException(status_code=400, detail=str(exc)) from exc
+	page = store.view().list_rollouts(
+		state,
+		after=after,
+		created_after=_as_utc(created_after),
+		created_before=_as_utc(created_before),
+		limit=limit + 1,
+	)
+	if len(page) > limit:
+		page = page[:limit]
+		last = page[-1]
+		response.headers["X-Next-Cursor"] = encode_cursor(
+			(parse_ts(last.created_at), last.rollout_id)
+		)
+	return page
 
 
 @router.get("/{rollout_id}", response_model=RolloutDetail)
 def get_rollout(rollout_id: str, store: Store = Depends(get_store)) -> RolloutDetail:
+	view = store.view()
+	rollout = view.rollouts.get(rollout_id)
+	if rollout is None:
+		raise HTTPException(status_code=404, detail="Rollout not found")
+	return RolloutDetail(rollout=rollout, decisions=list(view.decisions[rollout_id]))
+
+
+@router.get("/{rollout_id}/decisions", response_model=DecisionPage)
+def list_decisions(
+	rollout_id: str,
+	cursor: int = Query(default=0, ge=0),
+	limit: int = Query(default=50, ge=1, le=MAX_PAGE_SIZE),
+	store: Store = Depends(get_store),
+) -> DecisionPage:
+	"""Page through a rollout's full decision history, oldest first."""
+
 	if rollout_id not in store.rollouts:
 		raise HTTPException(status_code=404, detail="Rollout not found")
-	rollout = store.get_rollout(rollout_id)
-	return RolloutDetail(rollout=rollout.to_schema(), decisions=store.rollout_decisions(rollout_id))
+	decisions, next_offset = store.decision_page(rollout_id, cursor, limit)
+	return DecisionPage(
+		decisions=decisions,
+		next_cursor=str(next_offset) if next_offset is not None else None,
+	)
 
 
 @router.post("/{rollout_id}/promote", response_model=Rollout)
@@ -2,11 +2,12 @@
 
 from __future__ import annotations
 
-from typing import Literal
+from typing import Any, Literal
 
-from pydantic import BaseModel, Field
+from pydantic import BaseModel, Field, model_validator
 
 Ring = Literal["pilot", "five", "twentyfive", "all"]
+MAX_ID_LENGTH = 256
 
 
 class Health(BaseModel):
@@ -20,18 +21,31 @@ class Health(BaseModel):
 class CheckinReq(BaseModel):
 	"""Inbound check-in request posted by the simulator or devices."""
 
-	device_id: str
-	ring: Ring
-	sw_version: str
-	last_config: str | None = None
+	# Capped so the write-ahead log's u16 string lengths always fit (see ``app.wal``).
+	device_id: str = Field(max_length=MAX_ID_LENGTH)
+	ring: Ring | None = None
+	sw_version: str = Field(max_length=MAX_ID_LENGTH)
+	last_config: str | None = Field(default=None, max_length=MAX_ID_LENGTH)
 	health: Health
 	ts: str
+	# Same key on every retry of one check-in; defaults to ``device_id|ts`` for dedup.
+	idempotency_key: str | None = Field(default=None, max_length=128)
+
+
+class ConfigReq(BaseModel):
+	config: dict[str, Any]
+
+
+class ConfigRes(BaseModel):
+	config_id: str
+	config: dict[str, Any] | None = None
 
 
 class CheckinRes(BaseModel):
 	"""Standard response advising the device on next steps."""
 
 	rollout_id: str
+	ring: Ring | None = None
 	apply: dict[str, str | None] = Field(
 		default_factory=lambda: {"target_version": None, "config_delta": None}
 	)
@@ -41,6 +55,83 @@ class CheckinRes(BaseModel):
 	)
 
 
+class HistogramState(BaseModel):
+	"""Wire form of a mergeable fixed-resolution histogram (see ``app.sketch``)."""
+
+	resolution: float = Field(gt=0)
+	keys: list[int]
+	counts: list[int]
+	total: float
+	min: float | None = None
+	max: float | None = None
+
+	@model_validator(mode="after")
+	def _check_counts(self) -> HistogramState:
+		if len(self.keys) != len(self.counts):
+			raise ValueError("keys and counts must have the same length")
+		if any(count < 1 for count in self.counts):
+			raise ValueError("bucket counts must be positive")
+		if self.counts and (self.min is None or self.max is None):
+			raise ValueError("non-empty histograms need min and max")
+		if self.min is not None and self.max is not None and self.min > self.max:
+			raise ValueError("min must not exceed max")
+		return self
+
+
+class RingSummary(BaseModel):
+	"""Pre-aggregated health of the check-ins one relay saw for a ring since its last flush."""
+
+	ring: Ring
+	ts: str
+	count: int = Field(ge=1)
+	boot_ok: int = Field(ge=0)
+	crash_free: HistogramState
+	checkin_ms: HistogramState
+
+	@model_validator(mode="after")
+	def _check_totals(self) -> RingSummary:
+		if self.boot_ok > self.count:
+			raise ValueError("boot_ok cannot exceed count")
+		for name in ("crash_free", "checkin_ms"):
+			if sum(getattr(self, name).counts) != self.count:
+				raise ValueError(f"{name} histogram does not sum to count")
+		return self
+
+
+class SummaryBatch(BaseModel):
+	relay_id: str
+	summaries: list[RingSummary]
+
+
+class IngestRes(BaseModel):
+	"""Rollout target the relay caches to answer device check-ins locally."""
+
+	accepted: int
+	rollout_id: str
+	target_version: str | None
+	active_ring: Ring | None
+
+
+class GateSpec(BaseModel):
+	"""Declarative SLO gate; it breaches when ``aggregation(metric) <comparator> threshold``."""
+
+	name: str | None = None
+	metric: Literal["boot_ok", "crash_free", "checkin_ms"]
+	aggregation: Literal["mean", "median", "min", "max", "p90", "p95", "p99"]
+	comparator: Literal["lt", "le", "gt", "ge"]
+	threshold: float
+	severity: Literal["pause", "rollback"] = "pause"
+	# "ring": every sample in the ring window; "target": only samples from devices
+	# already reporting the rollout's target_version (the canary cohort).
+	cohort: Literal["ring", "target"] = "ring"
+
+	@property
+	def key(self) -> str:
+		"""Name of the aggregate this gate reads, e.g. ``crash_free_p99``."""
+
+		return f"{self.metric}_{self.aggregation}"
+
+
 class Rollout(BaseModel):
 	rollout_id: str
 	target_version: str
@@ -48,14 +139,24 @@ class Rollout(BaseModel):
 	state: Literal["active", "paused", "completed"]
 	ring_index: int
 	created_at: str
+	gates: list[GateSpec] | None = None
+	target_config: str | None = None
 
 
 class Decision(BaseModel):
+	"""A decision, or a run of identical consecutive ones (same kind, reason and ring).
+
+	``ts`` and ``snapshot`` are from the latest occurrence; ``first_ts`` and ``count``
+	say how long the run lasted.
+	"""
+
 	ts: str
 	kind: Literal["PROMOTE", "PAUSE", "ROLLBACK", "ADVISE_NO"]
 	reason: str
 	ring: Ring
 	snapshot: dict[str, float]
+	count: int = 1
+	first_ts: str | None = None
 
 
 class MetricsRes(BaseModel):
@@ -68,6 +169,66 @@ class MetricsRes(BaseModel):
 	breaches: list[str]
 
 
+class RingMetrics(BaseModel):
+	total: int
+	boot_success: float
+	crash_free_median: float
+	checkin_ms_median: float
+	breaches: list[str]
+
+
+class VersionMetricsRes(BaseModel):
+	"""Window metrics of one ring split by reported ``sw_version``."""
+
+	ring: Ring
+	window_seconds: int
+	target_version: str | None
+	versions: dict[str, RingMetrics]
+
+
+class DashboardRes(BaseModel):
+	"""Everything the dashboard renders, returned by GET /v1/dashboard."""
+
+	window_seconds: int
+	active_rollout: Rollout | None
+	active_ring: Ring | None
+	decisions: list[Decision]
+	rings: dict[Ring, RingMetrics]
+
+
+class MetricsPoint(BaseModel):
+	"""One downsampled bucket of ring health history."""
+
+	ts: str
+	total: int
+	boot_success: float
+	crash_free_mean: float
+	crash_free_min: float
+	checkin_ms_mean: float
+	checkin_ms_max: float
+
+
+class MetricsHistoryRes(BaseModel):
+	ring: Ring
+	resolution: Literal["10s", "1m", "1h"]
+	step_seconds: int
+	points: list[MetricsPoint]
+
+
+class RingVersions(BaseModel):
+	total: int
+	on_target: int
+	versions: dict[str, int]
+
+
+class FleetVersionsRes(BaseModel):
+	"""Per-ring software version distribution for GET /v1/fleet/versions."""
+
+	total_devices: int
+	target_version: str | None
+	rings: dict[Ring, RingVersions]
+
+
 class RolloutDetail(BaseModel):
 	"""Helper schema for GET /v1/rollouts/{id}."""
 
@@ -75,6 +236,13 @@ class RolloutDetail(BaseModel):
 	decisions: list[Decision]
 
 
+class DecisionPage(BaseModel):
+	"""Page of a rollout's full decision history for GET /v1/rollouts/{id}/decisions."""
+
+	decisions: list[Decision]
+	next_cursor: str | None = None
+
+
 class ShouldPromoteRes(BaseModel):
 	"""Optional advisory endpoint response payload."""
 
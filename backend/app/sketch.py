@@ -0,0 +1,153 @@
+"""Mergeable summaries of check-in health, used by edge relays.
+
+A :class:`Histogram` keeps sparse counts of values rounded to a fixed resolution, plus
+exact count/sum/min/max. Two histograms merge by adding counts, so relays can
+pre-aggregate any number of check-ins and the central node can combine summaries from
+many relays without losing quantile accuracy beyond ``resolution / 2``.
+"""
+
+from __future__ import annotations
+
+import math
+from collections.abc import Iterator
+
+from .schemas import HistogramState, RingSummary
+
+CRASH_FREE_RESOLUTION = 1e-4
+CHECKIN_MS_RESOLUTION = 1.0
+
+
+class Histogram:
+    """Sparse fixed-resolution histogram with exact moments."""
+
+    def __init__(self, resolution: float) -> None:
+        self.resolution = resolution
+        # Decimal places of the resolution, so bucket values print as 0.95, not 0.9500000001.
+        self._digits = max(0, -math.floor(math.log10(resolution)))
+        self.counts: dict[int, int] = {}
+        self.count = 0
+        self.total = 0.0
+        self.min = math.inf
+        self.max = -math.inf
+
+    def add(self, value: float, count: int = 1) -> None:
+        key = round(value / self.resolution)
+        self.counts[key] = self.counts.get(key, 0) + count
+        self.count += count
+        self.total += value * count
+        if value < self.min:
+            self.min = value
+        if value > self.max:
+            self.max = value
+
+    def merge(self, other: Histogram) -> None:
+        if other.resolution != self.resolution:
+            raise ValueError("Cannot merge histograms with different resolutions")
+        for key, count in other.counts.items():
+            self.counts[key] = self.counts.get(key, 0) + count
+        self.count += other.count
+        self.total += other.total
+        self.min = min(self.min, other.min)
+        self.max = max(self.max, other.max)
+
+    def values_at_ranks(self, ranks: list[int]) -> Iterator[float]:
+        """Yield the value at each rank (0-based, ascending ``ranks``) in one sweep."""
+
+        if not ranks:
+            return
+        position = 0
+        seen = 0
+        for key in sorted(self.counts):
+            seen += self.counts[key]
+            while position < len(ranks) and ranks[position] < seen:
+                yield min(max(round(key * self.resolution, self._digits), self.min), self.max)
+                position += 1
+            if position == len(ranks):
+                return
+
+    def to_state(self) -> HistogramState:
+        keys = sorted(self.counts)
+        return HistogramState(
+            resolution=self.resolution,
+            keys=keys,
+            counts=[self.counts[key] for key in keys],
+            total=self.total,
+            min=self.min if self.count else None,
+            max=self.max if self.count else None,
+        )
+
+    @classmethod
+    def from_state(cls, state: HistogramState) -> Histogram:
+        histogram = cls(state.resolution)
+        histogram.counts = dict(zip(state.keys, state.counts, strict=True))
+        histogram.count = sum(state.counts)
+        histogram.total = state.total
+        if state.min is not None and state.max is not None:
+            histogram.min, histogram.max = state.min, state.max
+        return histogram
+
+
+class RingAggregate:
+    """Everything a relay keeps about one ring between two flushes."""
+
+    def __init__(self) -> None:
+        self.count = 0
+        self.boot_ok = 0
+        self.crash_free = Histogram(CRASH_FREE_RESOLUTION)
+        self.checkin_ms = Histogram(CHECKIN_MS_RESOLUTION)
+        self.last_ts: str | None = None
+
+    def add(self, boot_ok: bool, crash_free: float, checkin_ms: int, ts: str) -> None:
+        self.count += 1
+        self.boot_ok += boot_ok
+        self.crash_free.add(crash_free)
+        self.checkin_ms.add(checkin_ms)
+        if self.last_ts is None or ts > self.last_ts:
+            self.last_ts = ts
+
+    def merge(self, other: RingAggregate) -> None:
+        self.count += other.count
+        self.boot_ok += other.boot_ok
+        self.crash_free.merge(other.crash_free)
+        self.checkin_ms.merge(other.checkin_ms)
+        if other.last_ts is not None and (self.last_ts is None or other.last_ts > self.last_ts):
+            self.last_ts = other.last_ts
+
+    def to_summary(self, ring: str) -> RingSummary:
+        return RingSummary(
+            ring=ring,  # type: ignore[arg-type]
+            ts=self.last_ts or "",
+            count=self.count,
+            boot_ok=self.boot_ok,
+            crash_free=self.crash_free.to_state(),
+            checkin_ms=self.checkin_ms.to_state(),
+        )
+
+
+def expand(summary: RingSummary, limit: int) -> Iterator[tuple[bool, float, int]]:
+    """Turn a summary into at most ``limit`` representative ``(boot_ok, crash_free, ms)``.
+
+    Samples sit at evenly spaced ranks of each histogram, visited in a strided order and
+    with boot failures spread evenly, so any contiguous run of them (what survives when a
+    ring window evicts its oldest entries) has roughly the summary's distribution.
+    """
+
+    count = min(summary.count, limit)
+    if count <= 0:
+        return
+    ranks = [(idx * summary.count) // count for idx in range(count)]
+    crash = list(Histogram.from_state(summary.crash_free).values_at_ranks(ranks))
+    latency = list(Histogram.from_state(summary.checkin_ms).values_at_ranks(ranks))
+    failures = round((summary.count - summary.boot_ok) * count / summary.count)
+    stride = _coprime_stride(count)
+    for idx in range(count):
+        position = (idx * stride) % count
+        failed = (idx + 1) * failures // count > idx * failures // count
+        yield not failed, crash[position], int(latency[position])
+
+
+def _coprime_stride(count: int) -> int:
+    stride = max(1, round(count * 0.618))
+    while math.gcd(stride, count) != 1:
+        stride += 1
+    return stride
@@ -2,17 +2,61 @@
 
 from __future__ import annotations
 
+import base64
+import binascii
+import functools
+import json
+import os
+import threading
+from bisect import bisect_left, bisect_right, insort
 from collections import deque
+from collections.abc import Callable, Mapping, Sequence
 from dataclasses import dataclass, field
 from datetime import UTC, datetime, timedelta
+from types import MappingProxyType
+from typing import Concatenate, ParamSpec, TypeVar
 from uuid import uuid4
 
-from . import metrics, rings
-from .schemas import CheckinReq, Decision, Health, Ring, Rollout
+from . import metrics, rings, sketch, wal
+from .changepoint import RingShiftDetector
+from .clock import SYSTEM_CLOCK, Clock
+from .configs import ConfigRegistry
+from .dedup import RotatingBloomFilter, checkin_key
+from .fleet import DeviceRegistry
+from .rollups import MetricsRollups
+from .schemas import CheckinReq, Decision, GateSpec, Health, Ring, RingSummary, Rollout
 
 WINDOW_SECONDS = metrics.WINDOW_SECONDS
 MAX_WINDOW_LEN = 1200
+# Window samples one relay batch may expand into, per ring (see ``record_summaries``).
+MAX_SUMMARY_SAMPLES = MAX_WINDOW_LEN // 2
 MAX_DECISIONS = 10
+# Retained global events; older ones drop. Rollout decision history is kept in full
+# (coalescing repeated decisions is what bounds it).
+MAX_EVENTS = 1000
+# Device clocks may run this far ahead; later check-in times are clamped to it.
+MAX_CLOCK_SKEW = timedelta(seconds=60)
+# Cohort for samples whose software version is not known (relay summaries, old snapshots).
+UNKNOWN_VERSION = "unknown"
+
+
+_P = ParamSpec("_P")
+_R = TypeVar("_R")
+
+
+def _locked(method: Callable[Concatenate[Store, _P], _R]) -> Callable[Concatenate[Store, _P], _R]:
+    """Run a Store method under the store's write lock.
+
+    Mutations need it, and so does anything that prunes or iterates live windows: pruning
+    mutates them, and check-ins append to them from the threadpool.
+    """
+
+    @functools.wraps(method)
+    def wrapper(self: Store, *args: _P.args, **kwargs: _P.kwargs) -> _R:
+        with self._write_lock:
+            return method(self, *args, **kwargs)
+
+    return wrapper
 
 
 def utcnow() -> datetime:
@@ -40,47 +84,426 @@ class RolloutState:
     created_at: datetime
     last_promote_ts: datetime | None = None
     last_pause_ts: datetime | None = None
-    decisions: deque[Decision] = field(default_factory=lambda: deque(maxlen=MAX_DECISIONS))
+    decisions: list[Decision] = field(default_factory=list)
+    gates: list[GateSpec] | None = None
+    # Id of the config devices should converge to (see app/configs.py), if any.
+    target_config: str | None = None
+    _schema: Rollout | None = field(default=None, repr=False, compare=False)
+    _evaluator: metrics.GateEvaluator | None = field(default=None, repr=False, compare=False)
+    _target_evaluator: metrics.GateEvaluator | None = field(
+        default=None, repr=False, compare=False
+    )
 
     def to_schema(self) -> Rollout:
-        return Rollout(
-            rollout_id=self.rollout_id,
-            target_version=self.target_version,
-            last_known_good=self.last_known_good,
-            state=self.state,  # type: ignore[arg-type]
-            ring_index=self.ring_index,
-            created_at=self.created_at.isoformat(),
-        )
+        """Return the API view, cached until the next mutation of this rollout."""
+
+        if self._schema is None:
+            self._schema = Rollout(
+                rollout_id=self.rollout_id,
+                target_version=self.target_version,
+                last_known_good=self.last_known_good,
+                state=self.state,  # type: ignore[arg-type]
+                ring_index=self.ring_index,
+                created_at=self.created_at.isoformat(),
+                gates=self.gates,
+                target_config=self.target_config,
+            )
+        return self._schema
+
+    @property
+    def evaluator(self) -> metrics.GateEvaluator | None:
+        """Compiled per-rollout gates, or None when the rollout uses the defaults.
+
+        The default auto-rollback gates are included unless the rollout declares its own.
+        """
+
+        if self._evaluator is None and self.gates is not None:
+            self._evaluator = metrics.GateEvaluator(
+                [gate for gate in metrics.with_rollback_gates(self.gates) if gate.cohort == "ring"]
+            )
+        return self._evaluator
+
+    @property
+    def target_evaluator(self) -> metrics.GateEvaluator | None:
+        """Compiled gates on the target-version cohort, or None when there are none."""
+
+        if self._target_evaluator is None and self.gates is not None:
+            target_gates = [gate for gate in self.gates if gate.cohort == "target"]
+            if target_gates:
+                self._target_evaluator = metrics.GateEvaluator(target_gates)
+        return self._target_evaluator
+
+    @property
+    def index_key(self) -> tuple[datetime, str]:
+        return (self.created_at, self.rollout_id)
+
+
+def encode_cursor(key: tuple[datetime, str]) -> str:
+    """Opaque pagination cursor for a ``(created_at, rollout_id)`` index key."""
+
+    raw = f"{key[0].isoformat()}|{key[1]}".encode()
+    return base64.urlsafe_b64encode(raw).decode().rstrip("=")
+
+
+def decode_cursor(cursor: str) -> tuple[datetime, str]:
+    """Inverse of :func:`encode_cursor`; raises ValueError on malformed input."""
+
+    try:
+        raw = base64.urlsafe_b64decode(cursor + "=" * (-len(cursor) % 4)).decode()
+        created_at, rollout_id = raw.split("|", 1)
+        after = datetime.fromisoformat(created_at)
+        if after.tzinfo is None:
+            raise ValueError("cursor time has no timezone")
+        return after, rollout_id
+    except (binascii.Error, UnicodeDecodeError, ValueError) as exc:
+        raise ValueError(f"Invalid cursor {cursor!r}") from exc
+
+
+@dataclass
+class VersionCohort:
+    """Samples of one ``sw_version`` within a ring window, with a running boot_ok count.
+
+    Entries are the same tuples held by the ring window, in the same order, so the
+    cohort's oldest sample is always the next one of its version the window drops.
+    """
+
+    samples: deque[tuple[datetime, Health]] = field(default_factory=deque)
+    boot_ok: int = 0
+    _metrics: dict[metrics.GateEvaluator | None, metrics.WindowMetrics] = field(
+        default_factory=dict, repr=False
+    )
+
+    def add(self, entry: tuple[datetime, Health]) -> None:
+        self.samples.append(entry)
+        self.boot_ok += entry[1].boot_ok
+        if self._metrics:
+            self._metrics.clear()
+
+    def pop_oldest(self) -> None:
+        self.boot_ok -= self.samples.popleft()[1].boot_ok
+        if self._metrics:
+            self._metrics.clear()
+
+    @property
+    def boot_success(self) -> float:
+        return self.boot_ok / len(self.samples) if self.samples else 1.0
+
+    def window_metrics(self, evaluator: metrics.GateEvaluator | None) -> metrics.WindowMetrics:
+        """Metrics over this cohort only, memoized until it next changes."""
+
+        result = self._metrics.get(evaluator)
+        if result is None:
+            result = metrics.compute_window_metrics(
+                [health for _, health in self.samples], evaluator
+            )
+            self._metrics[evaluator] = result
+        return result
+
+
+@dataclass(frozen=True, slots=True)
+class ReadView:
+    """Immutable published copy of what the read endpoints serve (see :meth:`Store.view`).
+
+    Everything in it is shared with the next view unless it changed in between. It must
+    therefore never be mutated. The ``Rollout`` and ``Decision`` models it holds are
+    never mutated by the store either; the store replaces them instead.
+    """
+
+    published_at: float
+    active_rollout_id: str | None
+    rollouts: Mapping[str, Rollout]
+    # Latest ``MAX_DECISIONS`` decisions per rollout, oldest first.
+    decisions: Mapping[str, tuple[Decision, ...]]
+    by_created: tuple[tuple[datetime, str], ...]
+    by_state: Mapping[str, tuple[tuple[datetime, str], ...]]
+    # Window metrics per ring under the fleet SLO gates and under the active rollout's.
+    metrics: Mapping[Ring, metrics.WindowMetrics]
+    gate_metrics: Mapping[Ring, metrics.WindowMetrics]
+
+    def active_rollout(self) -> Rollout | None:
+        if self.active_rollout_id is None:
+            return None
+        return self.rollouts.get(self.active_rollout_id)
+
+    def list_rollouts(
+        self,
+        state: str | None = None,
+        *,
+        after: tuple[datetime, str] | None = None,
+        created_after: datetime | None = None,
+        created_before: datetime | None = None,
+        limit: int | None = None,
+    ) -> list[Rollout]:
+        """Same as :meth:`Store.list_rollouts`, over the published indexes."""
+
+        index = self.by_created if state is None else self.by_state.get(state, ())
+        return [
+            self.rollouts[rollout_id]
+            for _, rollout_id in _index_slice(index, after, created_after, created_before, limit)
+        ]
 
 
 class Store:
     """Owns rollout state, health windows, and decision log."""
 
-    def __init__(self) -> None:
+    def __init__(
+        self,
+        journal: wal.Journal | None = None,
+        clock: Clock = SYSTEM_CLOCK,
+        dedup: RotatingBloomFilter | None = None,
+        publish_interval: float = 0.0,
+        max_window_len: int = MAX_WINDOW_LEN,
+    ) -> None:
+        self.clock = clock
+        # Minimum age before readers get a fresh ReadView; 0 publishes on every read.
+        self.publish_interval = publish_interval
+        self._view: ReadView | None = None
+        # Held by every journaled mutation (check-ins run in the threadpool), so a record
+        # reaches the WAL and live state together and snapshots see both or neither.
+        self._write_lock = threading.RLock()
+        # Rollouts changed since the last published view.
+        self._dirty_rollouts: set[str] = set()
+        # Optional filter that drops retried check-ins (see app/dedup.py).
+        self.dedup = dedup
         self.rollouts: dict[str, RolloutState] = {}
+        # Secondary indexes, kept sorted by (created_at, rollout_id).
+        self._by_created: list[tuple[datetime, str]] = []
+        self._by_state: dict[str, list[tuple[datetime, str]]] = {}
         self._active_rollout_id: str | None = None
         self.events: list[Decision] = []
+        # Rollout the last entry of ``events`` belongs to; runs never span rollouts.
+        self._last_event_rollout_id: str | None = None
+        # ``max_window_len`` above the default is for benchmarks of larger windows.
         self._health_windows: dict[Ring, deque[tuple[datetime, Health]]] = {
-            ring: deque(maxlen=MAX_WINDOW_LEN) for ring in rings.RINGS
+            ring: deque(maxlen=max_window_len) for ring in rings.RINGS
         }
+        # Per-ring samples grouped by reported sw_version, kept in step with the window.
+        self._cohorts: dict[Ring, dict[str, VersionCohort]] = {ring: {} for ring in rings.RINGS}
+        # Live check-ins only: relay summaries expand into sorted samples and WAL replay
+        # is not a live stream, so neither feeds the detectors.
+        self.shift_detectors = {
+            ring: RingShiftDetector(metrics.AUTO_ROLLBACK_CRASH, metrics.AUTO_ROLLBACK_BOOT)
+            for ring in rings.RINGS
+        }
+        # Bumped whenever a ring window gains or loses samples; keys the metrics memo.
+        self._ring_versions: dict[Ring, int] = {ring: 0 for ring in rings.RINGS}
+        self._metrics_cache: dict[
+            Ring, tuple[int, dict[metrics.GateEvaluator | None, metrics.WindowMetrics]]
+        ] = {}
+        self.rollups = MetricsRollups()
+        self.fleet = DeviceRegistry()
+        self.configs = ConfigRegistry()
+        self._journaled_configs: set[str] = set()
+        self.journal = journal
+        self._rollout_listeners: list[Callable[[RolloutState], None]] = []
+
+    @classmethod
+    def open(
+        cls,
+        data_dir: str | os.PathLike[str],
+        clock: Clock = SYSTEM_CLOCK,
+        dedup: RotatingBloomFilter | None = None,
+        publish_interval: float = 0.0,
+        **journal_options: object,
+    ) -> Store:
+        """Recover a store from ``data_dir`` and journal every further mutation there.
+
+        Loads the newest snapshot and replays only the WAL tail written after it.
+        """
+
+        journal = wal.Journal(data_dir, **journal_options)  # type: ignore[arg-type]
+        store = cls(clock=clock, dedup=dedup, publish_interval=publish_interval)
+        snapshot, records = journal.load()
+        if snapshot is not None:
+            store._restore_snapshot(snapshot)
+        for op, payload in records:
+            store._replay(op, payload)
+        journal.open_for_append()
+        store.journal = journal
+        if journal.snapshot_due():
+            store.write_snapshot()
+        return store
 
 	# ------------------------------------------------------------------
 	# Health window helpers
 	# ------------------------------------------------------------------
-    def record_checkin(self, payload: CheckinReq) -> None:
-        ts = parse_ts(payload.ts)
-        window = self._health_windows[payload.ring]
-        window.append((ts, payload.health))
-        self._prune_ring(payload.ring)
+    def record_checkin(self, payload: CheckinReq, ring: Ring | None = None) -> bool:
+        """Append the check-in's health to its ring window.
+
+        ``ring`` overrides the device-reported ring (server-side cohort assignment).
+        Returns False if the check-in was dropped as a retry of one already recorded.
+        """
+
+        ring = ring or payload.ring
+        if ring is None:
+            raise ValueError(f"No ring for check-in from {payload.device_id}")
+        return self.record_health(
+            payload.device_id,
+            ring,
+            parse_ts(payload.ts),
+            payload.health,
+            payload.sw_version,
+            payload.last_config,
+            dedup_key=checkin_key(payload.device_id, payload.ts, payload.idempotency_key),
+        )
+
+    @_locked
+    def record_health(
+        self,
+        device_id: str,
+        ring: Ring,
+        ts: datetime,
+        health: Health,
+        sw_version: str,
+        last_config: str | None = None,
+        dedup_key: str | None = None,
+    ) -> bool:
+        """Record already-decoded check-in fields (used by the binary wire protocol).
+
+        With a ``dedup_key`` and a dedup filter configured, a key seen recently is a retry:
+        nothing is recorded and False is returned.
+        """
+
+        if dedup_key is not None and self.dedup is not None and not self.dedup.add(dedup_key):
+            return False
+        ts = self._clamp_ts(ts)
+        ring_index = rings.index_for(ring)
+        if self.journal is not None:
+            self.journal.append(
+                wal.OP_CHECKIN,
+                wal.encode_checkin(
+                    ring_index,
+                    ts.timestamp(),
+                    health.boot_ok,
+                    health.crash_free,
+                    health.checkin_ms,
+                    (device_id, sw_version, last_config),
+                ),
+            )
+        self._append_sample(ring, ts, health, sw_version)
+        self.shift_detectors[ring].update(health)
+        self.fleet.observe(device_id, ring_index, sw_version, last_config)
+        self._maybe_snapshot()
+        self._maybe_publish()
+        return True
+
+    @_locked
+    def record_summaries(self, summaries: Sequence[RingSummary]) -> int:
+        """Merge a relay batch into the ring windows; returns how many samples were added.
+
+        Each ring's summaries share ``MAX_SUMMARY_SAMPLES`` representative samples, split
+        in proportion to their counts. Below the budget every check-in becomes one sample,
+        so relays and direct check-ins weigh the same. Above it, the relays keep their
+        weights relative to each other and one large flush can still only replace half
+        of a full window.
+        """
+
+        totals: dict[Ring, int] = {}
+        for summary in summaries:
+            totals[summary.ring] = totals.get(summary.ring, 0) + summary.count
+        added = 0
+        for summary in summaries:
+            total = totals[summary.ring]
+            limit = summary.count
+            if total > MAX_SUMMARY_SAMPLES:
+                limit = max(1, round(MAX_SUMMARY_SAMPLES * summary.count / total))
+            added += self._record_summary(summary, limit)
+        self._maybe_snapshot()
+        self._maybe_publish()
+        return added
+
+    @_locked
+    def record_summary(self, summary: RingSummary, limit: int = MAX_SUMMARY_SAMPLES) -> int:
+        """Merge one relay summary, expanded into at most ``limit`` representative samples.
+
+        Returns how many were added.
+        """
+
+        added = self._record_summary(summary, limit)
+        self._maybe_snapshot()
+        self._maybe_publish()
+        return added
+
+    def _record_summary(self, summary: RingSummary, limit: int) -> int:
+        ts = self._clamp_ts(parse_ts(summary.ts)) if summary.ts else self.clock.now()
+        ring_index = rings.index_for(summary.ring)
+        added = 0
+        for boot_ok, crash_free, checkin_ms in sketch.expand(summary, limit):
+            if self.journal is not None:
+                self.journal.append(
+                    wal.OP_CHECKIN,
+                    wal.encode_checkin(ring_index, ts.timestamp(), boot_ok, crash_free, checkin_ms),
+                )
+            self._append_sample(
+                summary.ring,
+                ts,
+                Health.model_construct(
+                    boot_ok=boot_ok, crash_free=crash_free, checkin_ms=checkin_ms
+                ),
+            )
+            added += 1
+        return added
+
+    def _clamp_ts(self, ts: datetime) -> datetime:
+        """Cap a device-reported time at ``now + MAX_CLOCK_SKEW``.
+
+        A fast clock would otherwise keep its samples in the window past their time and
+        move the persisted rollup head ahead, aging out the real history.
+        """
+
+        return min(ts, self.clock.now() + MAX_CLOCK_SKEW)
+
+    def _append_sample(
+        self, ring: Ring, ts: datetime, health: Health, sw_version: str = UNKNOWN_VERSION
+    ) -> None:
+        window = self._health_windows[ring]
+        entry = (ts, health)
+        if len(window) == window.maxlen:
+            self._forget(ring, window[0])  # about to be evicted by the append
+        window.append(entry)
+        cohort = self._cohorts[ring].get(sw_version)
+        if cohort is None:
+            cohort = self._cohorts[ring][sw_version] = VersionCohort()
+        cohort.add(entry)
+        self._ring_versions[ring] += 1
+        self.rollups.add(ring, ts, health)
+        self._prune_ring(ring)
+
+    def _add_to_cohort(self, ring: Ring, sw_version: str, entry: tuple[datetime, Health]) -> None:
+        cohort = self._cohorts[ring].get(sw_version)
+        if cohort is None:
+            cohort = self._cohorts[ring][sw_version] = VersionCohort()
+        cohort.add(entry)
+
+    def _forget(self, ring: Ring, entry: tuple[datetime, Health]) -> None:
+        """Drop ``entry`` (the window's oldest) from its version cohort."""
+
+        cohorts = self._cohorts[ring]
+        for sw_version, cohort in cohorts.items():
+            if cohort.samples and cohort.samples[0] is entry:
+                cohort.pop_oldest()
+                if not cohort.samples:
+                    del cohorts[sw_version]
+                return
 
     def _prune_ring(self, ring: Ring, now: datetime | None = None) -> None:
         if now is None:
-            now = utcnow()
+            now = self.clock.now()
         cutoff = now - timedelta(seconds=WINDOW_SECONDS)
         window = self._health_windows[ring]
-        while window and window[0][0] < cutoff:
-            window.popleft()
+        if window and window[0][0] < cutoff:
+            self._ring_versions[ring] += 1
+            while window and window[0][0] < cutoff:
+                self._forget(ring, window.popleft())
 
+    @_locked
+    def ring_window(self, ring: Ring) -> tuple[tuple[datetime, Health], ...]:
+        """Point-in-time copy of a ring window (bounded by ``MAX_WINDOW_LEN``)."""
+
+        self._prune_ring(ring)
+        return tuple(self._health_windows[ring])
+
+    @_locked
     def current_ring_events(self, ring: Ring) -> list[Health]:
         self._prune_ring(ring)
         return [health for _, health in self._health_windows[ring]]
@@ -88,9 +511,18 @@ class Store:
 	# ------------------------------------------------------------------
 	# Rollout helpers
 	# ------------------------------------------------------------------
-    def create_rollout(self, target_version: str, last_known_good: str) -> Rollout:
+    @_locked
+    def create_rollout(
+        self,
+        target_version: str,
+        last_known_good: str,
+        gates: Sequence[GateSpec] | None = None,
+        target_config: str | None = None,
+    ) -> Rollout:
+        if target_config is not None and target_config not in self.configs.configs:
+            raise KeyError(f"Unknown config {target_config}")
         rollout_id = f"r-{uuid4().hex[:8]}"
-        now = utcnow()
+        now = self.clock.now()
         rollout = RolloutState(
             rollout_id=rollout_id,
             target_version=target_version,
@@ -98,38 +530,126 @@ class Store:
             state="active",
             ring_index=0,
             created_at=now,
+            gates=list(gates) if gates is not None else None,
+            target_config=target_config,
+        )
+        self._log(
+            wal.OP_CREATE_ROLLOUT,
+            {
+                "rollout_id": rollout_id,
+                "target_version": target_version,
+                "last_known_good": last_known_good,
+                "created_at": now.isoformat(),
+                "gates": _dump_gates(rollout.gates),
+                "target_config": target_config,
+            },
         )
-        self.rollouts[rollout_id] = rollout
+        self._insert_rollout(rollout)
         self._active_rollout_id = rollout_id
+        self._notify_rollout(rollout)
         return rollout.to_schema()
 
+    @_locked
+    def register_config(self, config: dict[str, object]) -> str:
+        """Store a config document and return its content id (idempotent)."""
+
+        config_id = self.configs.register(config)
+        if self.journal is not None and config_id not in self._journaled_configs:
+            self._log(wal.OP_CONFIG, config)
+        self._journaled_configs.add(config_id)
+        return config_id
+
+    def config_delta(self, last_config: str | None, target_config: str) -> str | None:
+        """Serialized merge patch taking a device from ``last_config`` to the target."""
+
+        return self.configs.delta(last_config, target_config)
+
+    def _insert_rollout(self, rollout: RolloutState) -> None:
+        self.rollouts[rollout.rollout_id] = rollout
+        self._dirty_rollouts.add(rollout.rollout_id)
+        insort(self._by_created, rollout.index_key)
+        insort(self._by_state.setdefault(rollout.state, []), rollout.index_key)
+
+    @property
+    def active_rollout_id(self) -> str | None:
+        return self._active_rollout_id
+
     def active_rollout(self) -> RolloutState | None:
         if self._active_rollout_id is None:
             return None
         return self.rollouts.get(self._active_rollout_id)
 
+    @_locked
     def set_active_rollout(self, rollout_id: str) -> None:
         if rollout_id not in self.rollouts:
             raise KeyError(f"Unknown rollout_id {rollout_id}")
+        self._log(wal.OP_SET_ACTIVE, rollout_id)
         self._active_rollout_id = rollout_id
+        self._notify_rollout(self.rollouts[rollout_id])
+
+    def add_rollout_listener(self, listener: Callable[[RolloutState], None]) -> None:
+        """Call ``listener(rollout)`` after every rollout mutation, on the mutating thread."""
+
+        self._rollout_listeners.append(listener)
+
+    def _notify_rollout(self, rollout: RolloutState) -> None:
+        self._dirty_rollouts.add(rollout.rollout_id)
+        for listener in self._rollout_listeners:
+            listener(rollout)
+        self._maybe_publish()
 
     def get_rollout(self, rollout_id: str) -> RolloutState:
         return self.rollouts[rollout_id]
 
-    def list_rollouts(self) -> list[Rollout]:
-        return [rollout.to_schema() for rollout in self.rollouts.values()]
+    def list_rollouts(
+        self,
+        state: str | None = None,
+        *,
+        after: tuple[datetime, str] | None = None,
+        created_after: datetime | None = None,
+        created_before: datetime | None = None,
+        limit: int | None = None,
+    ) -> list[Rollout]:
+        """Return rollouts ordered by creation time, using the secondary indexes.
+
+        ``after`` is an index key (see :func:`decode_cursor`) to resume from; the cost is
+        O(log n + page size) regardless of how many rollouts are stored.
+        """
 
+        index = self._by_created if state is None else self._by_state.get(state, [])
+        return [
+            self.rollouts[rollout_id].to_schema()
+            for _, rollout_id in _index_slice(index, after, created_after, created_before, limit)
+        ]
+
+    @_locked
     def update_ring_index(self, rollout_id: str, new_index: int) -> None:
         rollout = self.get_rollout(rollout_id)
+        self._log(wal.OP_RING_INDEX, [rollout_id, new_index])
         rollout.ring_index = new_index
+        rollout._schema = None
+        self._notify_rollout(rollout)
 
+    @_locked
     def update_state(self, rollout_id: str, state: str) -> None:
         rollout = self.get_rollout(rollout_id)
+        if state == rollout.state:
+            return  # e.g. auto-pause re-asserted on every check-in during a breach
+        self._log(wal.OP_STATE, [rollout_id, state])
+        previous = self._by_state[rollout.state]
+        del previous[bisect_left(previous, rollout.index_key)]
+        insort(self._by_state.setdefault(state, []), rollout.index_key)
         rollout.state = state
+        rollout._schema = None
+        self._notify_rollout(rollout)
 
+    @_locked
     def update_target_version(self, rollout_id: str, target_version: str) -> None:
         rollout = self.get_rollout(rollout_id)
+        self._log(wal.OP_TARGET_VERSION, [rollout_id, target_version])
         rollout.target_version = target_version
+        rollout._schema = None
+        self._notify_rollout(rollout)
 
     def promote_cooldown_ready(
         self, rollout_id: str, cooldown_seconds: int, now: datetime | None = None
@@ -139,19 +659,37 @@ class Store:
         if last_promote is None:
             return True
         if now is None:
-            now = utcnow()
+            now = self.clock.now()
         return (now - last_promote).total_seconds() >= cooldown_seconds
 
 	# ------------------------------------------------------------------
 	# Decisions and events
 	# ------------------------------------------------------------------
+    @_locked
     def append_event(
         self, rollout_id: str, decision: Decision, *, include_rollout_history: bool = True
     ) -> None:
         rollout = self.get_rollout(rollout_id)
+        self._log(
+            wal.OP_EVENT,
+            {
+                "rollout_id": rollout_id,
+                "include_rollout_history": include_rollout_history,
+                "decision": decision.model_dump(),
+            },
+            # Auto-pauses repeat on every check-in while a breach lasts: batch their fsyncs.
+            durable=False,
+        )
         if include_rollout_history:
-            rollout.decisions.append(decision)
-        self.events.append(decision)
+            _append_coalesced(rollout.decisions, decision)
+            self._dirty_rollouts.add(rollout_id)
+            self._maybe_publish()
+        if self._last_event_rollout_id == rollout_id:
+            _append_coalesced(self.events, decision)
+        else:
+            self.events.append(decision)
+            self._last_event_rollout_id = rollout_id
+        _trim(self.events, MAX_EVENTS)
 
         if not include_rollout_history:
             return
@@ -162,15 +700,167 @@ class Store:
         elif decision.kind == "PAUSE":
             rollout.last_pause_ts = ts
 
-    def rollout_decisions(self, rollout_id: str) -> list[Decision]:
+    def rollout_decisions(self, rollout_id: str, limit: int = MAX_DECISIONS) -> list[Decision]:
+        """Return the latest ``limit`` decisions of a rollout, oldest first."""
+
         rollout = self.get_rollout(rollout_id)
-        return list(rollout.decisions)
+        return rollout.decisions[-limit:] if limit > 0 else []
+
+    def decision_page(
+        self, rollout_id: str, offset: int = 0, limit: int = 50
+    ) -> tuple[list[Decision], int | None]:
+        """Page through the full decision history; returns the next offset or None."""
+
+        decisions = self.get_rollout(rollout_id).decisions
+        end = offset + limit
+        return decisions[offset:end], end if end < len(decisions) else None
 
 	# ------------------------------------------------------------------
 	# Utilities
 	# ------------------------------------------------------------------
-    def metrics_for_ring(self, ring: Ring) -> metrics.WindowMetrics:
-        return metrics.compute_window_metrics(self.current_ring_events(ring))
+    @_locked
+    def metrics_for_ring(
+        self, ring: Ring, evaluator: metrics.GateEvaluator | None = None
+    ) -> metrics.WindowMetrics:
+        """Window metrics for ``ring``, memoized until the ring window next changes.
+
+        The returned object is shared between callers and must not be mutated.
+        """
+
+        self._prune_ring(ring)
+        version = self._ring_versions[ring]
+        cached = self._metrics_cache.get(ring)
+        if cached is None or cached[0] != version:
+            cached = (version, {})
+            self._metrics_cache[ring] = cached
+        results = cached[1]
+        result = results.get(evaluator)
+        if result is None:
+            result = metrics.compute_window_metrics(
+                [health for _, health in self._health_windows[ring]], evaluator
+            )
+            results[evaluator] = result
+        return result
+
+    @_locked
+    def metrics_for_version(
+        self, ring: Ring, sw_version: str, evaluator: metrics.GateEvaluator | None = None
+    ) -> metrics.WindowMetrics:
+        """Window metrics over only the ``ring`` samples reporting ``sw_version``.
+
+        Reads that version's cohort, never the rest of the window; memoized like
+        :meth:`metrics_for_ring` and likewise shared, so it must not be mutated.
+        """
+
+        self._prune_ring(ring)
+        cohort = self._cohorts[ring].get(sw_version)
+        if cohort is None:
+            return metrics.compute_window_metrics([], evaluator)
+        return cohort.window_metrics(evaluator)
+
+    @_locked
+    def metrics_by_version(
+        self, ring: Ring, evaluator: metrics.GateEvaluator | None = None
+    ) -> dict[str, metrics.WindowMetrics]:
+        """:meth:`metrics_for_version` for every version reporting in ``ring``, in one pass."""
+
+        self._prune_ring(ring)
+        return {
+            sw_version: cohort.window_metrics(evaluator)
+            for sw_version, cohort in sorted(self._cohorts[ring].items())
+        }
+
+    @_locked
+    def version_cohorts(self, ring: Ring) -> dict[str, VersionCohort]:
+        """Per-version cohorts of ``ring`` (read-only), e.g. for their counts.
+
+        The dict is a copy; the cohorts themselves are live, so read them under the
+        write lock or use :meth:`metrics_by_version`.
+        """
+
+        self._prune_ring(ring)
+        return dict(self._cohorts[ring])
+
+    def view(self) -> ReadView:
+        """The latest published :class:`ReadView`.
+
+        Writers republish it: check-ins at most once per ``publish_interval``, rollout
+        changes and decisions immediately. A read normally just returns it. Only a view
+        older than the interval (e.g. after a quiet spell, when samples may have aged out)
+        is rebuilt, once, under the write lock. With ``publish_interval`` 0 that happens on
+        every read, which keeps reads fresh at the cost of a rebuild each time.
+        """
+
+        view = self._view
+        if view is not None and self._is_fresh(view):
+            return view
+        with self._write_lock:
+            view = self._view
+            if view is None or not self._is_fresh(view):
+                view = self._publish()
+        return view
+
+    @_locked
+    def publish(self) -> ReadView:
+        """Build a new view from live state, copying only what changed since the last one."""
+
+        return self._publish()
+
+    def _is_fresh(self, view: ReadView) -> bool:
+        return self.clock.monotonic() - view.published_at < self.publish_interval
+
+    def _publish(self) -> ReadView:
+        # Callers hold the write lock: the metrics below prune the live windows.
+        previous = self._view
+        dirty, self._dirty_rollouts = self._dirty_rollouts, set()
+        if previous is None or dirty:
+            if previous is None:
+                rollouts: dict[str, Rollout] = {}
+                decisions: dict[str, tuple[Decision, ...]] = {}
+                dirty = set(self.rollouts)
+            else:
+                rollouts, decisions = dict(previous.rollouts), dict(previous.decisions)
+            for rollout_id in dirty:
+                rollout = self.rollouts[rollout_id]
+                rollouts[rollout_id] = rollout.to_schema()
+                decisions[rollout_id] = tuple(rollout.decisions[-MAX_DECISIONS:])
+            rollout_maps = (
+                MappingProxyType(rollouts),
+                MappingProxyType(decisions),
+                tuple(self._by_created),
+                MappingProxyType(
+                    {state: tuple(index) for state, index in self._by_state.items()}
+                ),
+            )
+        else:
+            rollout_maps = (
+                previous.rollouts,
+                previous.decisions,
+                previous.by_created,
+                previous.by_state,
+            )
+        active = self.active_rollout()
+        evaluator = active.evaluator if active is not None else None
+        view = ReadView(
+            self.clock.monotonic(),
+            self._active_rollout_id,
+            *rollout_maps,
+            metrics=MappingProxyType({ring: self.metrics_for_ring(ring) for ring in rings.RINGS}),
+            gate_metrics=MappingProxyType(
+                {ring: self.metrics_for_ring(ring, evaluator) for ring in rings.RINGS}
+            ),
+        )
+        self._view = view
+        return view
+
+    def _maybe_publish(self) -> None:
+        """Writer-side publishing for ``publish_interval > 0`` (see :meth:`view`)."""
+
+        view = self._view
+        if self.publish_interval <= 0 or view is None:
+            return
+        if self._dirty_rollouts or not self._is_fresh(view):
+            self._publish()
 
     def snapshot(self) -> dict[str, object]:
         """Return a lightweight snapshot for debugging or future observability hooks."""
@@ -184,3 +874,235 @@ class Store:
             "active_ring": ring,
             "events": len(self.events),
         }
+
+	# ------------------------------------------------------------------
+	# Durability
+	# ------------------------------------------------------------------
+    @_locked
+    def write_snapshot(self) -> None:
+        """Persist rollout state and ring windows, truncating the WAL behind them."""
+
+        if self.journal is None:
+            return
+        self.journal.write_snapshot(self._snapshot_state())
+
+    def close(self) -> None:
+        if self.journal is not None:
+            self.journal.close()
+
+    def _log(self, op: int, data: object, *, durable: bool = True) -> None:
+        if self.journal is not None:
+            self.journal.append_json(op, data, durable=durable)
+            self._maybe_snapshot()
+
+    def _maybe_snapshot(self) -> None:
+        if self.journal is not None and self.journal.snapshot_due():
+            self.write_snapshot()
+
+    def _snapshot_state(self) -> wal.SnapshotState:
+        return wal.SnapshotState(
+            meta={
+                "active_rollout_id": self._active_rollout_id,
+                "rollouts": [
+                    {
+                        "rollout_id": rollout.rollout_id,
+                        "target_version": rollout.target_version,
+                        "last_known_good": rollout.last_known_good,
+                        "state": rollout.state,
+                        "ring_index": rollout.ring_index,
+                        "created_at": rollout.created_at.isoformat(),
+                        "last_promote_ts": _iso_or_none(rollout.last_promote_ts),
+                        "last_pause_ts": _iso_or_none(rollout.last_pause_ts),
+                        "decisions": [decision.model_dump() for decision in rollout.decisions],
+                        "gates": _dump_gates(rollout.gates),
+                        "target_config": rollout.target_config,
+                    }
+                    for rollout in self.rollouts.values()
+                ],
+                "events": [decision.model_dump() for decision in self.events],
+                "last_event_rollout_id": self._last_event_rollout_id,
+                "window_versions": self._window_versions(),
+                "configs": self.configs.configs,
+                "fleet": self.fleet.dump_meta(),
+            },
+            windows=[
+                [
+                    (ts.timestamp(), health.boot_ok, health.crash_free, health.checkin_ms)
+                    for ts, health in self._health_windows[ring]
+                ]
+                for ring in rings.RINGS
+            ],
+            blobs={"rollups": self.rollups.dump(), "fleet": self.fleet.dump()},
+        )
+
+    def _window_versions(self) -> dict[Ring, list[str]]:
+        """``sw_version`` of every sample, aligned with the snapshot's ring windows."""
+
+        result: dict[Ring, list[str]] = {}
+        for ring, window in self._health_windows.items():
+            owner = {
+                id(entry): sw_version
+                for sw_version, cohort in self._cohorts[ring].items()
+                for entry in cohort.samples
+            }
+            result[ring] = [owner.get(id(entry), UNKNOWN_VERSION) for entry in window]
+        return result
+
+    def _restore_snapshot(self, snapshot: wal.SnapshotState) -> None:
+        meta = snapshot.meta
+        for item in meta["rollouts"]:
+            rollout = RolloutState(
+                rollout_id=item["rollout_id"],
+                target_version=item["target_version"],
+                last_known_good=item["last_known_good"],
+                state=item["state"],
+                ring_index=item["ring_index"],
+                created_at=datetime.fromisoformat(item["created_at"]),
+                last_promote_ts=_datetime_or_none(item["last_promote_ts"]),
+                last_pause_ts=_datetime_or_none(item["last_pause_ts"]),
+                gates=_load_gates(item.get("gates")),
+                target_config=item.get("target_config"),
+            )
+            rollout.decisions.extend(Decision.model_validate(d) for d in item["decisions"])
+            self._insert_rollout(rollout)
+        self._active_rollout_id = meta["active_rollout_id"]
+        self.events = [Decision.model_validate(d) for d in meta["events"]]
+        self._last_event_rollout_id = meta.get("last_event_rollout_id")
+        for config in meta.get("configs", {}).values():
+            self._journaled_configs.add(self.configs.register(config))
+        window_versions = meta.get("window_versions", {})
+        for ring, samples in zip(rings.RINGS, snapshot.windows, strict=True):
+            window = self._health_windows[ring]
+            versions = window_versions.get(ring) or [UNKNOWN_VERSION] * len(samples)
+            for (ts, boot_ok, crash_free, checkin_ms), sw_version in zip(
+                samples, versions, strict=True
+            ):
+                entry = (
+                    datetime.fromtimestamp(ts, UTC),
+                    Health.model_construct(
+                        boot_ok=boot_ok, crash_free=crash_free, checkin_ms=checkin_ms
+                    ),
+                )
+                window.append(entry)
+                self._add_to_cohort(ring, sw_version, entry)
+            self._prune_ring(ring)
+        if "rollups" in snapshot.blobs:
+            self.rollups.load(snapshot.blobs["rollups"])
+        if "fleet" in snapshot.blobs:
+            self.fleet.load(meta["fleet"], snapshot.blobs["fleet"])
+
+    def _replay(self, op: int, payload: bytes) -> None:
+        """Re-apply a journaled mutation; the journal is detached while this runs."""
+
+        if op == wal.OP_CHECKIN:
+            fixed, device = wal.decode_checkin(payload)
+            ring_index, ts, boot_ok, crash_free, checkin_ms = fixed
+            if device is not None:
+                self.fleet.observe(device[0], ring_index, device[1], device[2])
+            self._append_sample(
+                rings.ring_for(ring_index),
+                datetime.fromtimestamp(ts, UTC),
+                Health.model_construct(
+                    boot_ok=boot_ok, crash_free=crash_free, checkin_ms=checkin_ms
+                ),
+                device[1] if device is not None else UNKNOWN_VERSION,
+            )
+            return
+
+        data = json.loads(payload)
+        if op == wal.OP_CREATE_ROLLOUT:
+            self._insert_rollout(
+                RolloutState(
+                    rollout_id=data["rollout_id"],
+                    target_version=data["target_version"],
+                    last_known_good=data["last_known_good"],
+                    state="active",
+                    ring_index=0,
+                    created_at=datetime.fromisoformat(data["created_at"]),
+                    gates=_load_gates(data.get("gates")),
+                    target_config=data.get("target_config"),
+                )
+            )
+            self._active_rollout_id = data["rollout_id"]
+        elif op == wal.OP_CONFIG:
+            self._journaled_configs.add(self.configs.register(data))
+        elif op == wal.OP_SET_ACTIVE:
+            self.set_active_rollout(data)
+        elif op == wal.OP_RING_INDEX:
+            self.update_ring_index(*data)
+        elif op == wal.OP_STATE:
+            self.update_state(*data)
+        elif op == wal.OP_TARGET_VERSION:
+            self.update_target_version(*data)
+        elif op == wal.OP_EVENT:
+            self.append_event(
+                data["rollout_id"],
+                Decision.model_validate(data["decision"]),
+                include_rollout_history=data["include_rollout_history"],
+            )
+
+
+def _index_slice(
+    index: Sequence[tuple[datetime, str]],
+    after: tuple[datetime, str] | None,
+    created_after: datetime | None,
+    created_before: datetime | None,
+    limit: int | None,
+) -> Sequence[tuple[datetime, str]]:
+    lo, hi = 0, len(index)
+    if created_after is not None:
+        lo = bisect_left(index, (created_after,))
+    if after is not None:
+        lo = max(lo, bisect_right(index, after))
+    if created_before is not None:
+        hi = bisect_left(index, (created_before,))
+    if limit is not None:
+        hi = min(hi, lo + limit)
+    return index[lo:hi]
+
+
+def _append_coalesced(decisions: list[Decision], decision: Decision) -> None:
+    """Append ``decision``, or fold it into the last entry if that is the same decision.
+
+    The merged entry replaces the old one rather than mutating it, so decisions handed
+    out earlier (exports, API responses) keep their values. Readers that need a stable
+    list copy it (see ``ExportView.capture``).
+    """
+
+    if decisions:
+        last = decisions[-1]
+        if (last.kind, last.reason, last.ring) == (decision.kind, decision.reason, decision.ring):
+            decisions[-1] = last.model_copy(
+                update={
+                    "ts": decision.ts,
+                    "snapshot": decision.snapshot,
+                    "count": last.count + decision.count,
+                    "first_ts": last.first_ts or last.ts,
+                }
+            )
+            return
+    decisions.append(decision)
+
+
+def _trim(log: list[Decision], limit: int) -> None:
+    """Drop the oldest entries of ``log`` beyond ``limit``."""
+
+    excess = len(log) - limit
+    if excess > 0:
+        del log[:excess]
+
+
+def _iso_or_none(value: datetime | None) -> str | None:
+    return value.isoformat() if value is not None else None
+
+
+def _datetime_or_none(value: str | None) -> datetime | None:
+    return datetime.fromisoformat(value) if value is not None else None
+
+
+def _dump_gates(gates: list[GateSpec] | None) -> list[dict[str, object]] | None:
+    return [gate.model_dump() for gate in gates] if gates is not None else None
+
+
+def _load_gates(data: list[dict[str, object]] | None) -> list[GateSpec] | None:
+    return [GateSpec.model_validate(gate) for gate in data] if data is not None else None
@@ -0,0 +1,69 @@
+"""Admission control tests for check-in storms."""
+
+from datetime import UTC, datetime
+
+from fastapi.testclient import TestClient
+
+from app.admission import AdmissionController
+from app.dependencies import get_admission, get_policy, get_store
+from app.main import app
+from app.policy import PolicyEngine
+from app.store import Store
+
+
+def _other_device(controller: AdmissionController, device_id: str) -> str:
+    """A device id that does not share ``device_id``'s hash slot."""
+
+    slot = controller.devices.slot(device_id)
+    return next(
+        f"tv-{idx}" for idx in range(2, 100) if controller.devices.slot(f"tv-{idx}") != slot
+    )
+
+
+def test_device_bucket_limits_retries_and_refills() -> None:
+    controller = AdmissionController(device_rate=1.0, device_burst=2.0, slots=1024)
+    other = _other_device(controller, "tv-1")
+    assert controller.admit("tv-1", now=100.0).admitted
+    assert controller.admit("tv-1", now=100.0).admitted
+    rejected = controller.admit("tv-1", now=100.0)
+    assert not rejected.admitted
+    assert rejected.scope == "device"
+    assert rejected.retry_after == 1.0
+    assert controller.admit(other, now=100.0).admitted
+    assert controller.admit("tv-1", now=101.0).admitted
+
+
+def test_global_rejection_refunds_device_token() -> None:
+    controller = AdmissionController(
+        device_burst=1.0, global_rate=1.0, global_burst=1.0, slots=1024
+    )
+    other = _other_device(controller, "tv-1")
+    assert controller.admit("tv-1", now=0.0).admitted
+    rejected = controller.admit(other, now=0.0)
+    assert rejected.scope == "global"
+    assert controller.admit(other, now=1.0).admitted
+
+
+def test_global_shedding_rejects_before_recording() -> None:
+    store = Store()
+    app.dependency_overrides[get_store] = lambda: store
+    app.dependency_overrides[get_policy] = lambda: PolicyEngine(store)
+    controller = AdmissionController(global_rate=0.001, global_burst=1.0, slots=1024)
+    app.dependency_overrides[get_admission] = lambda: controller
+    client = TestClient(app)
+    try:
+        payload = {
+            "ring": "pilot",
+            "sw_version": "1.2.0",
+            "health": {"boot_ok": True, "crash_free": 0.999, "checkin_ms": 40},
+            "ts": datetime.now(UTC).isoformat(),
+        }
+        assert client.post("/v1/checkin", json={**payload, "device_id": "a"}).status_code == 200
+        resp = client.post("/v1/checkin", json={**payload, "device_id": "b"})
+        assert resp.status_code == 429
+        assert int(resp.headers["Retry-After"]) >= 1
+        assert store.metrics_for_ring("pilot").total == 1
+        assert controller.rejected == {"device": 0, "global": 1}
+    finally:
+        app.dependency_overrides.clear()
+        client.close()
@@ -0,0 +1,86 @@
+"""Backtesting tests: vectorized metrics must match the live window semantics."""
+
+from datetime import UTC, datetime
+
+import pytest
+
+np = pytest.importorskip("numpy")
+
+from app import backtest  # noqa: E402
+from app.metrics import compute_window_metrics  # noqa: E402
+from app.schemas import Health  # noqa: E402
+
+
+def _samples(
+    crash_free: list[float], start: float = 1_700_000_000.0, spacing: float = 1.0
+) -> backtest.Samples:
+    """One sample every ``spacing`` seconds, round-robin across the four rings."""
+
+    count = len(crash_free)
+    return backtest.Samples.from_columns(
+        ts=start + np.arange(count, dtype=np.float64) * spacing,
+        ring=np.arange(count, dtype=np.int8) % 4,
+        boot_ok=np.ones(count, dtype=bool),
+        crash_free=crash_free,
+        checkin_ms=np.full(count, 100.0),
+    )
+
+
+def test_window_series_matches_compute_window_metrics() -> None:
+    rng = np.random.default_rng(7)
+    crash = rng.uniform(0.95, 1.0, size=8000)
+    samples = _samples(list(crash), spacing=0.05)  # 5 pilot samples per second
+    series = backtest.window_series(samples, step_seconds=20.0)
+
+    col = 18  # t = start + 360s: 1500 pilot samples in the last 300s, capped at 1200
+    now = series.times[col]
+    in_window = (samples.ts >= now - 300) & (samples.ts <= now) & (samples.ring == 0)
+    expected = compute_window_metrics(
+        Health(boot_ok=True, crash_free=float(value), checkin_ms=100)
+        for value in samples.crash_free[in_window][-1200:]
+    )
+    assert expected.total == 1200
+    assert series.total[0, col] == expected.total
+    assert series.crash_free_median[0, col] == pytest.approx(expected.crash_free_median)
+    assert series.boot_success[0, col] == expected.boot_success
+
+
+def test_grid_separates_rollback_pause_and_promote() -> None:
+    healthy = [0.999] * 2400
+    regression = [0.96] * 2400
+    samples = _samples(healthy + regression, spacing=0.25)
+    series = backtest.window_series(samples, step_seconds=10.0)
+    grid = backtest.Grid.product(
+        crash_free_gate=(0.99, 0.95),
+        auto_rollback_crash=(0.97, 0.5),
+        cooldown_seconds=(60,),
+    )
+    rows = {
+        (row["crash_free_gate"], row["auto_rollback_crash"]): row
+        for row in backtest.run_backtest(series, grid).rows()
+    }
+
+    strict = rows[(0.99, 0.97)]
+    assert strict["rollbacks"] >= 1
+    assert strict["first_rollback"] >= 1_700_000_000.0 + 600
+    assert rows[(0.99, 0.5)]["first_pause"] is not None
+    assert rows[(0.99, 0.5)]["rollbacks"] == 0
+    lenient = rows[(0.95, 0.5)]
+    assert lenient["pauses"] == 0
+    assert lenient["final_state"] == "completed"
+
+
+def test_load_ndjson(tmp_path) -> None:
+    path = tmp_path / "checkins.ndjson"
+    path.write_text(
+        "\n".join(
+            f'{{"device_id":"tv-{idx}","ring":"five","sw_version":"1.2.0",'
+            f'"ts":"{datetime.fromtimestamp(1_700_000_000 + idx, UTC).isoformat()}",'
+            f'"health":{{"boot_ok":true,"crash_free":0.99,"checkin_ms":{50 + idx}}}}}'
+            for idx in range(3)
+        )
+    )
+    samples = backtest.load_ndjson(path)
+    assert len(samples) == 3
+    assert list(samples.ring) == [1, 1, 1]
+    assert samples.checkin_ms[-1] == 52
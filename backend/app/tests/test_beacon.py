@@ -0,0 +1,95 @@
+"""UDP beacon listener: batching, malformed/drop accounting and a real socket round-trip."""
+
+import asyncio
+import socket
+import threading
+from datetime import UTC, datetime
+
+from app import wire
+from app.beacon import BeaconProtocol, start_listener
+from app.policy import PolicyEngine
+from app.rings import CohortAssigner
+from app.store import Store
+
+
+def _beacon(device_id: str, crash: float = 0.999, ring: str | None = "pilot") -> bytes:
+    return wire.encode_checkin(
+        device_id, ring, "1.2.0", datetime.now(UTC).timestamp(), True, crash, 60
+    )
+
+
+async def _settled(protocol: BeaconProtocol) -> None:
+    for _ in range(100):
+        await asyncio.sleep(0.01)
+        if not protocol._scheduled:
+            return
+
+
+def test_burst_is_batched_and_bad_packets_counted() -> None:
+    store = Store()
+    protocol = BeaconProtocol(store, PolicyEngine(store), CohortAssigner(), max_pending=5)
+
+    async def scenario() -> None:
+        addr = ("127.0.0.1", 9)
+        protocol.datagram_received(_beacon("a") + _beacon("b"), addr)  # gateway batch
+        protocol.datagram_received(_beacon("c"), addr)
+        protocol.datagram_received(b"\x01\x02\x03", addr)  # truncated
+        protocol.datagram_received(b"\x09" + _beacon("d")[1:], addr)  # bad protocol version
+        protocol.datagram_received(_beacon("e") + _beacon("f"), addr)  # over max_pending
+        await _settled(protocol)
+
+    asyncio.run(scenario())
+    stats = protocol.stats
+    assert stats.batches == 1
+    assert stats.accepted == 3
+    assert stats.malformed == 2
+    assert stats.dropped == 2
+    assert store.metrics_for_ring("pilot").total == 3
+
+
+def test_batches_are_recorded_off_the_event_loop() -> None:
+    store = Store()
+    protocol = BeaconProtocol(store, PolicyEngine(store), CohortAssigner())
+    threads = set()
+    record_health = store.record_health
+
+    def recording(*args: object, **kwargs: object) -> bool:
+        threads.add(threading.get_ident())
+        return record_health(*args, **kwargs)
+
+    store.record_health = recording  # type: ignore[method-assign]
+
+    async def scenario() -> None:
+        protocol.datagram_received(_beacon("a"), ("127.0.0.1", 9))
+        await _settled(protocol)
+        protocol.datagram_received(_beacon("b"), ("127.0.0.1", 9))
+        await _settled(protocol)
+
+    asyncio.run(scenario())
+    assert protocol.stats.batches == 2 and protocol.stats.accepted == 2
+    assert threads and threading.get_ident() not in threads
+
+
+def test_listener_feeds_ring_windows_and_gates() -> None:
+    store = Store()
+    rollout = store.create_rollout("1.3.0", "1.2.0")
+
+    async def scenario() -> None:
+        transport, protocol = await start_listener(
+            "127.0.0.1", 0, store, PolicyEngine(store), CohortAssigner()
+        )
+        port = transport.get_extra_info("sockname")[1]
+        with socket.socket(socket.AF_INET, socket.SOCK_DGRAM) as sock:
+            for idx in range(20):
+                sock.sendto(_beacon(f"tv-{idx}", crash=0.90), ("127.0.0.1", port))
+        for _ in range(100):
+            if protocol.stats.accepted == 20:
+                break
+            await asyncio.sleep(0.01)
+        transport.close()
+
+    asyncio.run(scenario())
+    assert store.metrics_for_ring("pilot").total == 20
+    # crash_free 0.90 is a critical breach on the active ring, as with an HTTP check-in.
+    assert store.get_rollout(rollout.rollout_id).target_version == "1.2.0"
+    assert store.get_rollout(rollout.rollout_id).decisions[-1].kind == "ROLLBACK"
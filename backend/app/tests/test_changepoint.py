@@ -0,0 +1,73 @@
+"""Change-point detection: early auto-rollback on a sharp shift, silence when healthy."""
+
+import random
+
+from app.changepoint import RingShiftDetector
+from app.metrics import AUTO_ROLLBACK_BOOT, AUTO_ROLLBACK_CRASH
+from app.policy import PolicyEngine
+from app.schemas import GateSpec, Health
+from app.store import Store
+
+
+def _health(rng: random.Random, crash: float, boot_failure: float) -> Health:
+    return Health(
+        boot_ok=rng.random() > boot_failure,
+        crash_free=round(crash + rng.uniform(-0.01, 0.01), 3),
+        checkin_ms=80,
+    )
+
+
+def _feed(store: Store, rng: random.Random, count: int, crash: float, boot: float) -> None:
+    for idx in range(count):
+        store.record_health(f"tv-{idx}", "pilot", store.clock.now(), _health(rng, crash, boot), "1")
+
+
+def test_detector_ignores_healthy_and_benign_streams() -> None:
+    rng = random.Random(3)
+    detector = RingShiftDetector(AUTO_ROLLBACK_CRASH, AUTO_ROLLBACK_BOOT)
+    for _ in range(20_000):
+        detector.update(_health(rng, 0.99, 0.001))
+        assert not detector.shifted()
+    # Worse, but above both rollback floors: a job for the pause gates.
+    for _ in range(5_000):
+        detector.update(_health(rng, 0.97, 0.01))
+        assert not detector.shifted()
+
+
+def test_sharp_regression_rolls_back_before_window_breaches() -> None:
+    rng = random.Random(5)
+    store = Store()
+    policy = PolicyEngine(store)
+    rollout = store.create_rollout("1.3.0", "1.2.0")
+    _feed(store, rng, 1_000, crash=0.99, boot=0.001)
+    _feed(store, rng, 10, crash=0.85, boot=0.5)
+
+    outcome = policy.evaluate_rollout(rollout.rollout_id)
+    assert outcome.auto_rollback
+    breaches = outcome.metrics.rollback_breaches
+    assert "crash_free_critical_shift" in breaches
+    assert all(name.endswith("_shift") for name in breaches)  # the window has not caught up
+    policy.enforce_gates("pilot")
+    rolled_back = store.get_rollout(rollout.rollout_id)
+    assert rolled_back.target_version == "1.2.0"
+    assert rolled_back.decisions[-1].reason == "Auto-rollback: health shift detected"
+
+
+def test_looser_rollout_gates_are_not_tripped_by_detector() -> None:
+    rng = random.Random(5)
+    store = Store()
+    policy = PolicyEngine(store)
+    loose = GateSpec(
+        name="crash_free_floor",
+        metric="crash_free",
+        aggregation="median",
+        comparator="lt",
+        threshold=0.5,
+        severity="rollback",
+    )
+    rollout = store.create_rollout("1.3.0", "1.2.0", gates=[loose])
+    _feed(store, rng, 1_000, crash=0.99, boot=0.001)
+    _feed(store, rng, 10, crash=0.85, boot=0.001)
+
+    assert store.shift_detectors["pilot"].shifted() == {"crash_free": AUTO_ROLLBACK_CRASH}
+    assert not policy.evaluate_rollout(rollout.rollout_id).auto_rollback
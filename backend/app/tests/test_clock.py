@@ -0,0 +1,39 @@
+"""Tests for running the store and policy on a virtual clock."""
+
+from app.clock import VirtualClock
+from app.policy import PROMOTE_COOLDOWN_SECONDS, PolicyEngine
+from app.schemas import CheckinReq, Health
+from app.store import WINDOW_SECONDS, Store
+
+
+def _checkin(store: Store, clock: VirtualClock) -> None:
+    store.record_checkin(
+        CheckinReq(
+            device_id="tv-1",
+            ring="pilot",
+            sw_version="1.2.0",
+            health=Health(boot_ok=True, crash_free=0.999, checkin_ms=80),
+            ts=clock.now().isoformat(),
+        )
+    )
+
+
+def test_virtual_clock_drives_cooldown_and_window() -> None:
+    clock = VirtualClock()
+    store = Store(clock=clock)
+    policy = PolicyEngine(store)
+    rollout = store.create_rollout("1.2.0", "1.1.0")
+    _checkin(store, clock)
+
+    decision = policy.build_decision(
+        "PROMOTE", "SLO gates passing", "five", store.metrics_for_ring("pilot")
+    )
+    store.append_event(rollout.rollout_id, decision)
+    assert decision.ts == clock.now().isoformat()
+    assert not policy.evaluate_rollout(rollout.rollout_id).can_promote
+
+    clock.advance(PROMOTE_COOLDOWN_SECONDS)
+    assert policy.evaluate_rollout(rollout.rollout_id).can_promote
+
+    clock.advance(WINDOW_SECONDS + 1)
+    assert store.metrics_for_ring("pilot").total == 0
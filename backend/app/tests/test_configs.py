@@ -0,0 +1,91 @@
+"""Content-addressed configs and cached merge-patch deltas."""
+
+import json
+from datetime import UTC, datetime
+from pathlib import Path
+
+from fastapi.testclient import TestClient
+
+from app.configs import ConfigRegistry, DeltaCache, apply_merge_patch, config_id, merge_patch
+from app.dependencies import get_store
+from app.main import app
+from app.store import Store
+
+BASE = {"sampling": {"rate": 0.1, "tags": ["a"]}, "log_level": "info", "legacy": True}
+TARGET = {"sampling": {"rate": 0.5, "tags": ["a"]}, "log_level": "info", "retries": 3}
+
+
+def test_merge_patch_round_trips() -> None:
+    patch = merge_patch(BASE, TARGET)
+    assert patch == {"sampling": {"rate": 0.5}, "legacy": None, "retries": 3}
+    assert apply_merge_patch(BASE, patch) == TARGET
+    assert merge_patch(TARGET, TARGET) == {}
+    assert config_id({"b": 1, "a": 2}) == config_id({"a": 2, "b": 1})
+
+
+def test_delta_cache_reuses_and_evicts_by_size() -> None:
+    registry = ConfigRegistry()
+    base, target = registry.register(BASE), registry.register(TARGET)
+    first = registry.delta(base, target)
+    assert registry.delta(base, target) is first
+    assert (registry.deltas.hits, registry.deltas.misses) == (1, 1)
+    assert registry.delta(target, target) is None
+    assert json.loads(registry.delta("unknown", target)) == TARGET
+
+    cache = DeltaCache(max_bytes=10)
+    cache.put((None, "a"), "x" * 6)
+    cache.put((None, "b"), "y" * 6)
+    cache.put((None, "c"), "z" * 20)  # larger than the whole cache: not kept
+    assert cache.get((None, "a")) is None
+    assert cache.get((None, "b")) == "y" * 6
+    assert (len(cache), cache.bytes, cache.evictions) == (1, 6, 1)
+
+
+def test_checkin_returns_delta_until_device_reports_target() -> None:
+    store = Store()
+    app.dependency_overrides[get_store] = lambda: store
+    try:
+        client = TestClient(app)
+        base = client.post("/v1/configs", json={"config": BASE}).json()["config_id"]
+        rollout = client.post(
+            "/v1/rollouts",
+            json={"target_version": "1.3.0", "last_known_good": "1.2.0", "target_config": TARGET},
+        ).json()
+        assert client.get(f"/v1/configs/{rollout['target_config']}").json()["config"] == TARGET
+        assert client.get("/v1/configs/missing").status_code == 404
+
+        def checkin(last_config: str | None) -> dict[str, str | None]:
+            body = {
+                "device_id": "tv-config-1",
+                "ts": datetime.now(UTC).isoformat(),
+                "sw_version": "1.3.0",
+                "health": {"boot_ok": True, "crash_free": 0.999, "checkin_ms": 50},
+                "last_config": last_config,
+            }
+            res = client.post("/v1/checkin", json=body)
+            assert res.status_code == 200
+            return res.json()["apply"]
+
+        advice = checkin(base)
+        assert advice["config_id"] == rollout["target_config"]
+        assert apply_merge_patch(BASE, json.loads(advice["config_delta"])) == TARGET
+        assert checkin(advice["config_id"]) == {"target_version": None, "config_delta": None}
+    finally:
+        app.dependency_overrides.clear()
+
+
+def test_configs_survive_replay(tmp_path: Path) -> None:
+    store = Store.open(tmp_path)
+    target = store.register_config(TARGET)
+    rollout = store.create_rollout("1.3.0", "1.2.0", target_config=target)
+    store.close()
+
+    recovered = Store.open(tmp_path)
+    assert recovered.rollouts[rollout.rollout_id].target_config == target
+    assert recovered.configs.configs[target] == TARGET
+    recovered.write_snapshot()
+    recovered.close()
+
+    from_snapshot = Store.open(tmp_path)
+    assert from_snapshot.rollouts[rollout.rollout_id].target_config == target
+    assert from_snapshot.configs.configs[target] == TARGET
@@ -0,0 +1,71 @@
+"""Retried check-ins are dropped by the rotating Bloom filter."""
+
+from datetime import UTC, datetime
+
+from fastapi.testclient import TestClient
+
+from app.clock import VirtualClock
+from app.dedup import RotatingBloomFilter
+from app.dependencies import get_policy, get_store
+from app.main import app
+from app.policy import PolicyEngine
+from app.schemas import CheckinReq, Health
+from app.store import Store
+
+TS = datetime.now(UTC).isoformat()
+
+
+def _payload(device_id: str, key: str | None = None) -> CheckinReq:
+    return CheckinReq(
+        device_id=device_id,
+        ring="pilot",
+        sw_version="1.2.0",
+        health=Health(boot_ok=True, crash_free=0.999, checkin_ms=50),
+        ts=TS,
+        idempotency_key=key,
+    )
+
+
+def test_filter_rotation_and_false_positive_rate() -> None:
+    clock = VirtualClock()
+    bloom = RotatingBloomFilter(capacity=10_000, error_rate=1e-3, rotate_seconds=60, clock=clock)
+    assert bloom.add("a") and not bloom.add("a")
+
+    clock.advance(61)
+    assert not bloom.add("a")  # still remembered by the previous generation
+    clock.advance(61)
+    assert bloom.add("a")  # forgotten after two rotations
+
+    false_positives = sum(not bloom.add(f"key-{idx}") for idx in range(9_000))
+    assert false_positives <= 9_000 * 3e-3
+    assert bloom.memory_bytes < 40_000  # fixed, independent of how many keys were seen
+
+
+def test_store_drops_retries_but_keeps_distinct_keys() -> None:
+    store = Store(dedup=RotatingBloomFilter(capacity=1_000))
+    assert store.record_checkin(_payload("tv-1"))
+    assert not store.record_checkin(_payload("tv-1"))  # retry: same device and ts
+    assert store.record_checkin(_payload("tv-2"))
+    assert store.record_checkin(_payload("tv-1", key="boot-2"))
+    assert not store.record_checkin(_payload("tv-1", key="boot-2"))
+    assert store.record_checkin(_payload("tv-3", key="boot-2"))  # keys are per device
+    assert store.metrics_for_ring("pilot").total == 4
+    assert store.dedup is not None and store.dedup.duplicates == 2
+
+
+def test_retried_http_checkin_is_answered_but_not_counted() -> None:
+    store = Store(dedup=RotatingBloomFilter(capacity=1_000))
+    store.create_rollout("1.3.0", "1.2.0")
+    policy = PolicyEngine(store)
+    app.dependency_overrides[get_store] = lambda: store
+    app.dependency_overrides[get_policy] = lambda: policy
+    body = _payload("tv-1").model_dump()
+    try:
+        client = TestClient(app)
+        for _ in range(3):
+            resp = client.post("/v1/checkin", json=body)
+            assert resp.status_code == 200
+            assert resp.json()["apply"]["target_version"] == "1.3.0"
+    finally:
+        app.dependency_overrides.clear()
+    assert store.metrics_for_ring("pilot").total == 1
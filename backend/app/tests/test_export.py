@@ -0,0 +1,77 @@
+"""Tests for the streaming state export."""
+
+import gzip
+import io
+import json
+from datetime import UTC, datetime
+
+from app import export
+from app.schemas import CheckinReq, Decision, Health
+from app.store import Store
+
+
+def _store() -> Store:
+    store = Store()
+    rollout = store.create_rollout("1.2.0", "1.1.0")
+    for idx in range(5):
+        store.record_checkin(
+            CheckinReq(
+                device_id=f"tv-{idx}",
+                ring="five" if idx % 2 else "pilot",
+                sw_version="1.2.0",
+                health=Health(boot_ok=idx != 3, crash_free=0.99, checkin_ms=70 + idx),
+                ts=datetime.now(UTC).isoformat(),
+            )
+        )
+    store.append_event(
+        rollout.rollout_id,
+        Decision(
+            ts=datetime.now(UTC).isoformat(),
+            kind="PAUSE",
+            reason="Manual pause",
+            ring="pilot",
+            snapshot={},
+        ),
+    )
+    return store
+
+
+def test_ndjson_export_is_point_in_time() -> None:
+    store = _store()
+    view = export.ExportView.capture(store)
+    # Mutations after capture must not leak into the export.
+    store.create_rollout("1.3.0", "1.2.0")
+    store.update_state(view.rollouts[0][0].rollout_id, "paused")
+    # A repeat of the last decision is coalesced into the tail entry of both logs.
+    store.append_event(
+        view.rollouts[0][0].rollout_id,
+        Decision(
+            ts=datetime.now(UTC).isoformat(),
+            kind="PAUSE",
+            reason="Manual pause",
+            ring="pilot",
+            snapshot={},
+        ),
+    )
+
+    body = gzip.decompress(b"".join(export.iter_export(view, "ndjson", "gzip", chunk_bytes=64)))
+    records = [json.loads(line) for line in body.splitlines()]
+    kinds = [record["type"] for record in records]
+
+    assert kinds.count("rollout") == 1
+    assert records[1]["state"] == "active"
+    assert kinds.count("decision") == 1
+    assert kinds.count("event") == 1
+    assert all(r["count"] == 1 for r in records if r["type"] in ("decision", "event"))
+    assert (
+        sorted(r["ring"] for r in records if r["type"] == "sample") == ["five"] * 2 + ["pilot"] * 3
+    )
+
+
+def test_columnar_export_roundtrips() -> None:
+    view = export.ExportView.capture(_store())
+    body = b"".join(export.iter_export(view, "columnar", "none"))
+    columnar = list(export.read_columnar(io.BytesIO(body)))
+
+    ndjson = b"".join(export.iter_export(view, "ndjson", "none"))
+    assert columnar == [json.loads(line) for line in ndjson.splitlines()]
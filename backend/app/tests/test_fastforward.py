@@ -0,0 +1,25 @@
+"""Fast-forward simulator runs end to end on the virtual clock."""
+
+import asyncio
+
+from simulator.fastforward import FastForwardSimulator, Fault
+
+
+def _run(seed: int, faults: list[Fault] | None = None) -> dict[str, object]:
+    simulator = FastForwardSimulator(
+        devices=1000, duration=540, tick=20, samples_per_window=60, faults=faults, seed=seed
+    )
+    report = asyncio.run(simulator.run())
+    assert report.final_state is not None
+    return report.final_state
+
+
+def test_fault_free_runs_complete_every_ring() -> None:
+    for seed in (1, 2):
+        state = _run(seed)
+        assert state["state"] == "completed" and state["ring_index"] == 3
+
+
+def test_faulty_pilot_stops_the_rollout() -> None:
+    state = _run(1, faults=[Fault(ring="pilot", bias=0.05, at_seconds=0)])
+    assert state["state"] != "completed" and state["ring_index"] == 0
@@ -0,0 +1,81 @@
+"""Device registry and fleet version distribution tests."""
+
+import threading
+
+from fastapi.testclient import TestClient
+
+from app.fleet import DeviceRegistry
+from app.main import app
+from app.schemas import MAX_ID_LENGTH
+
+
+def test_counts_follow_devices_across_versions_and_rings() -> None:
+    registry = DeviceRegistry(capacity=8)
+    for idx in range(20):
+        registry.observe(f"tv-{idx}", 0, "1.1.0", None)
+    for idx in range(5):
+        registry.observe(f"tv-{idx}", 0, "1.2.0", "cfg-a")
+    registry.observe("tv-19", 1, "1.2.0", None)
+
+    assert registry.size == 20
+    assert registry.capacity >= 32
+    assert registry.version_counts("pilot") == {"1.1.0": 14, "1.2.0": 5}
+    assert registry.version_counts("five") == {"1.2.0": 1}
+    assert registry.device("tv-3") == ("pilot", "1.2.0", "cfg-a")
+    assert registry.device("unknown") is None
+
+
+def test_registry_round_trips_through_dump() -> None:
+    registry = DeviceRegistry(capacity=16)
+    for idx in range(10):
+        registry.observe(f"tv-{idx}", idx % 4, f"1.{idx % 3}.0", None)
+
+    restored = DeviceRegistry()
+    restored.load(registry.dump_meta(), registry.dump())
+    assert restored.size == 10
+    assert restored.device("tv-5") == registry.device("tv-5")
+    restored.observe("tv-0", 1, "1.2.0", None)
+    assert restored.version_counts("five") == {"1.0.0": 1, "1.1.0": 1, "1.2.0": 2}
+    assert restored.version_counts("pilot") == {"1.1.0": 1, "1.2.0": 1}
+
+
+def test_concurrent_observe_and_lookup() -> None:
+    registry = DeviceRegistry(capacity=8)
+    errors: list[BaseException] = []
+
+    def writer(worker: int) -> None:
+        for idx in range(5_000):
+            registry.observe(f"tv-{worker}-{idx}", worker, "1.2.0", None)
+
+    def reader() -> None:
+        try:
+            for idx in range(5_000):
+                registry.device(f"tv-0-{idx}")
+                registry.version_counts("pilot")
+        except Exception as exc:  # pragma: no cover - only on a regression
+            errors.append(exc)
+
+    threads = [threading.Thread(target=writer, args=(worker,)) for worker in range(3)]
+    threads += [threading.Thread(target=reader) for _ in range(2)]
+    for thread in threads:
+        thread.start()
+    for thread in threads:
+        thread.join()
+
+    assert not errors
+    assert registry.size == 15_000
+    assert registry.version_counts("five") == {"1.2.0": 5_000}
+
+
+def test_checkin_rejects_oversized_identifiers() -> None:
+    client = TestClient(app)
+    payload = {
+        "device_id": "tv-long-config",
+        "sw_version": "1.2.0",
+        "last_config": "c" * (MAX_ID_LENGTH + 1),
+        "health": {"boot_ok": True, "crash_free": 0.999, "checkin_ms": 40},
+        "ts": "2024-05-01T00:00:00+00:00",
+    }
+    assert client.post("/v1/checkin", json=payload).status_code == 422
+    payload = {**payload, "last_config": None, "device_id": "d" * (MAX_ID_LENGTH + 1)}
+    assert client.post("/v1/checkin", json=payload).status_code == 422
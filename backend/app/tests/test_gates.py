@@ -0,0 +1,101 @@
+"""Tests for declarative per-rollout gates."""
+
+from datetime import UTC, datetime
+from pathlib import Path
+from statistics import median
+
+from app.metrics import SLO_EVALUATOR, GateEvaluator
+from app.policy import PolicyEngine
+from app.schemas import CheckinReq, GateSpec, Health
+from app.store import Store
+
+CRASH_P90_GATE = GateSpec(metric="crash_free", aggregation="p90", comparator="lt", threshold=0.9)
+CRASH_FLOOR_GATE = GateSpec(
+    name="crash_floor", metric="crash_free", aggregation="min", comparator="lt", threshold=0.9
+)
+
+
+def _health(crash_values: list[float]) -> list[Health]:
+    return [
+        Health(boot_ok=idx % 7 != 0, crash_free=crash, checkin_ms=50 + idx)
+        for idx, crash in enumerate(crash_values)
+    ]
+
+
+def test_default_evaluator_matches_reference_aggregates() -> None:
+    events = _health([0.99, 0.97, 0.999, 0.98, 0.995, 0.96])
+    result = SLO_EVALUATOR.evaluate(events)
+
+    assert result.total == 6
+    assert result.boot_success == sum(e.boot_ok for e in events) / 6
+    assert result.crash_free_median == median(e.crash_free for e in events)
+    assert result.checkin_ms_median == median(e.checkin_ms for e in events)
+    assert result.breaches == ["boot_success_rate", "crash_free_median"]
+    assert result.extra == {} and result.fill_classic is None
+
+
+def test_evaluator_computes_configured_and_lazy_classic_aggregates() -> None:
+    evaluator = GateEvaluator(
+        [
+            CRASH_P90_GATE,
+            GateSpec(
+                metric="checkin_ms",
+                aggregation="max",
+                comparator="ge",
+                threshold=55,
+                severity="rollback",
+            ),
+        ]
+    )
+    result = evaluator.evaluate(_health([0.5] + [0.99] * 9))
+
+    assert result.extra == {"crash_free_p90": 0.99, "checkin_ms_max": 59}
+    assert result.classic == {}  # no gate needs them: computed on first read
+    assert result.crash_free_median == 0.99 and result.boot_success == 0.8
+    assert result.fill_classic is None and len(result.classic) == 3
+    assert result.breaches == []
+    assert result.rollback_breaches == ["checkin_ms_max"]
+    assert result.snapshot()["crash_free_p90"] == 0.99
+
+
+def test_rollout_gates_drive_policy_and_survive_restart(tmp_path: Path) -> None:
+    store = Store.open(tmp_path)
+    rollout = store.create_rollout("1.2.0", "1.1.0", gates=[CRASH_FLOOR_GATE])
+    for idx in range(10):
+        store.record_checkin(
+            CheckinReq(
+                device_id=f"tv-{idx}",
+                ring="pilot",
+                sw_version="1.2.0",
+                # Median stays green; only the custom floor gate sees the bad devices.
+                health=Health(boot_ok=True, crash_free=0.5 if idx < 2 else 0.999, checkin_ms=80),
+                ts=datetime.now(UTC).isoformat(),
+            )
+        )
+    store.close()
+
+    recovered = Store.open(tmp_path)
+    assert recovered.get_rollout(rollout.rollout_id).gates == [CRASH_FLOOR_GATE]
+    outcome = PolicyEngine(recovered).evaluate_rollout(rollout.rollout_id)
+    assert outcome.breaches == ["crash_floor"]
+    assert not outcome.auto_rollback
+
+
+def test_custom_gates_keep_real_metrics_and_default_rollback_gates() -> None:
+    store = Store()
+    latency_only = GateSpec(metric="checkin_ms", aggregation="p99", comparator="gt", threshold=900)
+    rollout = store.create_rollout("1.2.0", "1.1.0", gates=[latency_only])
+    for idx in range(10):
+        store.record_health(
+            f"tv-{idx}",
+            "pilot",
+            datetime.now(UTC),
+            Health(boot_ok=False, crash_free=0.1, checkin_ms=80),
+            "1.2.0",
+        )
+
+    outcome = PolicyEngine(store).evaluate_rollout(rollout.rollout_id)
+    assert outcome.metrics.boot_success == 0.0
+    assert outcome.metrics.crash_free_median == 0.1
+    assert outcome.auto_rollback and not outcome.can_promote
+    assert outcome.metrics.rollback_breaches == ["crash_free_critical", "boot_success_critical"]
@@ -74,3 +74,30 @@ def test_cooldown_blocks_double_promote() -> None:
     assert not outcome.can_promote
     assert not outcome.breaches
     assert not outcome.auto_rollback
+
+
+def test_repeated_auto_pauses_coalesce_into_one_decision() -> None:
+    store = Store()
+    policy = PolicyEngine(store)
+    rollout = store.create_rollout("1.2.0", "1.1.0")
+    _record_samples(store, "pilot", crash=0.985)
+    for _ in range(50):
+        policy.enforce_gates("pilot")
+
+    decisions = store.rollout_decisions(rollout.rollout_id)
+    assert len(decisions) == 1 and len(store.events) == 1
+    pause = decisions[0]
+    assert (pause.kind, pause.count) == ("PAUSE", 50)
+    assert pause.first_ts is not None and pause.first_ts <= pause.ts
+
+    store.update_state(rollout.rollout_id, "active")
+    store.append_event(
+        rollout.rollout_id,
+        policy.build_decision("PROMOTE", "Manual", "pilot", store.metrics_for_ring("pilot")),
+    )
+    policy.enforce_gates("pilot")
+    assert [(d.kind, d.count) for d in store.rollout_decisions(rollout.rollout_id)] == [
+        ("PAUSE", 50),
+        ("PROMOTE", 1),
+        ("PAUSE", 1),
+    ]
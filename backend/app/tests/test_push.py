@@ -0,0 +1,87 @@
+"""WebSocket check-ins and per-ring push of rollout target changes."""
+
+import asyncio
+import json
+from datetime import UTC, datetime
+
+from fastapi.testclient import TestClient
+
+from app.dependencies import get_policy, get_push_hub, get_store
+from app.main import app
+from app.policy import PolicyEngine
+from app.push import PushHub
+from app.store import Store
+
+
+def _checkin(device_id: str, ring: str = "pilot") -> dict[str, object]:
+    return {
+        "device_id": device_id,
+        "ring": ring,
+        "sw_version": "1.3.0",
+        "health": {"boot_ok": True, "crash_free": 0.999, "checkin_ms": 50},
+        "ts": datetime.now(UTC).isoformat(),
+    }
+
+
+def test_rollback_is_pushed_over_websocket() -> None:
+    store = Store()
+    policy = PolicyEngine(store)
+    hub = PushHub(store)
+    rollout = store.create_rollout("1.3.0", "1.2.0")
+    app.dependency_overrides[get_store] = lambda: store
+    app.dependency_overrides[get_policy] = lambda: policy
+    app.dependency_overrides[get_push_hub] = lambda: hub
+    try:
+        client = TestClient(app)
+        with client.websocket_connect("/v1/checkin/ws") as ws:
+            ws.send_text(json.dumps(_checkin("tv-1")))
+            first = ws.receive_json()
+            assert first == {
+                "type": "target",
+                "rollout_id": rollout.rollout_id,
+                "ring": "pilot",
+                "target_version": "1.3.0",
+            }
+
+            ws.send_text("{}")
+            assert ws.receive_json()["type"] == "error"
+
+            resp = client.post(f"/v1/rollouts/{rollout.rollout_id}/rollback")
+            assert resp.status_code == 200
+            assert ws.receive_json()["target_version"] == "1.2.0"
+        assert hub.connections == 0
+    finally:
+        app.dependency_overrides.clear()
+    assert store.metrics_for_ring("pilot").total == 1
+
+
+def test_broadcast_serializes_once_per_ring_and_skips_unchanged() -> None:
+    store = Store()
+    rollout = store.create_rollout("1.3.0", "1.2.0")
+    hub = PushHub(store)
+
+    async def scenario() -> list[str]:
+        pilot = [hub.subscribe("pilot") for _ in range(3)]
+        five = hub.subscribe("five")
+        for channel in (*pilot, five):
+            await channel.next()  # initial target
+
+        store.update_state(rollout.rollout_id, "paused")  # target unchanged: nothing sent
+        await asyncio.sleep(0)
+        assert hub.broadcasts == 0
+
+        # A rollback is several mutations but yields one broadcast per ring.
+        store.update_target_version(rollout.rollout_id, "1.2.0")
+        store.update_state(rollout.rollout_id, "active")
+        await asyncio.sleep(0)
+        return [await channel.next() for channel in (*pilot, five)]
+
+    messages = asyncio.run(scenario())
+    assert hub.broadcasts == 2
+    assert messages[0] is messages[1] is messages[2]  # one serialized string per ring
+    assert json.loads(messages[3]) == {
+        "type": "target",
+        "rollout_id": rollout.rollout_id,
+        "ring": "five",
+        "target_version": "1.2.0",
+    }
@@ -0,0 +1,161 @@
+"""Edge relay tests: several relays feeding one central node in-process."""
+
+import asyncio
+from datetime import UTC, datetime
+
+import httpx
+from fastapi.testclient import TestClient
+
+from app.clock import VirtualClock
+from app.dependencies import get_policy, get_store
+from app.main import app
+from app.policy import PolicyEngine
+from app.relay import Relay, create_app
+from app.schemas import CheckinReq, Health
+from app.sketch import Histogram, RingAggregate, expand
+from app.store import MAX_SUMMARY_SAMPLES, Store
+
+
+def _checkin(device_id: str, crash: float, boot_ok: bool = True) -> CheckinReq:
+    return CheckinReq(
+        device_id=device_id,
+        ring="pilot",
+        sw_version="1.1.0",
+        health=Health(boot_ok=boot_ok, crash_free=crash, checkin_ms=90),
+        ts=datetime.now(UTC).isoformat(),
+    )
+
+
+def test_histogram_merge_and_expand_preserve_distribution() -> None:
+    left, right = Histogram(1e-4), Histogram(1e-4)
+    for idx in range(100):
+        (left if idx % 2 else right).add(0.9 + idx / 1000)
+    left.merge(right)
+    assert left.count == 100
+    assert list(left.values_at_ranks([0, 50, 99])) == [0.9, 0.95, 0.999]
+
+    aggregate = RingAggregate()
+    for idx in range(5000):
+        aggregate.add(idx % 10 != 0, 0.99, 40 + idx % 20, "2024-01-01T00:00:00+00:00")
+    samples = list(expand(aggregate.to_summary("pilot"), limit=1000))
+    assert len(samples) == 1000
+    assert sum(not boot_ok for boot_ok, _, _ in samples) == 100
+    # Any contiguous tail (what survives window eviction) keeps the failure rate.
+    assert sum(not boot_ok for boot_ok, _, _ in samples[-200:]) == 20
+
+
+def test_relays_forward_summaries_into_central_windows() -> None:
+    store = Store()
+    policy = PolicyEngine(store)
+    rollout = store.create_rollout("1.2.0", "1.1.0")
+    app.dependency_overrides[get_store] = lambda: store
+    app.dependency_overrides[get_policy] = lambda: policy
+
+    async def scenario() -> tuple[Relay, Relay]:
+        transport = httpx.ASGITransport(app=app)
+        site_a = Relay(httpx.AsyncClient(transport=transport, base_url="http://central"), "a")
+        site_b = Relay(httpx.AsyncClient(transport=transport, base_url="http://central"), "b")
+        for idx in range(30):
+            site_a.record(_checkin(f"a-{idx}", crash=0.999))
+        for idx in range(10):
+            site_b.record(_checkin(f"b-{idx}", crash=0.97, boot_ok=idx != 0))
+        await site_a.flush()
+        await site_b.flush()
+        return site_a, site_b
+
+    try:
+        site_a, site_b = asyncio.run(scenario())
+    finally:
+        app.dependency_overrides.clear()
+
+    window = store.metrics_for_ring("pilot")
+    assert window.total == 40
+    assert window.boot_success == 39 / 40
+    assert window.crash_free_median == 0.999
+    assert site_a.forwarded == 30 and site_b.forwarded == 10
+    assert site_b.target.target_version == "1.2.0"
+    # 39/40 boot success is below the pause gate.
+    assert store.get_rollout(rollout.rollout_id).state == "paused"
+
+    device_client = TestClient(create_app(site_a))
+    resp = device_client.post("/v1/checkin", json=_checkin("a-1", crash=0.999).model_dump())
+    assert resp.json()["apply"]["target_version"] == "1.2.0"
+    assert resp.json()["rollout_id"] == rollout.rollout_id
+
+
+def test_failed_flush_keeps_summaries_for_retry() -> None:
+    def unavailable(request: httpx.Request) -> httpx.Response:
+        return httpx.Response(503)
+
+    async def scenario() -> Relay:
+        relay = Relay(
+            httpx.AsyncClient(transport=httpx.MockTransport(unavailable), base_url="http://c"),
+            "a",
+        )
+        relay.record(_checkin("a-1", crash=0.99))
+        assert await relay.flush() is None
+        relay.record(_checkin("a-2", crash=0.99))
+        return relay
+
+    relay = asyncio.run(scenario())
+    assert relay.flush_failures == 1
+    assert relay._pending["pilot"].count == 2
+
+
+def _summary(count: int, crash: float, ts: str) -> RingAggregate:
+    aggregate = RingAggregate()
+    for _ in range(count):
+        aggregate.add(True, crash, 40, ts)
+    return aggregate
+
+
+def test_large_flushes_share_a_proportional_budget() -> None:
+    clock = VirtualClock(datetime(2024, 5, 1, tzinfo=UTC))
+    store = Store(clock=clock, publish_interval=1.0)
+    ts = clock.now().isoformat()
+    for idx in range(400):
+        store.record_checkin(_checkin(f"d-{idx}", crash=0.999).model_copy(update={"ts": ts}))
+    view = store.view()
+    clock.advance(1.0)
+
+    big = _summary(30_000, 0.97, ts).to_summary("pilot")
+    small = _summary(10_000, 0.98, ts).to_summary("pilot")
+    assert store.record_summaries([big, small]) == MAX_SUMMARY_SAMPLES
+
+    window = store.ring_window("pilot")
+    crash = [health.crash_free for _, health in window]
+    assert len(window) == 400 + MAX_SUMMARY_SAMPLES
+    assert crash.count(0.97) == 3 * crash.count(0.98)
+    assert crash.count(0.999) == 400  # nothing was evicted
+    # Relay ingest republishes the view like check-ins do.
+    assert store._view is not view and store._view.metrics["pilot"].total == len(window)
+
+
+def test_inconsistent_summaries_are_rejected() -> None:
+    summary = _summary(10, 0.99, datetime.now(UTC).isoformat()).to_summary("pilot")
+    bad = [
+        summary.model_dump() | {"count": 11},
+        summary.model_dump() | {"boot_ok": 11},
+        summary.model_dump()
+        | {"checkin_ms": summary.checkin_ms.model_dump() | {"counts": [5], "keys": [1, 2]}},
+    ]
+    client = TestClient(app)
+    for item in bad:
+        resp = client.post("/v1/ingest/summaries", json={"relay_id": "r", "summaries": [item]})
+        assert resp.status_code == 422
+
+
+def test_summaries_without_histogram_bounds_are_rejected() -> None:
+    summary = _summary(10, 0.99, datetime.now(UTC).isoformat()).to_summary("pilot")
+    store = Store()
+    app.dependency_overrides[get_store] = lambda: store
+    client = TestClient(app)
+    try:
+        for field in ("crash_free", "checkin_ms"):
+            histogram = getattr(summary, field).model_dump(exclude={"min", "max"})
+            item = summary.model_dump() | {field: histogram}
+            resp = client.post("/v1/ingest/summaries", json={"relay_id": "r", "summaries": [item]})
+            assert resp.status_code == 422, field
+    finally:
+        app.dependency_overrides.clear()
+    assert not store.ring_window("pilot")
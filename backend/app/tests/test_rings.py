@@ -0,0 +1,43 @@
+"""Server-side cohort assignment tests."""
+
+from collections import Counter
+
+import pytest
+
+from app import rings
+from app.rings import CohortAssigner
+
+
+def test_assignment_is_stable_and_matches_exposure() -> None:
+    assigner = CohortAssigner()
+    devices = [f"tv-{idx}" for idx in range(20000)]
+    first = [assigner.assign(device) for device in devices]
+    assert first == [CohortAssigner().assign(device) for device in devices]
+
+    counts = Counter(first)
+    assert 0.005 < counts["pilot"] / len(devices) < 0.015
+    assert 0.03 < counts["five"] / len(devices) < 0.05
+    assert 0.18 < counts["twentyfive"] / len(devices) < 0.22
+
+
+def test_rebalance_only_moves_devices_into_earlier_rings() -> None:
+    assigner = CohortAssigner()
+    devices = [f"tv-{idx}" for idx in range(5000)]
+    before = {device: rings.index_for(assigner.assign(device)) for device in devices}
+
+    assigner.rebalance({"pilot": 200, "five": 1000, "twentyfive": 2500, "all": 10000})
+    after = {device: rings.index_for(assigner.assign(device)) for device in devices}
+    assert all(after[device] <= before[device] for device in devices)
+    assert any(after[device] < before[device] for device in devices)
+
+    with pytest.raises(ValueError):
+        assigner.rebalance({"pilot": 100, "five": 1000, "twentyfive": 2500, "all": 10000})
+
+
+def test_resolve_prefers_server_when_authoritative() -> None:
+    device = "tv-42"
+    assigned = CohortAssigner().assign(device)
+    other = next(ring for ring in rings.RINGS if ring != assigned)
+    assert CohortAssigner().resolve(device, other) == other
+    assert CohortAssigner().resolve(device, None) == assigned
+    assert CohortAssigner(authoritative=True).resolve(device, other) == assigned
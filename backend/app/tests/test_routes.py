@@ -2,17 +2,23 @@
 
 from __future__ import annotations
 
+import gzip
+import json
 from collections.abc import Generator
 from contextlib import contextmanager
-from datetime import UTC, datetime
+from datetime import UTC, datetime, timedelta
 
+import pytest
 from fastapi.testclient import TestClient
 
+from app import rings
+from app import store as store_module
+from app.clock import VirtualClock
 from app.dependencies import get_policy, get_store
 from app.main import app
 from app.policy import PolicyEngine
 from app.schemas import CheckinReq, Health
-from app.store import Store
+from app.store import MAX_CLOCK_SKEW, Store, encode_cursor
 
 
 @contextmanager
@@ -101,4 +107,224 @@ def test_should_promote_advisory_logged() -> None:
         assert store.events, "Advisory decisions should populate store events"
 
         decision = store.events[-1]
-        assert decision.kind in {"PROMOTE", "PAUSE", "ROLLBACK", "ADVISE_NO"}
\ No newline at end of file
+        assert decision.kind in {"PROMOTE", "PAUSE", "ROLLBACK", "ADVISE_NO"}
+
+def test_metrics_history_rollups() -> None:
+    with build_client() as (client, store):
+        for crash in (0.99, 0.97):
+            store.record_checkin(
+                CheckinReq(
+                    device_id="tv-1",
+                    ring="five",  # type: ignore[arg-type]
+                    sw_version="1.2.0",
+                    health=Health(boot_ok=True, crash_free=crash, checkin_ms=100),
+                    ts=datetime.now(UTC).isoformat(),
+                )
+            )
+
+        resp = client.get("/v1/metrics/history", params={"ring": "five", "resolution": "1h"})
+        assert resp.status_code == 200
+        payload = resp.json()
+        assert payload["step_seconds"] == 3600
+        point = payload["points"][-1]
+        assert point["total"] == 2
+        assert point["crash_free_min"] == 0.97
+
+        empty = client.get("/v1/metrics/history", params={"ring": "pilot"}).json()
+        assert empty["points"] == []
+
+
+def test_future_checkin_times_are_clamped() -> None:
+    clock = VirtualClock(datetime(2024, 5, 1, tzinfo=UTC))
+    store = Store(clock=clock)
+    health = Health(boot_ok=True, crash_free=0.99, checkin_ms=100)
+    store.record_health("tv-1", "five", clock.now() - timedelta(hours=2), health, "1.2.0")
+    store.record_health("tv-2", "five", clock.now() + timedelta(days=400), health, "1.2.0")
+
+    assert max(ts for ts, _ in store.ring_window("five")) == clock.now() + MAX_CLOCK_SKEW
+    points = store.rollups.series("five", "10s").points()
+    assert points[-1].start <= clock.now() + MAX_CLOCK_SKEW
+    # The earlier sample is still within the retained horizon.
+    assert len(store.rollups.series("five", "1h").points()) == 2
+
+
+def test_list_rollouts_filters_and_paginates() -> None:
+    with build_client() as (client, store):
+        ids = [
+            client.post(
+                "/v1/rollouts",
+                json={"target_version": f"1.{idx}.0", "last_known_good": "1.0.0"},
+            ).json()["rollout_id"]
+            for idx in range(5)
+        ]
+        store.update_state(ids[1], "paused")
+        store.update_state(ids[3], "paused")
+
+        first = client.get("/v1/rollouts", params={"limit": 2})
+        assert [r["rollout_id"] for r in first.json()] == ids[:2]
+        cursor = first.headers["X-Next-Cursor"]
+        second = client.get("/v1/rollouts", params={"limit": 2, "cursor": cursor})
+        assert [r["rollout_id"] for r in second.json()] == ids[2:4]
+
+        paused = client.get("/v1/rollouts", params={"state": "paused"})
+        assert [r["rollout_id"] for r in paused.json()] == [ids[1], ids[3]]
+        assert "X-Next-Cursor" not in paused.headers
+
+        assert client.get("/v1/rollouts", params={"cursor": "!!"}).status_code == 400
+        naive = encode_cursor((datetime(2024, 5, 1), ids[0]))
+        assert client.get("/v1/rollouts", params={"cursor": naive}).status_code == 400
+
+
+def test_decision_history_is_not_truncated() -> None:
+    with build_client() as (client, store):
+        rollout_id = client.post(
+            "/v1/rollouts",
+            json={"target_version": "1.2.0", "last_known_good": "1.1.0"},
+        ).json()["rollout_id"]
+        for idx in range(15):
+            client.post(f"/v1/rollouts/{rollout_id}/pause", json={"reason": f"pause {idx}"})
+
+        detail = client.get(f"/v1/rollouts/{rollout_id}").json()
+        assert len(detail["decisions"]) == 10
+        assert detail["decisions"][-1]["reason"] == "pause 14"
+
+        page = client.get(f"/v1/rollouts/{rollout_id}/decisions", params={"limit": 10}).json()
+        assert [d["reason"] for d in page["decisions"]][:2] == ["pause 0", "pause 1"]
+        rest = client.get(
+            f"/v1/rollouts/{rollout_id}/decisions", params={"cursor": page["next_cursor"]}
+        ).json()
+        assert len(rest["decisions"]) == 5
+        assert rest["next_cursor"] is None
+
+
+def test_events_are_bounded_but_decision_history_is_not(
+    monkeypatch: pytest.MonkeyPatch,
+) -> None:
+    monkeypatch.setattr(store_module, "MAX_EVENTS", 5)
+    with build_client() as (client, store):
+        rollout_id = client.post(
+            "/v1/rollouts",
+            json={"target_version": "1.2.0", "last_known_good": "1.1.0"},
+        ).json()["rollout_id"]
+        for idx in range(12):
+            client.post(f"/v1/rollouts/{rollout_id}/pause", json={"reason": f"pause {idx}"})
+        assert [event.reason for event in store.events] == [f"pause {idx}" for idx in range(7, 12)]
+
+        url = f"/v1/rollouts/{rollout_id}/decisions"
+        page = client.get(url, params={"limit": 3}).json()
+        assert [d["reason"] for d in page["decisions"]] == ["pause 0", "pause 1", "pause 2"]
+        assert len(store.rollouts[rollout_id].decisions) == 12
+
+
+def test_checkin_without_ring_is_assigned_by_server() -> None:
+    with build_client() as (client, store):
+        resp = client.post(
+            "/v1/checkin",
+            json={
+                "device_id": "tv-unassigned",
+                "sw_version": "1.2.0",
+                "health": {"boot_ok": True, "crash_free": 0.999, "checkin_ms": 40},
+                "ts": datetime.now(UTC).isoformat(),
+            },
+        )
+        assert resp.status_code == 200
+        ring = resp.json()["ring"]
+        assert ring == rings.CohortAssigner().assign("tv-unassigned")
+        assert store.metrics_for_ring(ring).total == 1
+
+
+def test_fleet_versions_endpoint() -> None:
+    with build_client() as (client, _):
+        client.post(
+            "/v1/rollouts",
+            json={"target_version": "1.2.0", "last_known_good": "1.1.0"},
+        )
+        for device, version in (("tv-1", "1.1.0"), ("tv-2", "1.2.0"), ("tv-1", "1.2.0")):
+            client.post(
+                "/v1/checkin",
+                json={
+                    "device_id": device,
+                    "ring": "five",
+                    "sw_version": version,
+                    "health": {"boot_ok": True, "crash_free": 0.999, "checkin_ms": 40},
+                    "ts": datetime.now(UTC).isoformat(),
+                },
+            )
+
+        payload = client.get("/v1/fleet/versions").json()
+        assert payload["total_devices"] == 2
+        assert payload["rings"]["five"] == {"total": 2, "on_target": 2, "versions": {"1.2.0": 2}}
+        assert payload["rings"]["pilot"]["total"] == 0
+
+
+def test_dashboard_covers_every_ring_and_reuses_metrics() -> None:
+    with build_client() as (client, store):
+        assert client.get("/v1/dashboard").json()["active_rollout"] is None
+
+        rollout_id = client.post(
+            "/v1/rollouts",
+            json={"target_version": "1.2.0", "last_known_good": "1.1.0"},
+        ).json()["rollout_id"]
+        client.post(
+            "/v1/checkin",
+            json={
+                "device_id": "tv-1",
+                "ring": "five",
+                "sw_version": "1.2.0",
+                "health": {"boot_ok": True, "crash_free": 0.999, "checkin_ms": 40},
+                "ts": datetime.now(UTC).isoformat(),
+            },
+        )
+        client.post(f"/v1/rollouts/{rollout_id}/pause", json={"reason": "hold"})
+
+        payload = client.get("/v1/dashboard").json()
+        assert payload["active_rollout"]["rollout_id"] == rollout_id
+        assert payload["active_ring"] == "pilot"
+        assert [d["kind"] for d in payload["decisions"]] == ["PAUSE"]
+        assert list(payload["rings"]) == list(rings.RINGS)
+        assert payload["rings"]["five"]["total"] == 1
+        assert payload["rings"]["pilot"]["total"] == 0
+
+        cached = store.metrics_for_ring("five")
+        assert store.metrics_for_ring("five") is cached
+
+
+def test_dashboard_shows_real_metrics_under_custom_gates() -> None:
+    with build_client() as (client, store):
+        latency_only = {
+            "metric": "checkin_ms",
+            "aggregation": "p99",
+            "comparator": "gt",
+            "threshold": 900,
+        }
+        client.post(
+            "/v1/rollouts",
+            json={"target_version": "1.2.0", "last_known_good": "1.1.0", "gates": [latency_only]},
+        )
+        for idx in range(5):
+            store.record_health(
+                f"tv-{idx}",
+                "pilot",
+                datetime.now(UTC),
+                Health(boot_ok=False, crash_free=0.1, checkin_ms=80),
+                "1.2.0",
+            )
+
+        pilot = client.get("/v1/dashboard").json()["rings"]["pilot"]
+        metrics = client.get("/v1/metrics").json()
+        assert pilot["boot_success"] == metrics["boot_success"] == 0.0
+        assert pilot["crash_free_median"] == metrics["crash_free_median"] == 0.1
+        assert pilot["breaches"] == ["crash_free_critical", "boot_success_critical"]
+
+
+def test_export_streams_gzip_ndjson() -> None:
+    with build_client() as (client, _):
+        client.post(
+            "/v1/rollouts",
+            json={"target_version": "1.2.0", "last_known_good": "1.1.0"},
+        )
+        resp = client.get("/v1/export", params={"format": "ndjson", "compression": "gzip"})
+        assert resp.status_code == 200
+        assert "saferoll-export.ndjson.gz" in resp.headers["content-disposition"]
+        lines = gzip.decompress(resp.content).splitlines()
+        assert [json.loads(line)["type"] for line in lines] == ["meta", "rollout"]
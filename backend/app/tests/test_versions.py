@@ -0,0 +1,86 @@
+"""Version-split ring windows: incremental cohorts and target-cohort gates."""
+
+from datetime import UTC, datetime
+from pathlib import Path
+
+from fastapi.testclient import TestClient
+
+from app.clock import VirtualClock
+from app.dependencies import get_store
+from app.main import app
+from app.policy import PolicyEngine
+from app.schemas import GateSpec, Health
+from app.store import MAX_WINDOW_LEN, Store
+
+CANARY_GATE = GateSpec(
+    name="canary_crash_free",
+    metric="crash_free",
+    aggregation="median",
+    comparator="lt",
+    threshold=0.99,
+    cohort="target",
+)
+
+
+def _record(store: Store, version: str, crash: float, count: int) -> None:
+    health = Health(boot_ok=True, crash_free=crash, checkin_ms=60)
+    for idx in range(count):
+        store.record_health(f"{version}-{idx}", "pilot", store.clock.now(), health, version)
+
+
+def test_target_cohort_gate_sees_regression_masked_by_old_majority() -> None:
+    store = Store()
+    policy = PolicyEngine(store)
+    rollout = store.create_rollout("1.3.0", "1.2.0", gates=[CANARY_GATE])
+    _record(store, "1.2.0", crash=0.999, count=90)
+    _record(store, "1.3.0", crash=0.95, count=10)
+
+    assert store.metrics_for_ring("pilot").crash_free_median == 0.999  # masked
+    assert store.metrics_for_version("pilot", "1.3.0").crash_free_median == 0.95
+    outcome = policy.evaluate_rollout(rollout.rollout_id)
+    assert outcome.breaches == ["canary_crash_free"]
+    assert outcome.metrics.snapshot()["target_total"] == 10
+    assert outcome.metrics.snapshot()["target_crash_free_median"] == 0.95
+
+
+def test_cohorts_follow_window_eviction_and_pruning() -> None:
+    clock = VirtualClock(datetime(2024, 5, 1, tzinfo=UTC))
+    store = Store(clock=clock)
+    _record(store, "1.2.0", crash=0.99, count=MAX_WINDOW_LEN)
+    _record(store, "1.3.0", crash=0.97, count=200)  # evicts the 200 oldest 1.2.0 samples
+    cohorts = store.version_cohorts("pilot")
+    assert {version: len(c.samples) for version, c in cohorts.items()} == {
+        "1.2.0": MAX_WINDOW_LEN - 200,
+        "1.3.0": 200,
+    }
+    assert cohorts["1.3.0"].boot_ok == 200
+
+    clock.advance(200)
+    _record(store, "1.3.0", crash=0.97, count=5)
+    clock.advance(150)  # everything but the last 5 samples leaves the window
+    assert store.metrics_for_version("pilot", "1.3.0").total == 5
+    assert store.metrics_for_version("pilot", "1.2.0").total == 0
+    assert set(store.version_cohorts("pilot")) == {"1.3.0"}
+    assert {v: m.total for v, m in store.metrics_by_version("pilot").items()} == {"1.3.0": 5}
+
+
+def test_version_metrics_endpoint_and_snapshot(tmp_path: Path) -> None:
+    store = Store.open(tmp_path)
+    store.create_rollout("1.3.0", "1.2.0")
+    _record(store, "1.2.0", crash=0.999, count=3)
+    _record(store, "1.3.0", crash=0.98, count=2)
+    store.write_snapshot()
+    store.close()
+
+    recovered = Store.open(tmp_path)
+    app.dependency_overrides[get_store] = lambda: recovered
+    try:
+        body = TestClient(app).get("/v1/metrics/versions").json()
+    finally:
+        app.dependency_overrides.clear()
+    assert body["ring"] == "pilot" and body["target_version"] == "1.3.0"
+    assert {version: m["total"] for version, m in body["versions"].items()} == {
+        "1.2.0": 3,
+        "1.3.0": 2,
+    }
+    assert body["versions"]["1.3.0"]["breaches"] == ["crash_free_median"]
@@ -0,0 +1,118 @@
+"""Published read views: copy-on-write sharing and publish cadence."""
+
+import threading
+from datetime import UTC, datetime
+
+from fastapi.testclient import TestClient
+
+from app.clock import VirtualClock
+from app.dependencies import get_store
+from app.main import app
+from app.policy import PolicyEngine
+from app.schemas import Health
+from app.store import Store
+
+HEALTHY = Health(boot_ok=True, crash_free=0.999, checkin_ms=60)
+
+
+def _checkin(store: Store, count: int = 1) -> None:
+    for idx in range(count):
+        store.record_health(f"tv-{idx}", "pilot", store.clock.now(), HEALTHY, "1.2.0")
+
+
+def test_view_shares_unchanged_parts() -> None:
+    store = Store()
+    first = store.create_rollout("1.2.0", "1.1.0")
+    second = store.create_rollout("1.3.0", "1.2.0")
+    before = store.view()
+    _checkin(store, 5)
+
+    after = store.view()
+    assert after is not before  # publish_interval 0: every read is fresh
+    assert after.rollouts is before.rollouts and after.decisions is before.decisions
+    assert after.metrics["pilot"].total == 5 and before.metrics["pilot"].total == 0
+
+    store.update_state(first.rollout_id, "paused")
+    changed = store.view()
+    assert changed.rollouts[first.rollout_id].state == "paused"
+    assert changed.rollouts[second.rollout_id] is after.rollouts[second.rollout_id]
+    assert after.rollouts[first.rollout_id].state == "active"  # old view untouched
+    assert [r.rollout_id for r in changed.list_rollouts("paused")] == [first.rollout_id]
+
+
+def test_publish_interval_batches_checkins_but_not_rollout_changes() -> None:
+    clock = VirtualClock(datetime(2024, 5, 1, tzinfo=UTC))
+    store = Store(clock=clock, publish_interval=1.0)
+    policy = PolicyEngine(store)
+    rollout = store.create_rollout("1.3.0", "1.2.0")
+    view = store.view()
+    _checkin(store, 10)
+    assert store.view() is view and view.metrics["pilot"].total == 0
+
+    clock.advance(1.0)
+    _checkin(store)  # the writer republishes once the interval has passed
+    fresh = store._view
+    assert fresh is not view and fresh.metrics["pilot"].total == 11
+    assert store.view() is fresh
+
+    store.append_event(
+        rollout.rollout_id,
+        policy.build_decision("PAUSE", "manual", "pilot", fresh.metrics["pilot"]),
+    )
+    assert [d.reason for d in store.view().decisions[rollout.rollout_id]] == ["manual"]
+
+
+def test_read_routes_serve_the_view() -> None:
+    store = Store(publish_interval=60.0)
+    app.dependency_overrides[get_store] = lambda: store
+    try:
+        client = TestClient(app)
+        rollout = client.post(
+            "/v1/rollouts", json={"target_version": "1.3.0", "last_known_good": "1.2.0"}
+        ).json()
+        assert client.get(f"/v1/rollouts/{rollout['rollout_id']}").status_code == 200
+        _checkin(store, 3)
+        # Check-ins within the interval are not visible yet; the rollout itself is.
+        assert client.get("/v1/metrics").json()["active_rollout_id"] == rollout["rollout_id"]
+        assert client.get("/v1/dashboard").json()["rings"]["pilot"]["total"] == 0
+        assert store.publish().metrics["pilot"].total == 3
+        assert client.get("/v1/dashboard").json()["rings"]["pilot"]["total"] == 3
+        assert client.get("/v1/rollouts/missing").status_code == 404
+    finally:
+        app.dependency_overrides.clear()
+
+
+def test_reads_race_checkins_safely() -> None:
+    store = Store(max_window_len=200)
+    errors: list[BaseException] = []
+    done = threading.Event()
+
+    def write() -> None:
+        try:
+            for idx in range(3000):
+                version = "1.2.0" if idx % 3 else "1.1.0"
+                store.record_health(f"race-{idx}", "pilot", store.clock.now(), HEALTHY, version)
+        except BaseException as exc:
+            errors.append(exc)
+        finally:
+            done.set()
+
+    def read() -> None:
+        try:
+            while not done.is_set():
+                store.view()
+                store.metrics_for_ring("pilot")
+                store.metrics_by_version("pilot")
+        except BaseException as exc:
+            errors.append(exc)
+
+    threads = [threading.Thread(target=write)] + [threading.Thread(target=read) for _ in range(3)]
+    for thread in threads:
+        thread.start()
+    for thread in threads:
+        thread.join()
+
+    assert errors == []
+    window = store.ring_window("pilot")
+    cohorts = store.version_cohorts("pilot")
+    assert sum(len(cohort.samples) for cohort in cohorts.values()) == len(window)
@@ -0,0 +1,198 @@
+"""Durability tests for the write-ahead log and snapshots."""
+
+import threading
+import time
+from datetime import UTC, datetime
+from pathlib import Path
+
+import pytest
+
+from app import wal
+from app.schemas import CheckinReq, Decision, Health
+from app.store import Store
+
+
+def _checkin(store: Store, crash: float = 0.999, count: int = 5) -> None:
+    for idx in range(count):
+        store.record_checkin(
+            CheckinReq(
+                device_id=f"tv-{idx}",
+                ring="pilot",
+                sw_version="1.2.0",
+                health=Health(boot_ok=True, crash_free=crash, checkin_ms=80),
+                ts=datetime.now(UTC).isoformat(),
+            )
+        )
+
+
+def test_replay_restores_rollouts_and_windows(tmp_path: Path) -> None:
+    store = Store.open(tmp_path)
+    rollout = store.create_rollout("1.2.0", "1.1.0")
+    _checkin(store)
+    store.update_ring_index(rollout.rollout_id, 1)
+    store.update_state(rollout.rollout_id, "paused")
+    store.append_event(
+        rollout.rollout_id,
+        Decision(
+            ts=datetime.now(UTC).isoformat(),
+            kind="PAUSE",
+            reason="Manual pause",
+            ring="five",
+            snapshot={"boot_success": 1.0},
+        ),
+    )
+    store.close()
+
+    recovered = Store.open(tmp_path)
+    state = recovered.get_rollout(rollout.rollout_id)
+    assert recovered.active_rollout() is state
+    assert state.ring_index == 1
+    assert state.state == "paused"
+    assert state.last_pause_ts is not None
+    assert [d.kind for d in recovered.rollout_decisions(rollout.rollout_id)] == ["PAUSE"]
+    assert recovered.metrics_for_ring("pilot").total == 5
+
+
+def test_snapshot_truncates_wal_and_replays_tail(tmp_path: Path) -> None:
+    store = Store.open(tmp_path, snapshot_every=10)
+    store.create_rollout("1.2.0", "1.1.0")
+    _checkin(store, count=12)
+    _checkin(store, crash=0.5, count=3)
+    store.close()
+
+    assert len(list(tmp_path.glob("snapshot-*.bin"))) == 1
+    assert all(path.stat().st_size < 400 for path in tmp_path.glob("wal-*.log"))
+
+    recovered = Store.open(tmp_path, snapshot_every=10)
+    window = recovered.metrics_for_ring("pilot")
+    assert window.total == 15
+    assert window.crash_free_median == 0.999
+
+
+def test_torn_tail_is_ignored(tmp_path: Path) -> None:
+    store = Store.open(tmp_path)
+    store.create_rollout("1.2.0", "1.1.0")
+    _checkin(store, count=3)
+    store.close()
+
+    segment = sorted(tmp_path.glob("wal-*.log"))[-1]
+    with segment.open("ab") as fp:
+        fp.write(b"\x10\x00\x00")
+
+    recovered = Store.open(tmp_path)
+    assert recovered.metrics_for_ring("pilot").total == 3
+
+
+def test_snapshot_keeps_rollup_history(tmp_path: Path) -> None:
+    store = Store.open(tmp_path)
+    _checkin(store, count=4)
+    store.write_snapshot()
+    store.close()
+
+    recovered = Store.open(tmp_path)
+    points = recovered.rollups.series("pilot", "10s").points()
+    assert sum(point.total for point in points) == 4
+
+
+def test_coalesced_decisions_survive_replay(tmp_path: Path) -> None:
+    store = Store.open(tmp_path)
+    rollout = store.create_rollout("1.2.0", "1.1.0")
+    for idx in range(3):
+        store.append_event(
+            rollout.rollout_id,
+            Decision(
+                ts=f"2024-05-01T12:00:0{idx}+00:00",
+                kind="ADVISE_NO",
+                reason="SLO breach",
+                ring="pilot",
+                snapshot={"crash_free_median": 0.98 - idx / 100},
+            ),
+            include_rollout_history=False,
+        )
+    store.close()
+
+    events = Store.open(tmp_path).events
+    assert len(events) == 1
+    assert events[0].count == 3
+    assert events[0].first_ts == "2024-05-01T12:00:00+00:00"
+    assert events[0].snapshot == {"crash_free_median": 0.96}
+
+
+def test_repeated_auto_pauses_are_not_fsynced_each(
+    tmp_path: Path, monkeypatch: pytest.MonkeyPatch
+) -> None:
+    store = Store.open(tmp_path, fsync_interval=60)  # no background flush mid-test
+    rollout = store.create_rollout("1.2.0", "1.1.0")
+    syncs = []
+    monkeypatch.setattr(wal.os, "fsync", syncs.append)
+    for idx in range(20):
+        store.update_state(rollout.rollout_id, "paused")
+        store.append_event(
+            rollout.rollout_id,
+            Decision(
+                ts=f"2024-05-01T12:00:{idx:02d}+00:00",
+                kind="PAUSE",
+                reason="Auto-pause: SLO breach",
+                ring="pilot",
+                snapshot={},
+            ),
+        )
+    assert len(syncs) == 1  # the one real state change
+    store.close()
+
+    recovered = Store.open(tmp_path).rollouts[rollout.rollout_id]
+    assert recovered.state == "paused" and recovered.decisions[-1].count == 20
+
+
+def test_concurrent_checkins_all_recover(tmp_path: Path) -> None:
+    store = Store.open(tmp_path, snapshot_every=3_000)
+    ts = datetime.now(UTC).isoformat()
+    health = Health(boot_ok=True, crash_free=0.999, checkin_ms=80)
+
+    def worker(thread: int) -> None:
+        for idx in range(2_000):
+            store.record_checkin(
+                CheckinReq(
+                    device_id=f"tv-{thread}-{idx}",
+                    ring="pilot",
+                    sw_version="1.2.0",
+                    health=health,
+                    ts=ts,
+                )
+            )
+
+    threads = [threading.Thread(target=worker, args=(thread,)) for thread in range(4)]
+    for thread in threads:
+        thread.start()
+    for thread in threads:
+        thread.join()
+    store.close()
+
+    assert store.fleet.size == 8_000
+    assert Store.open(tmp_path, snapshot_every=3_000).fleet.size == 8_000
+
+
+def test_idle_records_are_flushed_in_background(tmp_path: Path) -> None:
+    log = wal.WriteAheadLog(tmp_path / "wal-00000001.log", fsync_interval=0.01)
+    try:
+        log.append(wal.OP_CHECKIN, wal.encode_checkin(0, 1.0, True, 0.99, 50))
+        deadline = time.monotonic() + 2
+        while not list(wal.read_segment(log.path)) and time.monotonic() < deadline:
+            time.sleep(0.01)
+        assert len(list(wal.read_segment(log.path))) == 1
+    finally:
+        log.close()
+
+
+def test_truncated_snapshot_is_ignored(tmp_path: Path) -> None:
+    path = tmp_path / "snapshot-00000001.bin"
+    path.write_bytes(b"SR")
+    assert wal.read_snapshot(path) is None
+
+
+def test_checkin_strings_never_collide_with_the_null_marker() -> None:
+    longest = "c" * 0xFFFE
+    payload = wal.encode_checkin(0, 0.0, True, 1.0, 40, ("tv-1", "1.2.0", longest))
+    assert wal.decode_checkin(payload)[1] == ("tv-1", "1.2.0", longest)
+    with pytest.raises(ValueError):
+        wal.encode_checkin(0, 0.0, True, 1.0, 40, ("tv-1", "1.2.0", longest + "c"))
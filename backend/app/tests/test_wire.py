@@ -0,0 +1,102 @@
+"""Binary check-in protocol: codec round-trips and the /v1/checkin content-type switch."""
+
+from datetime import UTC, datetime
+
+import pytest
+from fastapi.testclient import TestClient
+
+from app import wire
+from app.dependencies import get_policy, get_store
+from app.main import app
+from app.policy import PolicyEngine
+from app.store import Store
+from simulator import wire as device_wire
+
+
+def test_checkin_round_trip() -> None:
+    ts = datetime(2024, 5, 1, 12, 0, tzinfo=UTC).timestamp()
+    data = wire.encode_checkin("tv-000042", "five", "1.12.305", ts, False, 0.9876, 70_000)
+    assert len(data) == wire.REQUEST.size == 44
+
+    checkin = wire.decode_checkin(data)
+    assert checkin.device_id == "tv-000042"
+    assert checkin.ring == "five"
+    assert checkin.sw_version == "1.12.305"
+    assert checkin.ts == datetime(2024, 5, 1, 12, 0, tzinfo=UTC)
+    assert checkin.health.boot_ok is False
+    assert checkin.health.crash_free == 0.9876
+    assert checkin.health.checkin_ms == 0xFFFF  # saturated
+
+    assert wire.decode_checkin(wire.encode_checkin("d", None, "1.0.0", ts, True, 1, 5)).ring is None
+    with pytest.raises(ValueError):
+        wire.decode_checkin(data[:-1])
+    with pytest.raises(ValueError):
+        wire.encode_checkin("d", "pilot", "1.2.0-rc1", ts, True, 1, 5)
+
+
+def test_binary_checkin_route() -> None:
+    store = Store()
+    policy = PolicyEngine(store)
+    rollout = store.create_rollout("1.3.0", "1.2.0")
+    app.dependency_overrides[get_store] = lambda: store
+    app.dependency_overrides[get_policy] = lambda: policy
+    headers = {"content-type": wire.CONTENT_TYPE}
+    try:
+        client = TestClient(app)
+        body = wire.encode_checkin(
+            "tv-1", "pilot", "1.2.0", datetime.now(UTC).timestamp(), True, 0.999, 80
+        )
+        resp = client.post("/v1/checkin", content=body, headers=headers)
+        assert resp.status_code == 200
+        assert resp.headers["content-type"] == wire.CONTENT_TYPE
+        version, ring, flags, next_check, target, rollout_id = wire.RESPONSE.unpack(resp.content)
+        assert ring == 0 and flags & wire.FLAG_TARGET
+        assert wire.unpack_version(target) == "1.3.0"
+        assert rollout_id.rstrip(b"\0").decode() == rollout.rollout_id
+        assert next_check == 30
+
+        bad = client.post("/v1/checkin", content=b"\x01" * 10, headers=headers)
+        assert bad.status_code == 400
+        assert client.post("/v1/checkin", content=b"{").status_code == 422
+    finally:
+        app.dependency_overrides.clear()
+
+    window = store.metrics_for_ring("pilot")
+    assert window.total == 1 and window.crash_free_median == 0.999
+
+
+def test_binary_response_flags_targets_that_do_not_pack() -> None:
+    store = Store()
+    store.create_rollout("1.3.0-rc1", "1.2.0")
+    app.dependency_overrides[get_store] = lambda: store
+    app.dependency_overrides[get_policy] = lambda: PolicyEngine(store)
+    try:
+        body = wire.encode_checkin(
+            "tv-rc-1", "pilot", "1.2.0", datetime.now(UTC).timestamp(), True, 0.999, 80
+        )
+        resp = TestClient(app).post(
+            "/v1/checkin", content=body, headers={"content-type": wire.CONTENT_TYPE}
+        )
+    finally:
+        app.dependency_overrides.clear()
+
+    assert resp.status_code == 200
+    _, _, flags, _, target, _ = wire.RESPONSE.unpack(resp.content)
+    assert flags == wire.FLAG_TARGET_JSON and target == 0
+    assert store.metrics_for_ring("pilot").total == 1
+
+
+def test_simulator_decodes_server_responses() -> None:
+    packed = device_wire.decode_response(wire.encode_response("r-1", "five", "1.3.0", 30))
+    assert packed == ("five", "1.3.0", "r-1", False)
+
+    unpackable = device_wire.decode_response(wire.encode_response("r-1", None, "1.3.0-rc1", 30))
+    assert unpackable.target_version is None and unpackable.target_over_json
+    assert unpackable.ring is None and unpackable.rollout_id == "r-1"
+
+    assert device_wire.decode_response(wire.encode_response("", "all", None, 30)) == (
+        "all",
+        None,
+        "",
+        False,
+    )
@@ -0,0 +1,397 @@
+"""Append-only write-ahead log and compact snapshots backing the in-memory Store.
+
+Layout of a data directory::
+
+    wal-00000003.log        append-only segments, replayed in order
+    snapshot-00000003.bin   full state covering every segment before #3
+
+Every record is framed as ``<length:u32><crc32:u32><op:u8><payload>``. Check-ins use a
+fixed binary payload; the rare rollout/decision mutations carry a small JSON payload.
+A torn or corrupt record ends replay of its segment, so a crash mid-write only loses
+the unsynced tail.
+"""
+
+from __future__ import annotations
+
+import json
+import os
+import struct
+import threading
+import time
+import zlib
+from collections.abc import Iterator
+from dataclasses import dataclass, field
+from pathlib import Path
+from typing import Any
+
+OP_CHECKIN = 1
+OP_CREATE_ROLLOUT = 2
+OP_SET_ACTIVE = 3
+OP_RING_INDEX = 4
+OP_STATE = 5
+OP_TARGET_VERSION = 6
+OP_EVENT = 7
+OP_CONFIG = 8
+
+FSYNC_INTERVAL_SECONDS = 0.05
+FSYNC_BATCH = 1024
+SNAPSHOT_EVERY = 100_000
+
+_FRAME = struct.Struct("<IIB")
+# epoch seconds, boot_ok, crash_free, checkin_ms
+_SAMPLE = struct.Struct("<d?dI")
+# ring index followed by a sample
+_CHECKIN = struct.Struct("<B" + _SAMPLE.format[1:])
+# length-prefixed strings trailing a check-in record (device id, version, config)
+_STR_LEN = struct.Struct("<H")
+_NULL_STR = 0xFFFF
+_SNAPSHOT_MAGIC = b"SRSNAP2\n"
+_SNAPSHOT_HEADER = struct.Struct("<QI")
+_COUNT = struct.Struct("<I")
+_BLOB_HEADER = struct.Struct("<HI")
+_CRC = struct.Struct("<I")
+
+
+def _segment_name(seq: int) -> str:
+    return f"wal-{seq:08d}.log"
+
+
+def _snapshot_name(seq: int) -> str:
+    return f"snapshot-{seq:08d}.bin"
+
+
+def _seq_of(path: Path) -> int:
+    return int(path.stem.split("-", 1)[1])
+
+
+def encode_checkin(
+    ring_index: int,
+    ts: float,
+    boot_ok: bool,
+    crash_free: float,
+    ms: int,
+    device: tuple[str, str, str | None] | None = None,
+) -> bytes:
+    """Pack a check-in; ``device`` is ``(device_id, sw_version, last_config)``."""
+
+    fixed = _CHECKIN.pack(ring_index, ts, boot_ok, crash_free, ms)
+    if device is None:
+        return fixed
+    return fixed + b"".join(_pack_str(value) for value in device)
+
+
+def decode_checkin(
+    payload: bytes,
+) -> tuple[tuple[int, float, bool, float, int], tuple[str, str, str | None] | None]:
+    fixed = _CHECKIN.unpack_from(payload)
+    if len(payload) == _CHECKIN.size:
+        return fixed, None
+    offset = _CHECKIN.size
+    values: list[str | None] = []
+    for _ in range(3):
+        value, offset = _unpack_str(payload, offset)
+        values.append(value)
+    device_id, sw_version, last_config = values
+    return fixed, (device_id or "", sw_version or "", last_config)
+
+
+def _pack_str(value: str | None) -> bytes:
+    if value is None:
+        return _STR_LEN.pack(_NULL_STR)
+    encoded = value.encode()
+    if len(encoded) >= _NULL_STR:
+        raise ValueError(f"String of {len(encoded)} bytes does not fit a WAL record")
+    return _STR_LEN.pack(len(encoded)) + encoded
+
+
+def _unpack_str(payload: bytes, offset: int) -> tuple[str | None, int]:
+    (length,) = _STR_LEN.unpack_from(payload, offset)
+    offset += _STR_LEN.size
+    if length == _NULL_STR:
+        return None, offset
+    return payload[offset : offset + length].decode(), offset + length
+
+
+@dataclass
+class SnapshotState:
+    """Decoded snapshot contents handed back to the Store."""
+
+    meta: dict[str, Any]
+    windows: list[list[tuple[float, bool, float, int]]]
+    blobs: dict[str, bytes] = field(default_factory=dict)
+
+
+class WriteAheadLog:
+    """Single append-only segment with batched fsync.
+
+    Safe to append from several threads: each record is written as one frame under a
+    lock. A background thread flushes and fsyncs pending records every
+    ``fsync_interval`` seconds, so a burst followed by silence still reaches the disk.
+    """
+
+    def __init__(
+        self,
+        path: Path,
+        fsync_interval: float = FSYNC_INTERVAL_SECONDS,
+        fsync_batch: int = FSYNC_BATCH,
+    ) -> None:
+        self.path = path
+        self.fsync_interval = fsync_interval
+        self.fsync_batch = fsync_batch
+        self._fp = open(path, "ab", buffering=1 << 16)
+        self._pending = 0
+        self._last_sync = time.monotonic()
+        self._lock = threading.Lock()
+        self._closed = threading.Event()
+        self._flusher = threading.Thread(
+            target=self._flush_loop, name=f"wal-flush-{path.name}", daemon=True
+        )
+        self._flusher.start()
+
+    def append(self, op: int, payload: bytes, *, durable: bool = False) -> None:
+        crc = zlib.crc32(payload, zlib.crc32(bytes((op,))))
+        frame = _FRAME.pack(len(payload), crc, op) + payload
+        with self._lock:
+            self._fp.write(frame)
+            self._pending += 1
+            if (
+                durable
+                or self._pending >= self.fsync_batch
+                or time.monotonic() - self._last_sync >= self.fsync_interval
+            ):
+                self._sync()
+
+    def sync(self) -> None:
+        with self._lock:
+            self._sync()
+
+    def close(self) -> None:
+        self._closed.set()
+        if self._flusher is not threading.current_thread():
+            self._flusher.join()
+        with self._lock:
+            if self._fp.closed:
+                return
+            self._sync()
+            self._fp.close()
+
+    def _sync(self) -> None:
+        if self._fp.closed:
+            return
+        self._fp.flush()
+        if self._pending:
+            os.fsync(self._fp.fileno())
+        self._pending = 0
+        self._last_sync = time.monotonic()
+
+    def _flush_loop(self) -> None:
+        while not self._closed.wait(self.fsync_interval):
+            with self._lock:
+                if self._pending:
+                    self._sync()
+
+
+def read_segment(path: Path) -> Iterator[tuple[int, bytes]]:
+    """Yield ``(op, payload)`` records, stopping at the first torn or corrupt frame."""
+
+    data = path.read_bytes()
+    offset = 0
+    end = len(data)
+    frame_size = _FRAME.size
+    while offset + frame_size <= end:
+        length, crc, op = _FRAME.unpack_from(data, offset)
+        start = offset + frame_size
+        payload = data[start : start + length]
+        if len(payload) != length or zlib.crc32(payload, zlib.crc32(bytes((op,)))) != crc:
+            return
+        yield op, payload
+        offset = start + length
+
+
+def write_snapshot(path: Path, wal_seq: int, state: SnapshotState) -> None:
+    """Atomically write a snapshot (tmp file, fsync, rename)."""
+
+    meta = json.dumps(state.meta, separators=(",", ":")).encode()
+    chunks = [_SNAPSHOT_MAGIC, _SNAPSHOT_HEADER.pack(wal_seq, len(meta)), meta]
+    chunks.append(_COUNT.pack(len(state.windows)))
+    for window in state.windows:
+        chunks.append(_COUNT.pack(len(window)))
+        chunks.append(b"".join([_SAMPLE.pack(*sample) for sample in window]))
+    for name, blob in state.blobs.items():
+        encoded = name.encode()
+        chunks.extend((_BLOB_HEADER.pack(len(encoded), len(blob)), encoded, blob))
+    body = b"".join(chunks)
+
+    tmp = path.with_suffix(".tmp")
+    with open(tmp, "wb") as fp:
+        fp.write(body)
+        fp.write(_CRC.pack(zlib.crc32(body)))
+        fp.flush()
+        os.fsync(fp.fileno())
+    os.replace(tmp, path)
+
+
+def read_snapshot(path: Path) -> tuple[int, SnapshotState] | None:
+    """Return ``(wal_seq, state)`` or None when the file is missing or corrupt."""
+
+    try:
+        data = path.read_bytes()
+    except OSError:
+        return None
+    if len(data) < len(_SNAPSHOT_MAGIC) + _CRC.size:
+        return None
+    body, trailer = data[: -_CRC.size], data[-_CRC.size :]
+    if not body.startswith(_SNAPSHOT_MAGIC) or _CRC.unpack(trailer)[0] != zlib.crc32(body):
+        return None
+
+    offset = len(_SNAPSHOT_MAGIC)
+    wal_seq, meta_len = _SNAPSHOT_HEADER.unpack_from(body, offset)
+    offset += _SNAPSHOT_HEADER.size
+    meta = json.loads(body[offset : offset + meta_len])
+    offset += meta_len
+
+    windows: list[list[tuple[float, bool, float, int]]] = []
+    (window_count,) = _COUNT.unpack_from(body, offset)
+    offset += _COUNT.size
+    for _ in range(window_count):
+        (count,) = _COUNT.unpack_from(body, offset)
+        offset += _COUNT.size
+        size = count * _SAMPLE.size
+        windows.append(list(_SAMPLE.iter_unpack(body[offset : offset + size])))
+        offset += size
+
+    blobs: dict[str, bytes] = {}
+    while offset < len(body):
+        name_len, blob_len = _BLOB_HEADER.unpack_from(body, offset)
+        offset += _BLOB_HEADER.size
+        name = body[offset : offset + name_len].decode()
+        offset += name_len
+        blobs[name] = body[offset : offset + blob_len]
+        offset += blob_len
+    return wal_seq, SnapshotState(meta=meta, windows=windows, blobs=blobs)
+
+
+class Journal:
+    """Owns the WAL segments and snapshots inside a data directory."""
+
+    def __init__(
+        self,
+        data_dir: str | os.PathLike[str],
+        *,
+        fsync_interval: float = FSYNC_INTERVAL_SECONDS,
+        fsync_batch: int = FSYNC_BATCH,
+        snapshot_every: int = SNAPSHOT_EVERY,
+    ) -> None:
+        self.data_dir = Path(data_dir)
+        self.data_dir.mkdir(parents=True, exist_ok=True)
+        self.fsync_interval = fsync_interval
+        self.fsync_batch = fsync_batch
+        self.snapshot_every = snapshot_every
+        self._since_snapshot = 0
+        self._wal: WriteAheadLog | None = None
+
+    # ------------------------------------------------------------------
+    # Recovery
+    # ------------------------------------------------------------------
+    def load(self) -> tuple[SnapshotState | None, Iterator[tuple[int, bytes]]]:
+        """Return the newest valid snapshot plus an iterator over the WAL tail after it."""
+
+        snapshot: SnapshotState | None = None
+        start_seq = 0
+        for path in sorted(self.data_dir.glob("snapshot-*.bin"), reverse=True):
+            loaded = read_snapshot(path)
+            if loaded is not None:
+                start_seq, snapshot = loaded
+                break
+
+        segments = [
+            path for path in sorted(self.data_dir.glob("wal-*.log")) if _seq_of(path) >= start_seq
+        ]
+        self._since_snapshot = 0
+
+        def _records() -> Iterator[tuple[int, bytes]]:
+            for path in segments:
+                for record in read_segment(path):
+                    self._since_snapshot += 1
+                    yield record
+
+        return snapshot, _records()
+
+    def open_for_append(self) -> None:
+        """Start a fresh segment after the newest one on disk."""
+
+        seqs = [_seq_of(path) for path in self.data_dir.glob("wal-*.log")]
+        seqs += [_seq_of(path) for path in self.data_dir.glob("snapshot-*.bin")]
+        self._open_segment(max(seqs, default=0) + 1)
+
+    # ------------------------------------------------------------------
+    # Writing
+    # ------------------------------------------------------------------
+    def append(self, op: int, payload: bytes, *, durable: bool = False) -> None:
+        if self._wal is None:
+            raise RuntimeError("Journal is not open for writing")
+        self._wal.append(op, payload, durable=durable)
+        self._since_snapshot += 1
+
+    def append_json(self, op: int, data: Any, *, durable: bool = True) -> None:
+        """Rollout mutations are rare and important, so they are fsynced immediately.
+
+        Pass ``durable=False`` for records that can repeat per check-in (decision events);
+        they go through the batched fsync like samples do.
+        """
+
+        self.append(op, json.dumps(data, separators=(",", ":")).encode(), durable=durable)
+
+    def snapshot_due(self) -> bool:
+        return self._since_snapshot >= self.snapshot_every
+
+    def write_snapshot(self, state: SnapshotState) -> None:
+        """Rotate to a new segment, persist ``state`` and drop what it supersedes.
+
+        ``state`` must reflect every record appended so far.
+        """
+
+        if self._wal is None:
+            raise RuntimeError("Journal is not open for writing")
+        seq = _seq_of(self._wal.path) + 1
+        self._open_segment(seq)
+        write_snapshot(self.data_dir / _snapshot_name(seq), seq, state)
+        self._fsync_dir()
+        for path in self.data_dir.glob("wal-*.log"):
+            if _seq_of(path) < seq:
+                path.unlink(missing_ok=True)
+        for path in self.data_dir.glob("snapshot-*.bin"):
+            if _seq_of(path) < seq:
+                path.unlink(missing_ok=True)
+        self._since_snapshot = 0
+
+    def sync(self) -> None:
+        if self._wal is not None:
+            self._wal.sync()
+
+    def close(self) -> None:
+        if self._wal is not None:
+            self._wal.close()
+            self._wal = None
+
+    def _open_segment(self, seq: int) -> None:
+        if self._wal is not None:
+            self._wal.close()
+        self._wal = WriteAheadLog(
+            self.data_dir / _segment_name(seq),
+            fsync_interval=self.fsync_interval,
+            fsync_batch=self.fsync_batch,
+        )
+        self._fsync_dir()
+
+    def _fsync_dir(self) -> None:
+        try:
+            fd = os.open(self.data_dir, os.O_RDONLY)
+        except OSError:
+            return
+        try:
+            os.fsync(fd)
+        except OSError:
+            pass
+        finally:
+            os.close(fd)
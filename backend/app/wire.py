@@ -0,0 +1,162 @@
+"""Compact fixed-layout binary encoding of check-ins for constrained devices.
+
+Sent to ``POST /v1/checkin`` with ``Content-Type: application/x-saferoll-checkin``; the
+response then uses the same content type. All integers are little-endian.
+
+Request (44 bytes)::
+
+    B   protocol version (1)
+    B   ring index into rings.RINGS, 0xFF = let the server assign
+    B   flags, bit 0 = boot_ok
+    x   padding
+    d   check-in time, seconds since the Unix epoch
+    H   crash_free in units of 1e-4 (0..10000)
+    H   checkin_ms (saturates at 65535)
+    I   sw_version, semver packed as major << 22 | minor << 12 | patch
+    24s device_id, UTF-8, NUL padded
+
+Response (21 bytes)::
+
+    B   protocol version (1)
+    B   ring index the check-in was recorded under, 0xFF = none
+    B   flags, bit 0 = target version present, bit 1 = a target version that does not
+        fit the packed form (e.g. ``1.3.0-rc1``): check in over JSON to get it
+    H   next_check_seconds (saturates at 65535)
+    I   target version (packed semver, 0 when absent)
+    12s rollout_id, NUL padded
+
+Decoding is a single ``struct.unpack_from``; ring and version strings come from lookup
+tables, so no per-field objects are created beyond the values themselves.
+"""
+
+from __future__ import annotations
+
+import functools
+import struct
+from datetime import UTC, datetime
+from typing import NamedTuple
+
+from . import rings
+from .schemas import Health, Ring
+
+CONTENT_TYPE = "application/x-saferoll-checkin"
+PROTOCOL_VERSION = 1
+NO_RING = 0xFF
+FLAG_BOOT_OK = 0x01
+FLAG_TARGET = 0x01
+FLAG_TARGET_JSON = 0x02
+CRASH_FREE_SCALE = 10_000
+DEVICE_ID_BYTES = 24
+ROLLOUT_ID_BYTES = 12
+
+REQUEST = struct.Struct("<BBBxdHHI24s")
+RESPONSE = struct.Struct("<BBBHI12s")
+
+_MAJOR_SHIFT, _MINOR_SHIFT = 22, 12
+_MAJOR_MAX, _MINOR_MAX, _PATCH_MAX = (1 << 10) - 1, (1 << 10) - 1, (1 << 12) - 1
+
+
+class BinaryCheckin(NamedTuple):
+    device_id: str
+    ring: Ring | None
+    sw_version: str
+    ts: datetime
+    health: Health
+
+
+def pack_version(version: str) -> int:
+    """Pack ``MAJOR.MINOR.PATCH``; raises ValueError if it does not fit the wire format."""
+
+    try:
+        major, minor, patch = (int(part) for part in version.split("."))
+    except ValueError as exc:
+        raise ValueError(f"Version {version!r} is not MAJOR.MINOR.PATCH") from exc
+    if not (0 <= major <= _MAJOR_MAX and 0 <= minor <= _MINOR_MAX and 0 <= patch <= _PATCH_MAX):
+        raise ValueError(f"Version {version!r} is out of range for the binary protocol")
+    return major << _MAJOR_SHIFT | minor << _MINOR_SHIFT | patch
+
+
+# Keyed by client-supplied values, so bounded: a fleet reports only a few versions.
+@functools.lru_cache(maxsize=1024)
+def unpack_version(packed: int) -> str:
+    return f"{packed >> _MAJOR_SHIFT}.{packed >> _MINOR_SHIFT & _MINOR_MAX}.{packed & _PATCH_MAX}"
+
+
+def encode_checkin(
+    device_id: str,
+    ring: Ring | None,
+    sw_version: str,
+    ts: float,
+    boot_ok: bool,
+    crash_free: float,
+    checkin_ms: int,
+) -> bytes:
+    raw_id = device_id.encode()
+    if len(raw_id) > DEVICE_ID_BYTES:
+        raise ValueError(f"device_id longer than {DEVICE_ID_BYTES} bytes")
+    return REQUEST.pack(
+        PROTOCOL_VERSION,
+        NO_RING if ring is None else rings.index_for(ring),
+        FLAG_BOOT_OK if boot_ok else 0,
+        ts,
+        round(min(max(crash_free, 0.0), 1.0) * CRASH_FREE_SCALE),
+        min(max(checkin_ms, 0), 0xFFFF),
+        pack_version(sw_version),
+        raw_id,
+    )
+
+
+def decode_checkin(data: bytes) -> BinaryCheckin:
+    """Decode a request body; raises ValueError on malformed input."""
+
+    if len(data) != REQUEST.size:
+        raise ValueError(f"Binary check-in must be {REQUEST.size} bytes, got {len(data)}")
+    version, ring_index, flags, ts, crash, ms, packed_version, raw_id = REQUEST.unpack(data)
+    if version != PROTOCOL_VERSION:
+        raise ValueError(f"Unsupported binary protocol version {version}")
+    if ring_index != NO_RING and ring_index >= len(rings.RINGS):
+        raise ValueError(f"Unknown ring index {ring_index}")
+    if crash > CRASH_FREE_SCALE:
+        raise ValueError("crash_free out of range")
+    try:
+        device_id = raw_id.rstrip(b"\0").decode()
+        timestamp = datetime.fromtimestamp(ts, UTC)
+    except (UnicodeDecodeError, ValueError, OverflowError, OSError) as exc:
+        raise ValueError("Malformed binary check-in") from exc
+    if not device_id:
+        raise ValueError("Empty device_id")
+    return BinaryCheckin(
+        device_id=device_id,
+        ring=None if ring_index == NO_RING else rings.RINGS[ring_index],
+        sw_version=unpack_version(packed_version),
+        ts=timestamp,
+        health=Health.model_construct(
+            boot_ok=bool(flags & FLAG_BOOT_OK),
+            crash_free=crash / CRASH_FREE_SCALE,
+            checkin_ms=ms,
+        ),
+    )
+
+
+def encode_response(
+    rollout_id: str,
+    ring: Ring | None,
+    target_version: str | None,
+    next_check_seconds: int,
+) -> bytes:
+    """Pack a check-in answer; never raises on a target the packed form cannot carry."""
+
+    flags, packed = 0, 0
+    if target_version:
+        try:
+            flags, packed = FLAG_TARGET, pack_version(target_version)
+        except ValueError:
+            flags = FLAG_TARGET_JSON
+    return RESPONSE.pack(
+        PROTOCOL_VERSION,
+        NO_RING if ring is None else rings.index_for(ring),
+        flags,
+        min(next_check_seconds, 0xFFFF),
+        packed,
+        rollout_id.encode()[:ROLLOUT_ID_BYTES],
+    )
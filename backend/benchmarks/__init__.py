@@ -0,0 +1 @@
+"""Performance benchmarks for the SafeRoll backend (run with ``python -m benchmarks.<name>``)."""
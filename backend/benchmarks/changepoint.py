@@ -0,0 +1,138 @@
+"""Detection delay and false-positive rate of the change-point detector vs the window gates.
+
+Health samples are drawn like the simulator's ``HealthProfile``: ``crash_free`` uniform in
+``0.99 - drop ± 0.01``, and boot failure probability ``0.001 + 5 * drop`` (the simulator's
+``failure_bias``). Each regression trial replays ``--baseline`` healthy samples into the
+pilot ring, then switches to the faulty profile and evaluates the rollout after every
+sample. It reports how many faulty samples, and how many seconds at ``--rate``
+check-ins/s, pass before:
+
+* the change-point detector raises a ``*_shift`` rollback breach, and
+* a window rollback gate (the five-minute median/mean) breaches.
+
+The false-positive run streams ``--healthy`` healthy samples through a detector alone and
+counts alarms. The "benign" profile degrades but stays above both rollback floors
+(``crash_free`` about 0.97, 1% boot failures), so neither should fire on it.
+
+Usage::
+
+    python -m benchmarks.changepoint --trials 20 --healthy 2000000
+"""
+
+from __future__ import annotations
+
+import argparse
+import random
+import statistics
+from datetime import UTC, datetime
+
+from app import metrics
+from app.changepoint import RingShiftDetector
+from app.clock import VirtualClock
+from app.policy import SHIFT_SUFFIX, PolicyEngine
+from app.schemas import Health
+from app.store import Store
+
+# name -> (crash_free drop, boot failure probability)
+REGRESSIONS = {
+    "sharp": (0.10, 0.501),
+    "moderate": (0.05, 0.251),
+    "mild": (0.01, 0.051),
+    "benign": (0.02, 0.01),
+}
+HEALTHY = (0.0, 0.001)
+MAX_FAULTY = 5_000
+
+
+def _sample(rng: random.Random, profile: tuple[float, float]) -> Health:
+    drop, boot_failure = profile
+    return Health.model_construct(
+        boot_ok=rng.random() > boot_failure,
+        crash_free=round(max(0.0, min(1.0, 0.99 - drop + rng.uniform(-0.01, 0.01))), 3),
+        checkin_ms=int(80 * rng.uniform(0.8, 1.2)),
+    )
+
+
+def _trial(
+    seed: int, profile: tuple[float, float], baseline: int, rate: float
+) -> tuple[int | None, int | None]:
+    """Faulty samples until (detector breach, window breach); None if not within MAX_FAULTY."""
+
+    rng = random.Random(seed)
+    clock = VirtualClock(datetime(2024, 5, 1, tzinfo=UTC))
+    store = Store(clock=clock)
+    policy = PolicyEngine(store)
+    rollout = store.create_rollout("1.3.0", "1.2.0")
+    step = 1 / rate
+    for idx in range(baseline):
+        clock.advance(step)
+        store.record_health(f"tv-{idx % 500}", "pilot", clock.now(), _sample(rng, HEALTHY), "1.2.0")
+
+    detected = window = None
+    for idx in range(MAX_FAULTY):
+        clock.advance(step)
+        store.record_health(f"tv-{idx % 500}", "pilot", clock.now(), _sample(rng, profile), "1.3.0")
+        breaches = policy.evaluate_rollout(rollout.rollout_id).metrics.rollback_breaches
+        if detected is None and any(name.endswith(SHIFT_SUFFIX) for name in breaches):
+            detected = idx + 1
+        if window is None and any(not name.endswith(SHIFT_SUFFIX) for name in breaches):
+            window = idx + 1
+        if detected is not None and window is not None:
+            break
+    return detected, window
+
+
+def _false_alarms(samples: int, seed: int) -> tuple[int, int]:
+    """(alarm episodes, samples spent alarmed) over a healthy stream."""
+
+    rng = random.Random(seed)
+    detector = RingShiftDetector(metrics.AUTO_ROLLBACK_CRASH, metrics.AUTO_ROLLBACK_BOOT)
+    episodes = alarmed = 0
+    previous = False
+    for _ in range(samples):
+        detector.update(_sample(rng, HEALTHY))
+        current = bool(detector.shifted())
+        episodes += current and not previous
+        alarmed += current
+        previous = current
+    return episodes, alarmed
+
+
+def _describe(delays: list[int | None], rate: float) -> str:
+    hits = [delay for delay in delays if delay is not None]
+    if not hits:
+        return f"none within {MAX_FAULTY}"
+    median = statistics.median(hits)
+    return (
+        f"median {median:.0f} samples ({median / rate:.1f}s) max {max(hits)} "
+        f"hit {len(hits)}/{len(delays)}"
+    )
+
+
+def main() -> None:
+    parser = argparse.ArgumentParser(description=__doc__.splitlines()[0])
+    parser.add_argument("--trials", type=int, default=20)
+    parser.add_argument("--baseline", type=int, default=1_500)
+    parser.add_argument("--rate", type=float, default=20.0, help="pilot check-ins per second")
+    parser.add_argument("--healthy", type=int, default=1_000_000)
+    parser.add_argument("--seed", type=int, default=7)
+    args = parser.parse_args()
+
+    for name, profile in REGRESSIONS.items():
+        results = [
+            _trial(args.seed + trial, profile, args.baseline, args.rate)
+            for trial in range(args.trials)
+        ]
+        print(f"{name} (crash_free -{profile[0]}, boot failures {profile[1]:.1%}):")
+        print(f"  detector: {_describe([detected for detected, _ in results], args.rate)}")
+        print(f"  window:   {_describe([window for _, window in results], args.rate)}")
+
+    episodes, alarmed = _false_alarms(args.healthy, args.seed)
+    print(
+        f"healthy: {episodes} false alarms in {args.healthy} samples "
+        f"({alarmed} samples alarmed)"
+    )
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,110 @@
+"""Measure rollback propagation latency to devices connected over the WebSocket channel.
+
+Each simulated connection is a task subscribed to the :class:`~app.push.PushHub` that
+timestamps every message it receives; socket framing and network time are not included.
+An auto-rollback is triggered from a worker thread, as a sync route would, and the
+latency from the start of that call until each connection holds the new target is
+reported next to the 30-second polling interval it replaces.
+
+Usage::
+
+    python -m benchmarks.push --connections 50000 --rounds 5
+"""
+
+from __future__ import annotations
+
+import argparse
+import asyncio
+import time
+
+from app import rings
+from app.clock import VirtualClock
+from app.metrics import WINDOW_SECONDS
+from app.policy import PolicyEngine
+from app.push import PushChannel, PushHub
+from app.routes.health import NEXT_CHECK_SECONDS
+from app.schemas import Health
+from app.store import Store
+
+RING_SHARE = {"pilot": 0.01, "five": 0.04, "twentyfive": 0.20, "all": 0.75}
+
+
+async def _consume(
+    channel: PushChannel, received: list[float], expected: str, total: int, done: asyncio.Event
+) -> None:
+    while True:
+        message = await channel.next()
+        if expected in message:
+            received.append(time.perf_counter())
+            if len(received) == total:
+                done.set()
+
+
+def _percentile(values: list[float], q: float) -> float:
+    ordered = sorted(values)
+    return ordered[min(len(ordered) - 1, int(q * len(ordered)))]
+
+
+async def run(connections: int, rounds: int) -> None:
+    clock = VirtualClock()
+    store = Store(clock=clock)
+    policy = PolicyEngine(store)
+    hub = PushHub(store)
+    rollout = store.create_rollout("1.3.0", "1.2.0")
+    channels = [
+        hub.subscribe(ring)
+        for ring in rings.RINGS
+        for _ in range(max(1, round(connections * RING_SHARE[ring])))
+    ]
+    for channel in channels:
+        await channel.next()  # drain the initial target
+    print(f"connections={len(channels)} rings={len(rings.RINGS)}")
+
+    bad = Health(boot_ok=False, crash_free=0.80, checkin_ms=500)
+    for round_idx in range(rounds):
+        received: list[float] = []
+        done = asyncio.Event()
+        consumers = [
+            asyncio.create_task(_consume(channel, received, '"1.2.0"', len(channels), done))
+            for channel in channels
+        ]
+        await asyncio.sleep(0)
+        for _ in range(50):
+            store.record_health("tv-bad", "pilot", clock.now(), bad, "1.3.0")
+
+        started = time.perf_counter()
+        await asyncio.to_thread(policy.enforce_gates, "pilot")  # auto-rollback
+        await done.wait()
+        latencies = [(ts - started) * 1000 for ts in received]
+        print(
+            f"round {round_idx}: broadcasts={hub.broadcasts} "
+            f"p50={_percentile(latencies, 0.5):.1f}ms p99={_percentile(latencies, 0.99):.1f}ms "
+            f"max={max(latencies):.1f}ms"
+        )
+
+        for task in consumers:
+            task.cancel()
+        await asyncio.gather(*consumers, return_exceptions=True)
+        # Re-arm: let the bad samples age out of the window and move the rollout forward.
+        clock.advance(WINDOW_SECONDS + 1)
+        store.update_target_version(rollout.rollout_id, "1.3.0")
+        await asyncio.sleep(0)
+        for channel in channels:
+            await channel.next()
+
+    print(
+        f"polling every {NEXT_CHECK_SECONDS}s: p50={NEXT_CHECK_SECONDS * 500:.0f}ms "
+        f"p99={NEXT_CHECK_SECONDS * 990:.0f}ms"
+    )
+
+
+def main() -> None:
+    parser = argparse.ArgumentParser(description=__doc__.splitlines()[0])
+    parser.add_argument("--connections", type=int, default=50_000)
+    parser.add_argument("--rounds", type=int, default=5)
+    args = parser.parse_args()
+    asyncio.run(run(args.connections, args.rounds))
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,288 @@
+"""Micro-benchmark and memory-regression suite for Store, metrics, policy and check-in.
+
+Every benchmark runs at each window size and reports the best of ``--repeat`` runs. Stores
+are built with ``Store(max_window_len=size)`` and filled through ``record_health`` on a
+virtual clock, so windows, cohorts and caches stay as consistent as in a live node.
+
+Usage::
+
+    python -m benchmarks.suite run --save benchmarks/baseline.json
+    python -m benchmarks.suite compare benchmarks/baseline.json --tolerance 0.2
+    python -m benchmarks.suite compare baseline.json current.json
+
+``compare`` exits with status 1 when any result regressed by more than the tolerance.
+"""
+
+from __future__ import annotations
+
+import argparse
+import asyncio
+import functools
+import gc
+import json
+import platform
+import sys
+import time
+import tracemalloc
+from collections.abc import Callable, Sequence
+from datetime import UTC, datetime, timedelta
+
+import httpx
+
+from app.admission import AdmissionController
+from app.clock import VirtualClock
+from app.dependencies import get_admission, get_policy, get_store
+from app.main import app
+from app.metrics import compute_window_metrics
+from app.policy import PolicyEngine
+from app.schemas import CheckinReq, Health
+from app.store import Store
+
+DEFAULT_SIZES = (100, 1_000, 10_000, 100_000, 1_000_000)
+DEFAULT_TOLERANCE = 0.25
+RING = "pilot"
+
+Results = dict[str, dict[str, object]]
+
+
+def _health(idx: int) -> Health:
+    return Health(
+        boot_ok=idx % 97 != 0, crash_free=0.99 + (idx % 10) / 1000, checkin_ms=40 + idx % 60
+    )
+
+
+def _payload(idx: int, ts: str) -> CheckinReq:
+    return CheckinReq(
+        device_id=f"tv-{idx:07d}",
+        ring=RING,
+        sw_version="1.2.0",
+        health=_health(idx),
+        ts=ts,
+    )
+
+
+def _store(size: int, clock: VirtualClock | None = None) -> Store:
+    """Store with an active rollout and ``size`` fresh samples in the pilot window."""
+
+    clock = clock or VirtualClock(datetime.now(UTC))
+    store = Store(clock=clock, max_window_len=max(size, 1))
+    store.create_rollout("1.2.0", "1.1.0")
+    ts = store.clock.now()
+    for idx in range(size):
+        store.record_health(f"tv-{idx % 1000:07d}", RING, ts, _health(idx), "1.2.0")
+    return store
+
+
+def _ops(size: int, budget: int = 2_000_000, cap: int = 2_000) -> int:
+    """Operation count for O(window) benchmarks so each size takes similar time."""
+
+    return max(5, min(cap, budget // size))
+
+
+def _best(repeat: int, run: Callable[[], tuple[int, int]]) -> float:
+    """Best per-operation time in ns; ``run`` returns (elapsed_ns, operations)."""
+
+    best = float("inf")
+    for _ in range(repeat):
+        gc.collect()
+        elapsed, ops = run()
+        best = min(best, elapsed / ops)
+    return best
+
+
+def bench_record_checkin(size: int) -> tuple[int, int]:
+    store = _store(size)
+    ts = datetime.now(UTC).isoformat()
+    payloads = [_payload(idx, ts) for idx in range(2_000)]
+    started = time.perf_counter_ns()
+    for payload in payloads:
+        store.record_checkin(payload)
+    return time.perf_counter_ns() - started, len(payloads)
+
+
+def bench_prune_ring(size: int) -> tuple[int, int]:
+    clock = VirtualClock(datetime.now(UTC))
+    store = _store(size, clock)
+    clock.advance(timedelta(hours=1).total_seconds())
+    started = time.perf_counter_ns()
+    store.version_cohorts(RING)  # reads prune expired samples first
+    return time.perf_counter_ns() - started, size
+
+
+def bench_compute_window_metrics(size: int) -> tuple[int, int]:
+    events = [_health(idx) for idx in range(size)]
+    ops = _ops(size)
+    started = time.perf_counter_ns()
+    for _ in range(ops):
+        compute_window_metrics(events)
+    return time.perf_counter_ns() - started, ops
+
+
+def bench_evaluate_rollout(size: int) -> tuple[int, int]:
+    store = _store(size)
+    policy = PolicyEngine(store)
+    rollout_id = store.active_rollout().rollout_id  # type: ignore[union-attr]
+    ops = _ops(size)
+    ts = store.clock.now()
+    started = time.perf_counter_ns()
+    for idx in range(ops):
+        # Measure the cost after a fresh check-in, which invalidates the metrics memo.
+        store.record_health("tv-bench", RING, ts, _health(idx), "1.2.0")
+        policy.evaluate_rollout(rollout_id)
+    return time.perf_counter_ns() - started, ops
+
+
+def bench_checkin_route(size: int) -> tuple[int, int]:
+    store = _store(size)
+    policy = PolicyEngine(store)
+    admission = AdmissionController(
+        device_rate=1e9, device_burst=1e9, global_rate=1e9, global_burst=1e9
+    )
+    ops = _ops(size, cap=500)
+    ts = datetime.now(UTC).isoformat()
+    bodies = [_payload(idx, ts).model_dump() for idx in range(ops)]
+
+    async def run() -> int:
+        transport = httpx.ASGITransport(app=app)
+        async with httpx.AsyncClient(transport=transport, base_url="http://bench") as client:
+            started = time.perf_counter_ns()
+            for body in bodies:
+                resp = await client.post("/v1/checkin", json=body)
+                resp.raise_for_status()
+            return time.perf_counter_ns() - started
+
+    app.dependency_overrides[get_store] = lambda: store
+    app.dependency_overrides[get_policy] = lambda: policy
+    app.dependency_overrides[get_admission] = lambda: admission
+    try:
+        return asyncio.run(run()), ops
+    finally:
+        app.dependency_overrides.clear()
+
+
+def memory_per_sample(size: int) -> tuple[float, float]:
+    """Retained and peak traced bytes per sample when filling a window of ``size``."""
+
+    store = Store(clock=VirtualClock(datetime.now(UTC)), max_window_len=size)
+    ts = store.clock.now()
+    # Register the device first so the registry does not count towards the samples.
+    store.record_health("tv-memory", RING, ts, _health(0), "1.2.0")
+    gc.collect()
+    tracemalloc.start()
+    try:
+        baseline, _ = tracemalloc.get_traced_memory()
+        tracemalloc.reset_peak()
+        for idx in range(size):
+            store.record_health("tv-memory", RING, ts, _health(idx), "1.2.0")
+        current, peak = tracemalloc.get_traced_memory()
+    finally:
+        tracemalloc.stop()
+    return (current - baseline) / size, (peak - baseline) / size
+
+
+BENCHMARKS: dict[str, Callable[[int], tuple[int, int]]] = {
+    "record_checkin": bench_record_checkin,
+    "prune_ring": bench_prune_ring,
+    "compute_window_metrics": bench_compute_window_metrics,
+    "evaluate_rollout": bench_evaluate_rollout,
+    "checkin_route": bench_checkin_route,
+}
+
+
+def run_suite(sizes: Sequence[int], repeat: int, only: Sequence[str] | None = None) -> Results:
+    results: Results = {}
+    for size in sizes:
+        for name, bench in BENCHMARKS.items():
+            if only and name not in only:
+                continue
+            value = _best(repeat, functools.partial(bench, size))
+            results[f"{name}[n={size}]"] = {"value": round(value, 1), "unit": "ns/op"}
+            print(f"{name:>24} n={size:<9} {value:>14,.0f} ns/op", flush=True)
+        if not only or "memory" in only:
+            retained, peak = memory_per_sample(size)
+            results[f"memory_retained[n={size}]"] = {
+                "value": round(retained, 1),
+                "unit": "B/sample",
+            }
+            results[f"memory_peak[n={size}]"] = {"value": round(peak, 1), "unit": "B/sample"}
+            print(
+                f"{'memory':>24} n={size:<9} {retained:>10,.0f} B/sample (peak {peak:,.0f})",
+                flush=True,
+            )
+    return results
+
+
+def compare(baseline: Results, current: Results, tolerance: float) -> list[str]:
+    """Return a line per result that got worse than ``baseline`` by more than ``tolerance``."""
+
+    regressions = []
+    for key, entry in current.items():
+        reference = baseline.get(key)
+        if reference is None or not reference["value"]:
+            continue
+        ratio = float(entry["value"]) / float(reference["value"])  # type: ignore[arg-type]
+        status = "REGRESSION" if ratio > 1 + tolerance else "ok"
+        line = (
+            f"{key:>36} {reference['value']:>14} -> {entry['value']:>14} "
+            f"{entry['unit']} x{ratio:.2f}"
+        )
+        print(f"{line} {status}")
+        if status != "ok":
+            regressions.append(line)
+    return regressions
+
+
+def _load(path: str) -> Results:
+    with open(path, encoding="utf-8") as fp:
+        return json.load(fp)["results"]
+
+
+def _save(path: str, results: Results, args: argparse.Namespace) -> None:
+    document = {
+        "meta": {
+            "created_at": datetime.now(UTC).isoformat(),
+            "python": platform.python_version(),
+            "platform": platform.platform(),
+            "repeat": args.repeat,
+        },
+        "results": results,
+    }
+    with open(path, "w", encoding="utf-8") as fp:
+        json.dump(document, fp, indent=2)
+        fp.write("\n")
+
+
+def main(argv: Sequence[str] | None = None) -> None:
+    parser = argparse.ArgumentParser(description=__doc__.splitlines()[0])
+    commands = parser.add_subparsers(dest="command", required=True)
+
+    run = commands.add_parser("run", help="Run the suite and optionally save a baseline")
+    run.add_argument("--save", help="Write results to this JSON file")
+
+    cmp = commands.add_parser("compare", help="Compare against a saved baseline")
+    cmp.add_argument("baseline")
+    cmp.add_argument("current", nargs="?", help="Saved results (default: run the suite now)")
+    cmp.add_argument("--tolerance", type=float, default=DEFAULT_TOLERANCE)
+
+    for sub in (run, cmp):
+        sub.add_argument("--sizes", type=int, nargs="+", default=list(DEFAULT_SIZES))
+        sub.add_argument("--repeat", type=int, default=3)
+        sub.add_argument("--only", nargs="+", choices=[*BENCHMARKS, "memory"])
+    args = parser.parse_args(argv)
+
+    if args.command == "run":
+        results = run_suite(args.sizes, args.repeat, args.only)
+        if args.save:
+            _save(args.save, results, args)
+        return
+
+    baseline = _load(args.baseline)
+    current = _load(args.current) if args.current else run_suite(args.sizes, args.repeat, args.only)
+    regressions = compare(baseline, current, args.tolerance)
+    if regressions:
+        print(f"{len(regressions)} result(s) regressed by more than {args.tolerance:.0%}")
+        sys.exit(1)
+
+
+if __name__ == "__main__":
+    main()
@@ -5,18 +5,21 @@ import json
 import random
 import signal
 from contextlib import suppress
-from dataclasses import dataclass
+from dataclasses import dataclass, field
 from datetime import datetime, timezone
 from pathlib import Path
-from typing import Dict, List
+from typing import Dict, List, Tuple
 
 import httpx
 import typer
 
+from . import wire
+
 APP = typer.Typer(add_completion=False, help="SafeRoll device simulator")
 DEFAULT_API = "http://localhost:8000"
 DEFAULT_INTERVAL = 5.0
 DEFAULT_DEVICES = 1000
+PROTOCOLS = ("json", "binary")
 FLAGS_PATH = Path(__file__).with_name("sim_flags.json")
 
 RINGS: Dict[str, float] = {
@@ -32,32 +35,64 @@ class Device:
     device_id: str
     ring: str
     sw_version: str
+    server_assigned: bool = False
 
     async def check_in(
         self,
         client: httpx.AsyncClient,
         api_base: str,
         health: "HealthProfile",
-    ) -> None:
+        protocol: str = "json",
+    ) -> Tuple[int, int]:
+        """Check in once; returns ``(request body bytes, response body bytes)``."""
+
         payload = health.generate_payload(self)
+        if self.server_assigned:
+            payload.pop("ring")
         url = f"{api_base}/v1/checkin"
-        await client.post(url, json=payload, timeout=10)
+        body, content_type = encode_payload(payload, protocol)
+        resp = await client.post(
+            url, content=body, headers={"content-type": content_type}, timeout=10
+        )
+        if self.server_assigned and resp.is_success:
+            if protocol == "binary":
+                ring = wire.decode_response(resp.content).ring
+            else:
+                ring = resp.json().get("ring")
+            self.ring = ring or self.ring
+        return len(body), len(resp.content)
+
+
+def encode_payload(payload: Dict[str, object], protocol: str) -> Tuple[bytes, str]:
+    """Serialize a check-in payload for ``protocol``; returns ``(body, content type)``."""
+
+    if protocol == "binary":
+        ts = datetime.fromisoformat(str(payload["ts"])).timestamp()
+        return wire.encode_checkin(payload, ts), wire.CONTENT_TYPE
+    return json.dumps(payload, separators=(",", ":")).encode(), "application/json"
 
 
 @dataclass(slots=True)
 class HealthProfile:
     base_latency: int
     failure_bias: float = 0.0
+    # Healthy baseline, before ``failure_bias`` is applied.
+    crash_free: float = 0.99
+    crash_noise: float = 0.01
+    boot_failure: float = 0.001
+    # Pass a seeded generator for reproducible payloads (see ``fastforward --seed``).
+    rng: random.Random = field(default_factory=random.Random)
 
     def generate_payload(self, device: Device) -> Dict[str, object]:
-        crash_noisy = random.uniform(-0.01, 0.01)
-        crash_free = max(0.0, min(1.0, 0.99 - self.failure_bias + crash_noisy))
-        boot_failure_chance = 0.001 + (self.failure_bias * 5)
-        boot_ok = random.random() > boot_failure_chance
+        rng = self.rng
+        crash_noisy = rng.uniform(-self.crash_noise, self.crash_noise)
+        crash_free = max(0.0, min(1.0, self.crash_free - self.failure_bias + crash_noisy))
+        boot_failure_chance = self.boot_failure + (self.failure_bias * 5)
+        boot_ok = rng.random() > boot_failure_chance
         latency = int(
             self.base_latency
-            * random.uniform(0.8, 1.2)
-            * (1 + self.failure_bias * random.uniform(0.5, 2.0))
+            * rng.uniform(0.8, 1.2)
+            * (1 + self.failure_bias * rng.uniform(0.5, 2.0))
         )
 
         return {
@@ -79,15 +114,24 @@ class Simulator:
         api_base: str = DEFAULT_API,
         devices: int = DEFAULT_DEVICES,
         interval: float = DEFAULT_INTERVAL,
+        server_rings: bool = False,
+        protocol: str = "json",
     ) -> None:
         self.api_base = api_base.rstrip("/")
         self.interval = interval
-        self.devices = self._spawn_devices(devices)
+        self.protocol = protocol
+        self.devices = (
+            self._spawn_unassigned_devices(devices)
+            if server_rings
+            else self._spawn_devices(devices)
+        )
         self.health_profiles = self._build_health_profiles()
         self._stop = asyncio.Event()
         self._summary_task: asyncio.Task | None = None
         self._sent = 0
         self._failed = 0
+        self._bytes_out = 0
+        self._bytes_in = 0
 
     def _spawn_devices(self, count: int) -> List[Device]:
         devices: List[Device] = []
@@ -103,6 +147,19 @@ class Simulator:
                 )
         return devices
 
+    def _spawn_unassigned_devices(self, count: int) -> List[Device]:
+        """Devices that let the backend hash them into rings; ``ring`` is learned on check-in."""
+
+        return [
+            Device(
+                device_id=f"tv-{idx:06d}",
+                ring="all",
+                sw_version="1.2.0",
+                server_assigned=True,
+            )
+            for idx in range(count)
+        ]
+
     def _build_health_profiles(self) -> Dict[str, HealthProfile]:
         return {ring: HealthProfile(base_latency=50 if ring != "all" else 70) for ring in RINGS}
 
@@ -125,7 +182,9 @@ class Simulator:
                 for ring in RINGS
             )
             typer.echo(
-                f"[sim] active={len(self.devices)} sent={self._sent} fail={self._failed} | {msg}"
+                f"[sim] active={len(self.devices)} sent={self._sent} fail={self._failed} "
+                f"protocol={self.protocol} bytes_out={self._bytes_out} bytes_in={self._bytes_in} "
+                f"| {msg}"
             )
             try:
                 await asyncio.wait_for(self._stop.wait(), timeout=10)
@@ -145,13 +204,15 @@ class Simulator:
                 for device in self.devices:
                     profile = self.health_profiles[device.ring]
                     profile.failure_bias = flags.get(device.ring, 0.0)
-                    batch.append(device.check_in(client, self.api_base, profile))
+                    batch.append(device.check_in(client, self.api_base, profile, self.protocol))
                 results = await asyncio.gather(*batch, return_exceptions=True)
                 for item in results:
                     if isinstance(item, Exception):
                         self._failed += 1
                     else:
                         self._sent += 1
+                        self._bytes_out += item[0]
+                        self._bytes_in += item[1]
                 try:
                     await asyncio.wait_for(self._stop.wait(), timeout=self.interval)
                 except asyncio.TimeoutError:
@@ -180,13 +241,84 @@ def run(
     api_url: str = typer.Option(DEFAULT_API, "--api-url", help="SafeRoll backend base URL"),
     devices: int = typer.Option(DEFAULT_DEVICES, "--devices", help="Number of devices"),
     interval: float = typer.Option(DEFAULT_INTERVAL, "--interval", help="Seconds between check-ins"),
+    server_rings: bool = typer.Option(
+        False, "--server-rings", help="Omit ring from check-ins and let the backend assign it"
+    ),
+    protocol: str = typer.Option(
+        "json", "--protocol", help="Check-in encoding: json or binary (compact wire format)"
+    ),
 ) -> None:
     """Run the SafeRoll device simulator."""
 
-    simulator = Simulator(api_base=api_url, devices=devices, interval=interval)
+    if protocol not in PROTOCOLS:
+        raise typer.BadParameter(f"Unknown protocol '{protocol}'. Choose from {', '.join(PROTOCOLS)}")
+    simulator = Simulator(
+        api_base=api_url,
+        devices=devices,
+        interval=interval,
+        server_rings=server_rings,
+        protocol=protocol,
+    )
     asyncio.run(simulator.run())
 
 
+@APP.command()
+def fastforward(
+    devices: int = typer.Option(100_000, "--devices", help="Number of simulated devices"),
+    hours: float = typer.Option(24.0, "--hours", help="Virtual time to simulate"),
+    tick: float = typer.Option(10.0, "--tick", help="Virtual seconds per simulation step"),
+    samples_per_window: int = typer.Option(
+        300, "--samples-per-window", help="Max check-ins posted per ring per 5-minute window"
+    ),
+    promote_every: float = typer.Option(
+        60.0, "--promote-every", help="Virtual seconds between operator promote attempts"
+    ),
+    fault: List[str] = typer.Option(
+        [], "--fault", help="Inject RING:BIAS@SECONDS, e.g. five:0.05@7200 (repeatable)"
+    ),
+    seed: int = typer.Option(0, "--seed", help="Random seed for reproducible runs"),
+    protocol: str = typer.Option("json", "--protocol", help="Check-in encoding: json or binary"),
+) -> None:
+    """Run the backend in-process on a virtual clock, as fast as the CPU allows."""
+
+    from .fastforward import FastForwardSimulator, parse_fault
+
+    if protocol not in PROTOCOLS:
+        raise typer.BadParameter(f"Unknown protocol '{protocol}'. Choose from {', '.join(PROTOCOLS)}")
+
+    try:
+        faults = [parse_fault(value) for value in fault]
+    except ValueError as exc:
+        raise typer.BadParameter(str(exc)) from exc
+    simulator = FastForwardSimulator(
+        devices=devices,
+        duration=hours * 3600,
+        tick=tick,
+        samples_per_window=samples_per_window,
+        promote_every=promote_every,
+        faults=faults,
+        seed=seed,
+        protocol=protocol,
+    )
+    report = asyncio.run(simulator.run())
+    # The backend already coalesces runs of identical decisions (e.g. repeated auto-pauses).
+    for decision in report.decisions:
+        count = decision.get("count", 1)
+        ts = decision.get("first_ts") or decision["ts"]
+        suffix = f" (x{count} until {decision['ts']})" if count > 1 else ""
+        typer.echo(
+            f"{ts} {decision['kind']:<9} {decision['ring']:<10} {decision['reason']}{suffix}"
+        )
+    state = report.final_state or {}
+    typer.echo(
+        f"[sim] virtual={report.virtual_seconds / 3600:.1f}h wall={report.wall_seconds:.1f}s "
+        f"requests={report.requests} state={state.get('state')} ring_index={state.get('ring_index')}"
+    )
+    typer.echo(
+        f"[sim] protocol={protocol} bytes_out={report.bytes_out} bytes_in={report.bytes_in}"
+    )
+
+
 @APP.command()
 def inject(
     ring: str = typer.Argument(..., help="Ring to degrade", metavar="[pilot|five|twentyfive|all]"),
@@ -0,0 +1,218 @@
+"""Discrete-event fast-forward mode: drive the backend in-process on a virtual clock.
+
+The FastAPI app is called through ``httpx.ASGITransport`` with a ``Store``,
+``PolicyEngine`` and ``AdmissionController`` that share one ``VirtualClock``. The clock
+jumps from tick to tick instead of sleeping, so cooldowns and 5-minute windows elapse
+instantly while every check-in still goes through the real route and decision logic.
+
+A ring window never holds more than ``MAX_WINDOW_LEN`` samples, so posting every check-in
+of a large fleet would mostly feed samples that are evicted before anything reads them.
+Each tick therefore posts at most ``samples_per_window * tick / WINDOW_SECONDS`` check-ins
+per ring, from devices picked at random in that ring. Rings below the cap get their full
+traffic.
+
+The simulated operator only promotes; it never resumes a paused rollout. Device health
+therefore defaults to a profile that passes the default gates, and only ``faults`` make a
+ring breach them.
+
+With the same ``seed`` a run is reproducible: device picks and health payloads come from
+one seeded generator, and the virtual clock starts at ``DEFAULT_START`` unless given a
+``start``.
+"""
+
+from __future__ import annotations
+
+import math
+import random
+import time
+from dataclasses import dataclass, field
+from datetime import UTC, datetime
+from typing import Dict, List, Optional
+
+import httpx
+
+from .cli import RINGS, Device, HealthProfile, encode_payload
+
+DEFAULT_TICK_SECONDS = 10.0
+DEFAULT_CHECKIN_INTERVAL = 30.0
+DEFAULT_SAMPLES_PER_WINDOW = 300
+DEFAULT_PROMOTE_EVERY = 60.0
+DEFAULT_START = datetime(2024, 1, 1, tzinfo=UTC)
+HEALTHY_CRASH_FREE = 0.995
+HEALTHY_CRASH_NOISE = 0.004
+
+
+@dataclass
+class Fault:
+    ring: str
+    bias: float
+    at_seconds: float
+
+
+@dataclass
+class FastForwardReport:
+    virtual_seconds: float
+    wall_seconds: float
+    requests: int
+    bytes_out: int = 0
+    bytes_in: int = 0
+    decisions: List[Dict[str, object]] = field(default_factory=list)
+    final_state: Optional[Dict[str, object]] = None
+
+
+class FastForwardSimulator:
+    def __init__(
+        self,
+        devices: int,
+        duration: float,
+        tick: float = DEFAULT_TICK_SECONDS,
+        checkin_interval: float = DEFAULT_CHECKIN_INTERVAL,
+        samples_per_window: int = DEFAULT_SAMPLES_PER_WINDOW,
+        promote_every: float = DEFAULT_PROMOTE_EVERY,
+        faults: Optional[List[Fault]] = None,
+        seed: int = 0,
+        start: Optional[datetime] = None,
+        protocol: str = "json",
+    ) -> None:
+        # Imported lazily so the HTTP simulator does not need the backend installed.
+        from app.admission import AdmissionController
+        from app.clock import VirtualClock
+        from app.metrics import WINDOW_SECONDS
+        from app.policy import PolicyEngine
+        from app.store import Store
+
+        self.duration = duration
+        self.tick = tick
+        self.promote_every = promote_every
+        self.protocol = protocol
+        self.faults = sorted(faults or [], key=lambda fault: fault.at_seconds)
+        self.random = random.Random(seed)
+        self.clock = VirtualClock(start or DEFAULT_START)
+        self.store = Store(clock=self.clock)
+        self.policy = PolicyEngine(self.store)
+        self.admission = AdmissionController(clock=self.clock)
+        self.by_ring: Dict[str, List[Device]] = {
+            ring: [
+                Device(device_id=f"{ring}-{idx:06d}", ring=ring, sw_version="1.2.0")
+                for idx in range(max(1, int(devices * ratio)))
+            ]
+            for ring, ratio in RINGS.items()
+        }
+        # Gates are checked from a window's first sample on, so every fault-free sample
+        # stays clear of them: crash_free below 0.990 pauses, and one boot failure among
+        # the first few samples of a window rolls back.
+        self.profiles = {
+            ring: HealthProfile(
+                base_latency=50 if ring != "all" else 70,
+                crash_free=HEALTHY_CRASH_FREE,
+                crash_noise=HEALTHY_CRASH_NOISE,
+                boot_failure=0.0,
+                rng=self.random,
+            )
+            for ring in RINGS
+        }
+        cap = samples_per_window * tick / WINDOW_SECONDS
+        self.per_tick = {
+            ring: min(len(ring_devices) * tick / checkin_interval, cap)
+            for ring, ring_devices in self.by_ring.items()
+        }
+        self._carry = {ring: 0.0 for ring in RINGS}
+
+    def _app(self):  # noqa: ANN202 - FastAPI app, imported lazily
+        from app.dependencies import get_admission, get_policy, get_store
+        from app.main import app
+
+        # Async providers resolve on the event loop instead of a threadpool round-trip each.
+        async def store():  # noqa: ANN202
+            return self.store
+
+        async def policy():  # noqa: ANN202
+            return self.policy
+
+        async def admission():  # noqa: ANN202
+            return self.admission
+
+        app.dependency_overrides[get_store] = store
+        app.dependency_overrides[get_policy] = policy
+        app.dependency_overrides[get_admission] = admission
+        return app
+
+    def _batch(self, ring: str) -> List[Device]:
+        due = self.per_tick[ring] + self._carry[ring]
+        count = math.floor(due)
+        self._carry[ring] = due - count
+        return self.random.sample(self.by_ring[ring], min(count, len(self.by_ring[ring])))
+
+    async def run(self) -> FastForwardReport:
+        app = self._app()
+        requests = 0
+        bytes_out = bytes_in = 0
+        faults = list(self.faults)
+        next_promote = self.promote_every
+        started = time.perf_counter()
+        try:
+            transport = httpx.ASGITransport(app=app)
+            async with httpx.AsyncClient(transport=transport, base_url="http://saferoll") as client:
+                resp = await client.post(
+                    "/v1/rollouts", json={"target_version": "1.3.0", "last_known_good": "1.2.0"}
+                )
+                resp.raise_for_status()
+                rollout_id = resp.json()["rollout_id"]
+
+                elapsed = 0.0
+                while elapsed < self.duration:
+                    while faults and faults[0].at_seconds <= elapsed:
+                        fault = faults.pop(0)
+                        self.profiles[fault.ring].failure_bias = fault.bias
+                    ts = self.clock.now().isoformat()
+                    for ring in RINGS:
+                        profile = self.profiles[ring]
+                        for device in self._batch(ring):
+                            payload = profile.generate_payload(device)
+                            payload["ts"] = ts
+                            body, content_type = encode_payload(payload, self.protocol)
+                            resp = await client.post(
+                                "/v1/checkin", content=body, headers={"content-type": content_type}
+                            )
+                            requests += 1
+                            bytes_out += len(body)
+                            bytes_in += len(resp.content)
+
+                    if elapsed >= next_promote:
+                        next_promote += self.promote_every
+                        # Acts as the operator: promote whenever the gates allow it.
+                        requests += 1
+                        await client.post(f"/v1/rollouts/{rollout_id}/promote")
+
+                    self.clock.advance(self.tick)
+                    elapsed += self.tick
+
+                detail = (await client.get(f"/v1/rollouts/{rollout_id}")).json()
+        finally:
+            app.dependency_overrides.clear()
+
+        return FastForwardReport(
+            virtual_seconds=elapsed,
+            wall_seconds=time.perf_counter() - started,
+            requests=requests,
+            bytes_out=bytes_out,
+            bytes_in=bytes_in,
+            decisions=[
+                decision.model_dump() for decision in self.store.get_rollout(rollout_id).decisions
+            ],
+            final_state=detail["rollout"],
+        )
+
+
+def parse_fault(value: str) -> Fault:
+    """Parse ``RING:BIAS@SECONDS`` (e.g. ``five:0.05@7200``)."""
+
+    try:
+        ring, rest = value.split(":", 1)
+        bias, at = rest.split("@", 1)
+        fault = Fault(ring=ring.lower(), bias=float(bias), at_seconds=float(at))
+    except ValueError as exc:
+        raise ValueError(f"Invalid fault {value!r}; expected RING:BIAS@SECONDS") from exc
+    if fault.ring not in RINGS:
+        raise ValueError(f"Unknown ring '{fault.ring}'")
+    return fault
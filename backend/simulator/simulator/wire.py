@@ -0,0 +1,63 @@
+"""Device side of the backend's binary check-in protocol (see ``app/wire.py``).
+
+Kept as a copy so the simulator stays installable without the backend package.
+"""
+
+from __future__ import annotations
+
+import struct
+from typing import Dict, NamedTuple, Optional
+
+CONTENT_TYPE = "application/x-saferoll-checkin"
+PROTOCOL_VERSION = 1
+NO_RING = 0xFF
+RING_ORDER = ("pilot", "five", "twentyfive", "all")
+FLAG_TARGET = 0x01
+FLAG_TARGET_JSON = 0x02
+
+REQUEST = struct.Struct("<BBBxdHHI24s")
+RESPONSE = struct.Struct("<BBBHI12s")
+
+
+def pack_version(version: str) -> int:
+    major, minor, patch = (int(part) for part in version.split("."))
+    return major << 22 | minor << 12 | patch
+
+
+def unpack_version(packed: int) -> str:
+    return f"{packed >> 22}.{packed >> 12 & 0x3FF}.{packed & 0xFFF}"
+
+
+def encode_checkin(payload: Dict[str, object], ts: float) -> bytes:
+    """Encode a JSON-shaped check-in payload (as built by ``HealthProfile``)."""
+
+    health = payload["health"]
+    ring = payload.get("ring")
+    return REQUEST.pack(
+        PROTOCOL_VERSION,
+        RING_ORDER.index(ring) if ring else NO_RING,
+        1 if health["boot_ok"] else 0,
+        ts,
+        round(health["crash_free"] * 10_000),
+        min(int(health["checkin_ms"]), 0xFFFF),
+        pack_version(str(payload["sw_version"])),
+        str(payload["device_id"]).encode(),
+    )
+
+
+class BinaryResponse(NamedTuple):
+    ring: Optional[str]
+    target_version: Optional[str]
+    rollout_id: str
+    # The target does not fit the packed form (e.g. ``1.3.0-rc1``); ask over JSON.
+    target_over_json: bool = False
+
+
+def decode_response(data: bytes) -> BinaryResponse:
+    _, ring_index, flags, _, target, rollout_id = RESPONSE.unpack(data)
+    return BinaryResponse(
+        ring=None if ring_index == NO_RING else RING_ORDER[ring_index],
+        target_version=unpack_version(target) if flags & FLAG_TARGET else None,
+        rollout_id=rollout_id.rstrip(b"\0").decode(),
+        target_over_json=bool(flags & FLAG_TARGET_JSON),
+    )